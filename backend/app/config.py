@@ -44,10 +44,75 @@ class Settings(BaseSettings):
 
     # Logging
     log_dir: str = Field(default="./logs", env="LOG_DIR")
+    log_queue_max_bytes: int = Field(default=16777216, env="LOG_QUEUE_MAX_BYTES")
+    log_flush_bytes: int = Field(default=65536, env="LOG_FLUSH_BYTES")
+    log_flush_interval: float = Field(default=1.0, env="LOG_FLUSH_INTERVAL")  # seconds
+
+    # Full-text index over session logs
+    log_index_enabled: bool = Field(default=True, env="LOG_INDEX_ENABLED")
+    log_index_path: str = Field(default="./data/log_index.db", env="LOG_INDEX_PATH")
+
+    # Live tail of session logs
+    log_tail_poll_interval: float = Field(default=1.0, env="LOG_TAIL_POLL_INTERVAL")  # seconds
+    log_tail_backlog_bytes: int = Field(default=16384, env="LOG_TAIL_BACKLOG_BYTES")
+
+    # Session recordings
+    recording_enabled: bool = Field(default=True, env="RECORDING_ENABLED")
+    recording_chunk_bytes: int = Field(default=262144, env="RECORDING_CHUNK_BYTES")
+    recording_chunk_seconds: float = Field(default=10.0, env="RECORDING_CHUNK_SECONDS")
 
     # Session
     max_sessions: int = Field(default=100, env="MAX_SESSIONS")
     session_timeout: int = Field(default=3600, env="SESSION_TIMEOUT")  # seconds
+    session_persist_interval: float = Field(default=2.0, env="SESSION_PERSIST_INTERVAL")  # seconds
+    ssh_engine: str = Field(default="paramiko", env="SSH_ENGINE", pattern="^(paramiko|asyncssh)$")
+    ssh_connect_timeout: float = Field(default=10.0, env="SSH_CONNECT_TIMEOUT")  # seconds
+    ssh_connect_workers: int = Field(default=32, env="SSH_CONNECT_WORKERS")
+    ssh_input_workers: int = Field(default=8, env="SSH_INPUT_WORKERS")
+
+    key_cache_size: int = Field(default=256, env="KEY_CACHE_SIZE")
+    credential_cache_ttl: float = Field(default=30.0, env="CREDENTIAL_CACHE_TTL")  # seconds
+
+    # Multi-worker session routing (default: on when WEB_CONCURRENCY > 1)
+    session_relay_enabled: bool = Field(
+        default=None, env="SESSION_RELAY_ENABLED", validate_default=True
+    )
+    ipc_dir: str = Field(default="./data/ipc", env="IPC_DIR")
+
+    @field_validator("session_relay_enabled", mode="before")
+    @classmethod
+    def default_session_relay(cls, v):
+        """Enable the relay only when uvicorn runs several workers"""
+        if v is None or v == "":
+            return int(os.environ.get("WEB_CONCURRENCY") or 1) > 1
+        return v
+
+    # Transport pooling
+    transport_pool_enabled: bool = Field(default=True, env="TRANSPORT_POOL_ENABLED")
+    transport_pool_max_channels: int = Field(default=8, env="TRANSPORT_POOL_MAX_CHANNELS")
+    transport_pool_idle_timeout: float = Field(default=30.0, env="TRANSPORT_POOL_IDLE_TIMEOUT")  # seconds
+
+    # Output coalescing (SSH -> WebSocket)
+    output_coalesce_delay_ms: float = Field(default=3.0, env="OUTPUT_COALESCE_DELAY_MS")
+    output_coalesce_max_bytes: int = Field(default=65536, env="OUTPUT_COALESCE_MAX_BYTES")
+    output_immediate_bytes: int = Field(default=64, env="OUTPUT_IMMEDIATE_BYTES")
+    output_queue_max_bytes: int = Field(default=1048576, env="OUTPUT_QUEUE_MAX_BYTES")
+    input_queue_max_bytes: int = Field(default=8388608, env="INPUT_QUEUE_MAX_BYTES")
+
+    # Viewers of one session (per-viewer queue limit is output_queue_max_bytes)
+    max_viewers: int = Field(default=16, env="MAX_VIEWERS")  # per session
+    viewer_slow_policy: str = Field(
+        default="block", env="VIEWER_SLOW_POLICY", pattern="^(block|drop|disconnect)$"
+    )
+    observer_slow_policy: str = Field(
+        default="drop", env="OBSERVER_SLOW_POLICY", pattern="^(drop|disconnect)$"
+    )
+
+    # Scrollback replayed to reattaching clients (per session)
+    scrollback_bytes: int = Field(default=262144, env="SCROLLBACK_BYTES")
+
+    # Screen snapshots (requires pyte)
+    screen_model_enabled: bool = Field(default=False, env="SCREEN_MODEL_ENABLED")
 
     class Config:
         env_file = ".env"
@@ -1,10 +1,17 @@
 """
 Database connection and session management
 """
+import asyncio
+import logging
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.config import settings
 
+
+logger = logging.getLogger(__name__)
+
 # Create async engine
 engine = create_async_engine(
     settings.database_url,
@@ -36,10 +43,50 @@ async def get_db():
             await session.close()
 
 
-async def init_db():
-    """Initialize database tables"""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+async def init_db(attempts: int = 5):
+    """
+    Initialize database tables
+
+    Several workers may start at once and race on CREATE TABLE; a worker
+    that loses the race retries and then finds the tables in place.
+    """
+    for attempt in range(attempts):
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+                await conn.run_sync(_upgrade_schema)
+            return
+        except OperationalError:
+            if attempt == attempts - 1:
+                raise
+            await asyncio.sleep(0.2 * (attempt + 1))
+
+
+def _upgrade_schema(conn):
+    """
+    Bring tables created by an older version up to date
+
+    ``create_all`` only creates missing tables. Columns added to existing
+    models later are added here (they must be nullable or have a server
+    default), followed by any missing indexes.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(conn.dialect)}"
+            if column.server_default is not None:
+                ddl += f" DEFAULT {column.server_default.arg}"
+            conn.execute(text(ddl))
+            logger.info(f"Added column {table.name}.{column.name}")
+
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
 
 
 async def close_db():
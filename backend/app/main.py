@@ -7,9 +7,16 @@ from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 from app.config import settings
-from app.database import engine, Base
+from app.database import init_db
 from app.services.ssh_manager import ssh_manager
-from app.routers import servers, credentials, sessions, websocket
+from app.services.session_relay import session_relay
+from app.services.idle_reaper import idle_reaper
+from app.services.session_persister import session_persister
+from app.services.server_search import server_search
+from app.services.log_index import log_index
+from app.services.log_tail import log_tail
+from app.services.pagination import NEXT_CURSOR_HEADER
+from app.routers import servers, credentials, sessions, recordings, websocket, metrics, logs
 
 
 @asynccontextmanager
@@ -22,15 +29,37 @@ async def lifespan(app: FastAPI):
     print(f"🔐 Encryption: {'Enabled' if settings.encryption_key else 'Disabled'}")
 
     # Initialize database tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await init_db()
+    await server_search.setup()
     print("✅ Database tables initialized")
 
+    # Accept relayed WebSockets from other workers
+    if settings.session_relay_enabled:
+        await session_relay.start(websocket.websocket_ssh_endpoint)
+
+    # Close session rows left active by a previous run, then persist
+    # session state in the background
+    await session_persister.reconcile()
+    session_persister.start()
+
+    # Close sessions idle for longer than their timeout
+    idle_reaper.start(ssh_manager.expire_idle)
+
+    # Wake live tails of session logs on every flush
+    log_tail.start()
+
+    # Index session logs as they are flushed
+    if settings.log_index_enabled:
+        log_index.start()
+
     yield
 
     # Shutdown
     print("👋 Shutting down application...")
+    await idle_reaper.stop()
+    await session_relay.stop()
     await ssh_manager.disconnect_all()
+    await log_index.stop()
     print("✅ All SSH connections closed")
 
 
@@ -50,6 +79,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
@@ -75,6 +105,7 @@ async def root():
         "version": settings.app_version,
         "docs": "/docs",
         "health": "/health",
+        "metrics": "/metrics",
     }
 
 
@@ -82,7 +113,10 @@ async def root():
 app.include_router(servers.router)
 app.include_router(credentials.router)
 app.include_router(sessions.router)
+app.include_router(recordings.router)
 app.include_router(websocket.router)
+app.include_router(metrics.router)
+app.include_router(logs.router)
 
 
 if __name__ == "__main__":
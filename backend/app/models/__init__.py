@@ -1,7 +1,9 @@
 """Database models package"""
 
 from app.models.server import SSHServer
+from app.models.server_tag import ServerTag
 from app.models.credential import Credential
 from app.models.session import SSHSession
+from app.models.session_owner import SessionOwner
 
-__all__ = ["SSHServer", "Credential", "SSHSession"]
+__all__ = ["SSHServer", "ServerTag", "Credential", "SSHSession", "SessionOwner"]
@@ -2,7 +2,7 @@
 SSH Server model
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -12,6 +12,9 @@ class SSHServer(Base):
     """SSH Server configuration model"""
 
     __tablename__ = "ssh_servers"
+    __table_args__ = (
+        Index("ix_ssh_servers_created_at", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String(100), unique=True, nullable=False, index=True)
@@ -21,13 +24,15 @@ class SSHServer(Base):
     auth_type = Column(String(20), nullable=True)  # 'password' or 'key'
     credential_id = Column(Integer, ForeignKey("credentials.id"), nullable=True)
     description = Column(Text, nullable=True)
-    tags = Column(String(255), nullable=True)  # JSON string
+    tags = Column(String(255), nullable=True)  # JSON string (normalized into server_tags)
+    session_timeout = Column(Integer, nullable=True)  # idle seconds; NULL = default, 0 = never
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     # Relationships
     credential = relationship("Credential", back_populates="servers")
     sessions = relationship("SSHSession", back_populates="server", cascade="all, delete-orphan")
+    tag_rows = relationship("ServerTag", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<SSHServer(id={self.id}, name='{self.name}', host='{self.host}:{self.port}')>"
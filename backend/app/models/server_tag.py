@@ -0,0 +1,22 @@
+"""
+Server tag model
+"""
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+
+from app.database import Base
+
+
+class ServerTag(Base):
+    """One tag of a server, normalized from ``SSHServer.tags`` for indexed lookups"""
+
+    __tablename__ = "server_tags"
+    __table_args__ = (
+        # Servers by tag (the primary key serves tags by server)
+        Index("ix_server_tags_tag_server_id", "tag", "server_id"),
+    )
+
+    server_id = Column(Integer, ForeignKey("ssh_servers.id", ondelete="CASCADE"), primary_key=True)
+    tag = Column(String(64), primary_key=True)  # lowercase
+
+    def __repr__(self):
+        return f"<ServerTag(server_id={self.server_id}, tag='{self.tag}')>"
@@ -2,7 +2,7 @@
 SSH Session model
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -12,6 +12,14 @@ class SSHSession(Base):
     """SSH Session model for tracking active and historical sessions"""
 
     __tablename__ = "ssh_sessions"
+    __table_args__ = (
+        # Listing filters, each ending in the sort column (SQLite appends the id)
+        Index("ix_ssh_sessions_started_at", "started_at"),
+        Index("ix_ssh_sessions_status_started_at", "status", "started_at"),
+        Index("ix_ssh_sessions_server_id_started_at", "server_id", "started_at"),
+        # Log lookups (download, tail, search results)
+        Index("ix_ssh_sessions_log_file_path", "log_file_path"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     session_id = Column(String(64), unique=True, nullable=False, index=True)
@@ -21,8 +29,11 @@ class SSHSession(Base):
     log_file_path = Column(String(512), nullable=True)
     started_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     ended_at = Column(DateTime, nullable=True)
+    end_reason = Column(String(32), nullable=True)  # user, remote, idle_timeout, shutdown, server_exit
     terminal_cols = Column(Integer, default=80, nullable=False)
     terminal_rows = Column(Integer, default=24, nullable=False)
+    bytes_in = Column(BigInteger, default=0, server_default="0", nullable=False)  # user input
+    bytes_out = Column(BigInteger, default=0, server_default="0", nullable=False)  # server output
 
     # Relationships
     server = relationship("SSHServer", back_populates="sessions")
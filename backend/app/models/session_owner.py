@@ -0,0 +1,22 @@
+"""
+Session owner registry model
+"""
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime
+
+from app.database import Base
+
+
+class SessionOwner(Base):
+    """Which worker process holds the live SSH connection of a session"""
+
+    __tablename__ = "session_owners"
+
+    session_id = Column(String(64), primary_key=True)
+    node = Column(String(255), nullable=False)  # hostname
+    worker_id = Column(String(64), nullable=False, index=True)
+    socket_path = Column(String(512), nullable=False)  # relay Unix socket of the worker
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<SessionOwner(session_id='{self.session_id}', worker_id='{self.worker_id}')>"
@@ -7,8 +7,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from ..database import get_db
 from ..models.credential import Credential
-from ..schemas.credential import CredentialCreate, CredentialResponse
+from ..schemas.credential import CredentialCreate, CredentialUpdate, CredentialResponse
 from ..services.encryption import encryption_service
+from ..services.key_loader import private_key_loader
+from ..services.credential_resolver import credential_resolver
 
 
 router = APIRouter(prefix="/api/credentials", tags=["credentials"])
@@ -22,6 +24,15 @@ async def list_credentials(db: AsyncSession = Depends(get_db)):
     return credentials
 
 
+@router.get("/cache/stats")
+async def get_credential_cache_stats():
+    """Get credential resolution and private key cache statistics"""
+    return {
+        "resolver": credential_resolver.get_stats(),
+        "keys": private_key_loader.get_stats(),
+    }
+
+
 @router.get("/{credential_id}", response_model=CredentialResponse)
 async def get_credential(credential_id: int, db: AsyncSession = Depends(get_db)):
     """Get specific credential by ID"""
@@ -44,6 +55,7 @@ async def create_credential(
     # Encrypt sensitive data
     encrypted_password = None
     encrypted_private_key = None
+    passphrase_encrypted = None
 
     if credential_data.password:
         encrypted_password = encryption_service.encrypt(credential_data.password)
@@ -51,13 +63,16 @@ async def create_credential(
     if credential_data.private_key:
         encrypted_private_key = encryption_service.encrypt(credential_data.private_key)
 
+    if credential_data.passphrase:
+        passphrase_encrypted = encryption_service.encrypt(credential_data.passphrase)
+
     # Create credential
     credential = Credential(
         name=credential_data.name,
-        username=credential_data.username,
+        credential_type=credential_data.credential_type,
         encrypted_password=encrypted_password,
         encrypted_private_key=encrypted_private_key,
-        description=credential_data.description,
+        passphrase_encrypted=passphrase_encrypted,
     )
 
     db.add(credential)
@@ -67,6 +82,57 @@ async def create_credential(
     return credential
 
 
+@router.put("/{credential_id}", response_model=CredentialResponse)
+async def update_credential(
+    credential_id: int,
+    credential_data: CredentialUpdate,
+    db: AsyncSession = Depends(get_db),
+):
+    """Update credential, re-encrypting any new secrets"""
+    result = await db.execute(
+        select(Credential).where(Credential.id == credential_id)
+    )
+    credential = result.scalar_one_or_none()
+
+    if not credential:
+        raise HTTPException(status_code=404, detail="Credential not found")
+
+    update_data = credential_data.model_dump(exclude_unset=True)
+
+    if "name" in update_data:
+        credential.name = update_data["name"]
+
+    if "password" in update_data:
+        credential.encrypted_password = (
+            encryption_service.encrypt(update_data["password"])
+            if update_data["password"]
+            else None
+        )
+
+    if "private_key" in update_data:
+        credential.encrypted_private_key = (
+            encryption_service.encrypt(update_data["private_key"])
+            if update_data["private_key"]
+            else None
+        )
+
+    if "passphrase" in update_data:
+        credential.passphrase_encrypted = (
+            encryption_service.encrypt(update_data["passphrase"])
+            if update_data["passphrase"]
+            else None
+        )
+
+    await db.commit()
+    await db.refresh(credential)
+
+    # Drop cached keys and resolved parameters for the old secret
+    private_key_loader.invalidate(credential_id)
+    credential_resolver.invalidate_credential(credential_id)
+
+    return credential
+
+
 @router.delete("/{credential_id}", status_code=204)
 async def delete_credential(credential_id: int, db: AsyncSession = Depends(get_db)):
     """Delete credential"""
@@ -81,4 +147,7 @@ async def delete_credential(credential_id: int, db: AsyncSession = Depends(get_d
     await db.delete(credential)
     await db.commit()
 
+    private_key_loader.invalidate(credential_id)
+    credential_resolver.invalidate_credential(credential_id)
+
     return None
@@ -0,0 +1,112 @@
+"""
+Session log download and search API
+"""
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from ..database import get_db
+from ..models.session import SSHSession
+from ..services.file_range import file_response
+from ..services.log_index import log_index
+from ..services.log_tail import SessionLogError, SharedLogError, session_log_path
+
+
+router = APIRouter(prefix="/api/logs", tags=["logs"])
+
+
+@router.get("/search")
+async def search_logs(
+    q: str = Query(..., min_length=1, max_length=200),
+    session_id: Optional[str] = None,
+    server_id: Optional[int] = None,
+    direction: Optional[str] = Query(None, pattern="^(input|output)$"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Search the input and output of session logs
+
+    Returns the lines containing every word, the last one as a prefix.
+    Sessions with the most recent matches come first; each match has the
+    byte offset of its line in the log, its timestamp, direction and text.
+    Logs recorded for more than one session (named before session IDs
+    were part of log names) are left out. ``since``/``until``
+    are server local time, like the log timestamps.
+    """
+    if not log_index.enabled:
+        raise HTTPException(status_code=503, detail="Log index is disabled")
+
+    paths = None
+    if session_id is not None or server_id is not None:
+        query = select(SSHSession.log_file_path).where(SSHSession.log_file_path.is_not(None))
+        if session_id is not None:
+            query = query.where(SSHSession.session_id == session_id)
+        if server_id is not None:
+            query = query.where(SSHSession.server_id == server_id)
+        result = await db.execute(query)
+        owners = await _sessions_by_path(db, set(result.scalars().all()))
+        paths = [path for path, sessions in owners.items() if len(sessions) == 1]
+
+    found = await log_index.search(q, paths, direction, since, until, limit)
+    found = [entry for entry in found if entry["matches"]]
+    owners = await _sessions_by_path(db, {entry["path"] for entry in found})
+
+    results = []
+    for entry in found:
+        sessions = owners.get(entry["path"], [])
+        if len(sessions) > 1:
+            continue  # legacy log shared by sessions: lines cannot be attributed
+        session = sessions[0] if sessions else None
+        results.append({
+            "session_id": session.session_id if session else None,
+            "server_id": session.server_id if session else None,
+            "log_file_path": entry["path"],
+            "matches": entry["matches"],
+        })
+    return {"query": q, "results": results}
+
+
+async def _sessions_by_path(db: AsyncSession, paths: set) -> dict:
+    """Session rows recording each log path (several only for legacy shared logs)"""
+    if not paths:
+        return {}
+    result = await db.execute(
+        select(SSHSession.log_file_path, SSHSession.session_id, SSHSession.server_id)
+        .where(SSHSession.log_file_path.in_(paths))
+    )
+    sessions = {}
+    for row in result.all():
+        sessions.setdefault(row.log_file_path, []).append(row)
+    return sessions
+
+
+@router.get("/index")
+async def get_index_stats():
+    """Get log index size and indexing overhead"""
+    return await log_index.get_index_stats()
+
+
+@router.api_route("/{session_id}", methods=["GET", "HEAD"])
+async def download_log(session_id: str, request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Download a session's log
+
+    Supports ``Range`` (one byte range, e.g. ``bytes=1000-`` to resume or
+    ``bytes=-65536`` for the end of the log) and ``If-Range``. The log of
+    an active session is served up to its size at the time of the request.
+    """
+    try:
+        path = await session_log_path(db, session_id)
+    except SharedLogError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except SessionLogError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    try:
+        return file_response(request, path, "text/plain", filename=f"{session_id}.log")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Log not found")
@@ -0,0 +1,147 @@
+"""
+Prometheus metrics endpoint
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..services.metrics import metrics
+from ..services.ssh_manager import ssh_manager
+from ..services.ssh_reactor import ssh_reactor
+from ..services.log_writer import log_writer
+from ..services.log_index import log_index
+from ..services.log_tail import log_tail
+from ..services.transport_pool import transport_pool
+from ..services.credential_resolver import credential_resolver
+
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _collect_sessions():
+    """
+    Session counts and total traffic, read from the live connections
+
+    Per-session bytes are served by /api/sessions/{id}/stats rather than
+    exported, so the series count does not grow with the sessions.
+    """
+    connections = list(ssh_manager.connections.values())
+
+    viewers = 0
+    total_in = ssh_manager.closed_bytes_in
+    total_out = ssh_manager.closed_bytes_out
+    for connection in connections:
+        total_in += connection.bytes_in
+        total_out += connection.bytes_out
+        viewers += len(connection.output_hub.viewers)
+
+    yield (
+        "ssh_active_sessions", "gauge", "Number of active SSH sessions",
+        [({}, len(connections))],
+    )
+    yield (
+        "ssh_session_viewers", "gauge", "WebSocket viewers attached to active sessions",
+        [({}, viewers)],
+    )
+    yield (
+        "ssh_bytes_total", "counter",
+        "Bytes transferred by all sessions (in = to SSH, out = from SSH)",
+        [({"direction": "in"}, total_in), ({"direction": "out"}, total_out)],
+    )
+
+
+def _collect_reactor():
+    """Read-loop statistics"""
+    yield (
+        "ssh_reactor_wakeups_total", "counter", "Channel read-loop wakeups",
+        [({}, ssh_reactor.wakeups)],
+    )
+    yield (
+        "ssh_reactor_read_bytes_total", "counter", "Bytes read from SSH channels",
+        [({}, ssh_reactor.bytes_read)],
+    )
+    yield (
+        "ssh_reactor_channels", "gauge", "Channels watched by the reactor",
+        [({}, ssh_reactor.get_channel_count())],
+    )
+
+
+def _collect_log_writer():
+    """Session log writer queue and throughput"""
+    stats = log_writer.get_stats()
+    yield (
+        "log_writer_queue_bytes", "gauge", "Bytes waiting in the log writer queue",
+        [({}, stats["queue_bytes"])],
+    )
+    yield (
+        "log_writer_queue_records", "gauge", "Records waiting in the log writer queue",
+        [({}, stats["queue_records"])],
+    )
+    yield (
+        "log_writer_written_bytes_total", "counter", "Bytes written to session logs",
+        [({}, stats["bytes_written"])],
+    )
+    yield (
+        "log_writer_flushes_total", "counter", "Log writer batch flushes",
+        [({}, stats["flushes"])],
+    )
+    yield (
+        "log_writer_dropped_total", "counter", "Log records dropped on a full queue",
+        [({}, stats["dropped"])],
+    )
+
+
+def _collect_log_index():
+    """Session log full-text index and live tails"""
+    stats = log_index.get_stats()
+    yield (
+        "log_index_size_bytes", "gauge", "Size of the session log index on disk",
+        [({}, stats["index_bytes"])],
+    )
+    yield (
+        "log_index_indexed_bytes_total", "counter", "Log bytes added to the index",
+        [({}, stats["bytes_indexed"])],
+    )
+    yield (
+        "log_index_seconds_total", "counter", "Time spent indexing session logs",
+        [({}, stats["index_seconds"])],
+    )
+    yield (
+        "log_tail_followers", "gauge", "WebSockets following a session log",
+        [({}, log_tail.get_stats()["followers"])],
+    )
+
+
+def _collect_caches():
+    """Transport pool and credential cache statistics"""
+    pool = transport_pool.get_stats()
+    resolver = credential_resolver.get_stats()
+    yield (
+        "ssh_transport_pool_transports", "gauge", "Pooled SSH transports",
+        [({}, pool["transports"])],
+    )
+    yield (
+        "ssh_transport_pool_requests_total", "counter", "Transport pool lookups",
+        [({"result": "hit"}, pool["hits"]), ({"result": "miss"}, pool["misses"])],
+    )
+    yield (
+        "credential_cache_requests_total", "counter", "Credential resolver lookups",
+        [
+            ({"result": "hit"}, resolver["hits"]),
+            ({"result": "miss"}, resolver["misses"]),
+            ({"result": "stale"}, resolver["stale"]),
+        ],
+    )
+
+
+metrics.add_collector(_collect_sessions)
+metrics.add_collector(_collect_reactor)
+metrics.add_collector(_collect_log_writer)
+metrics.add_collector(_collect_log_index)
+metrics.add_collector(_collect_caches)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Expose metrics in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,93 @@
+"""
+Session recordings API
+"""
+import os
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from ..database import get_db
+from ..models.session import SSHSession
+from ..services.session_recording import RecordingReader, recording_path_for
+
+
+router = APIRouter(prefix="/api/sessions", tags=["recordings"])
+
+
+async def _open_recording(session_id: str, db: AsyncSession) -> RecordingReader:
+    """Locate a session's recording through its session record"""
+    result = await db.execute(
+        select(SSHSession.log_file_path).where(SSHSession.session_id == session_id)
+    )
+    row = result.one_or_none()
+
+    if row is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    if not row.log_file_path:
+        raise HTTPException(status_code=404, detail="Recording not found")
+
+    path = recording_path_for(row.log_file_path)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Recording not found")
+
+    try:
+        return await run_in_threadpool(RecordingReader, path)
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{session_id}/recording/info")
+async def get_recording_info(session_id: str, db: AsyncSession = Depends(get_db)):
+    """Get recording header, duration and chunk count"""
+    reader = await _open_recording(session_id, db)
+    return {
+        "session_id": session_id,
+        "header": reader.header,
+        "duration": reader.duration,
+        "chunks": len(reader.index),
+    }
+
+
+@router.get("/{session_id}/recording/seek")
+async def seek_recording(
+    session_id: str,
+    t: float = Query(..., ge=0, description="Seconds since session start"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Find the recording chunk that contains a timestamp"""
+    reader = await _open_recording(session_id, db)
+    position = reader.seek(t)
+
+    if position is None:
+        raise HTTPException(status_code=416, detail="Timestamp past end of recording")
+
+    return {"session_id": session_id, "t": t, **position}
+
+
+@router.get("/{session_id}/recording")
+async def stream_recording(
+    session_id: str,
+    start: float = Query(0.0, ge=0, description="Range start in seconds"),
+    end: Optional[float] = Query(None, ge=0, description="Range end in seconds"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Stream a time range of a session as asciicast v2
+
+    Only the chunks covering the requested range are decompressed. Event
+    times in the output are relative to ``start``.
+    """
+    if end is not None and end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+
+    reader = await _open_recording(session_id, db)
+    return StreamingResponse(
+        reader.iter_asciicast(start, end),
+        media_type="application/x-asciicast",
+        headers={
+            "Content-Disposition": f'attachment; filename="{session_id}.cast"'
+        },
+    )
@@ -1,26 +1,127 @@
 """
 SSH Servers CRUD API
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from ..database import get_db
 from ..models.server import SSHServer
 from ..schemas.server import ServerCreate, ServerUpdate, ServerResponse
+from ..services.credential_resolver import credential_resolver
+from ..services.server_search import server_search
+from ..services.server_inventory import (
+    FORMATS,
+    MEDIA_TYPES,
+    InventoryFormatError,
+    server_inventory,
+)
+from ..services.pagination import (
+    DEFAULT_LIMIT,
+    MAX_LIMIT,
+    NEXT_CURSOR_HEADER,
+    CursorError,
+    KeysetPage,
+)
 
 
 router = APIRouter(prefix="/api/servers", tags=["servers"])
 
 
+SORTS = {"name": SSHServer.name, "created_at": SSHServer.created_at}
+
+
 @router.get("/", response_model=List[ServerResponse])
-async def list_servers(db: AsyncSession = Depends(get_db)):
-    """Get list of all SSH servers"""
-    result = await db.execute(select(SSHServer))
-    servers = result.scalars().all()
+async def list_servers(
+    response: Response,
+    host: Optional[str] = None,
+    credential_id: Optional[int] = None,
+    tag: List[str] = Query([]),
+    sort: str = "name",
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get a page of SSH servers
+
+    Sort by ``name`` or ``created_at`` (prefix ``-`` for descending).
+    Repeat ``tag`` to require several tags. When more servers match, the
+    ``X-Next-Cursor`` response header holds the ``cursor`` for the next page.
+    """
+    query = select(SSHServer)
+    if host:
+        query = query.where(SSHServer.host == host)
+    if credential_id:
+        query = query.where(SSHServer.credential_id == credential_id)
+    query = server_search.filter_by_tags(query, tag)
+
+    try:
+        page = KeysetPage(SORTS, SSHServer.id, sort, limit)
+        query = page.apply(query, cursor)
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = await db.execute(query)
+    servers, next_cursor = page.split(result.scalars().all())
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return servers
 
 
+@router.post("/import")
+async def import_servers(request: Request, fmt: Optional[str] = Query(None, alias="format")):
+    """
+    Create or update servers in bulk from an NDJSON or CSV body
+
+    Rows are matched to existing servers by name and validated like
+    ``POST /api/servers/``; invalid rows are reported and skipped. The
+    format defaults from the Content-Type (``text/csv`` or NDJSON).
+    CSV needs a header row; empty cells leave a field unchanged.
+    """
+    fmt = fmt or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FORMATS)}")
+
+    try:
+        return await server_inventory.import_servers(request.stream(), fmt)
+    except InventoryFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/export")
+async def export_servers(fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$")):
+    """Stream every server as NDJSON or CSV (the import format)"""
+    return StreamingResponse(
+        server_inventory.export_servers(fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="servers.{fmt}"'},
+    )
+
+
+@router.get("/search", response_model=List[ServerResponse])
+async def search_servers(
+    q: str = "",
+    tag: List[str] = Query([]),
+    limit: int = Query(20, ge=1, le=MAX_LIMIT),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Search servers by name, host, description and tags, best match first
+
+    Every word must match; the last one also matches as a prefix, so
+    results can be shown while typing. Repeat ``tag`` to require tags.
+    """
+    return await server_search.search(db, q, tag, limit)
+
+
+@router.get("/tags")
+async def list_tags(db: AsyncSession = Depends(get_db)):
+    """Get the tags in use with their server counts"""
+    return await server_search.tag_counts(db)
+
+
 @router.get("/{server_id}", response_model=ServerResponse)
 async def get_server(server_id: int, db: AsyncSession = Depends(get_db)):
     """Get specific SSH server by ID"""
@@ -52,6 +153,8 @@ async def create_server(
     # Create server
     server = SSHServer(**server_data.model_dump())
     db.add(server)
+    await db.flush()
+    await server_search.set_tags(db, {server.id: server.tags})
     await db.commit()
     await db.refresh(server)
 
@@ -73,10 +176,14 @@ async def update_server(
     update_data = server_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(server, field, value)
+    if "tags" in update_data:
+        await server_search.set_tags(db, {server_id: server.tags})
 
     await db.commit()
     await db.refresh(server)
 
+    credential_resolver.invalidate_server(server_id)
+
     return server
 
 
@@ -92,4 +199,6 @@ async def delete_server(server_id: int, db: AsyncSession = Depends(get_db)):
     await db.delete(server)
     await db.commit()
 
+    credential_resolver.invalidate_server(server_id)
+
     return None
@@ -1,35 +1,81 @@
 """
 SSH Sessions API
 """
-from typing import List
+from typing import List, Optional
+import logging
 import uuid
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from ..database import get_db
-from ..models.server import SSHServer
-from ..models.credential import Credential
 from ..models.session import SSHSession
 from ..schemas.session import SessionCreate, SessionResponse
 from ..services.ssh_manager import ssh_manager
-from ..services.encryption import encryption_service
+from ..services.credential_resolver import credential_resolver, ResolutionError
+from ..services.session_registry import session_registry
+from ..services.session_relay import session_relay, RelayUnavailable
+from ..services.screen_model import FORMATS
+from ..services.pagination import (
+    DEFAULT_LIMIT,
+    MAX_LIMIT,
+    NEXT_CURSOR_HEADER,
+    CursorError,
+    KeysetPage,
+)
+from ..config import settings
+
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/sessions", tags=["sessions"])
 
 
-router = APIRouter(prefix="/api/sessions", tags=["sessions"])
+SORTS = {"started_at": SSHSession.started_at}
 
 
 @router.get("/", response_model=List[SessionResponse])
 async def list_sessions(
-    active_only: bool = False, db: AsyncSession = Depends(get_db)
+    response: Response,
+    active_only: bool = False,
+    status: Optional[str] = Query(None, pattern="^(active|closed|error)$"),
+    server_id: Optional[int] = None,
+    started_after: Optional[datetime] = None,
+    started_before: Optional[datetime] = None,
+    sort: str = "-started_at",
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
 ):
-    """Get list of SSH sessions"""
+    """
+    Get a page of SSH sessions, newest first by default
+
+    Filter by status, server and start time (``started_after`` inclusive,
+    ``started_before`` exclusive). When more sessions match, the
+    ``X-Next-Cursor`` response header holds the ``cursor`` for the next page.
+    """
     query = select(SSHSession)
 
     if active_only:
-        query = query.where(SSHSession.status == "active")
+        status = "active"
+    if status:
+        query = query.where(SSHSession.status == status)
+    if server_id:
+        query = query.where(SSHSession.server_id == server_id)
+    if started_after:
+        query = query.where(SSHSession.started_at >= started_after)
+    if started_before:
+        query = query.where(SSHSession.started_at < started_before)
+
+    try:
+        page = KeysetPage(SORTS, SSHSession.id, sort, limit)
+        query = page.apply(query, cursor)
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     result = await db.execute(query)
-    sessions = result.scalars().all()
+    sessions, next_cursor = page.split(result.scalars().all())
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return sessions
 
 
@@ -60,45 +106,26 @@ async def create_session(
     session_id = str(uuid.uuid4())
 
     # Get connection parameters
+    credential_id = session_data.credential_id
     if session_data.server_id:
-        # Load from saved server
-        result = await db.execute(
-            select(SSHServer).where(SSHServer.id == session_data.server_id)
-        )
-        server = result.scalar_one_or_none()
-
-        if not server:
-            raise HTTPException(status_code=404, detail="Server not found")
-
-        host = server.host
-        port = server.port
-        server_name = server.name
-
-        # Get credentials
-        if session_data.credential_id:
-            result = await db.execute(
-                select(Credential).where(Credential.id == session_data.credential_id)
-            )
-            credential = result.scalar_one_or_none()
-
-            if not credential:
-                raise HTTPException(status_code=404, detail="Credential not found")
-
-            username = credential.username
-            password = (
-                encryption_service.decrypt(credential.encrypted_password)
-                if credential.encrypted_password
-                else None
-            )
-            private_key = (
-                encryption_service.decrypt(credential.encrypted_private_key)
-                if credential.encrypted_private_key
-                else None
-            )
-        else:
-            raise HTTPException(
-                status_code=400, detail="credential_id required when using server_id"
+        # Load from saved server (single joined query, cached)
+        try:
+            params = await credential_resolver.resolve(
+                db, session_data.server_id, session_data.credential_id
             )
+        except ResolutionError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+        host = params.host
+        port = params.port
+        server_name = params.server_name
+        username = params.username
+        password = params.password
+        private_key = params.private_key
+        passphrase = params.passphrase
+        key_cache_key = params.key_cache_key
+        credential_id = params.credential_id
+        idle_timeout = params.session_timeout
 
     else:
         # Direct connection parameters
@@ -113,7 +140,10 @@ async def create_session(
         username = session_data.username
         password = session_data.password
         private_key = session_data.private_key
+        passphrase = session_data.passphrase
+        key_cache_key = None
         server_name = host
+        idle_timeout = None
 
     # Establish SSH connection
     success, error = await ssh_manager.create_connection(
@@ -124,17 +154,26 @@ async def create_session(
         password=password,
         private_key=private_key,
         server_name=server_name,
+        passphrase=passphrase,
+        key_cache_key=key_cache_key,
+        idle_timeout=idle_timeout,
+        cols=session_data.terminal_cols,
+        rows=session_data.terminal_rows,
     )
 
     if not success:
         raise HTTPException(status_code=500, detail=error or "Failed to connect")
 
     # Create session record
+    connection = ssh_manager.get_connection(session_id)
     session = SSHSession(
         session_id=session_id,
         server_id=session_data.server_id,
-        credential_id=session_data.credential_id,
+        credential_id=credential_id,
         status="active",
+        log_file_path=connection.log_file_path if connection else None,
+        terminal_cols=session_data.terminal_cols,
+        terminal_rows=session_data.terminal_rows,
     )
 
     db.add(session)
@@ -156,16 +195,81 @@ async def close_session(session_id: str, db: AsyncSession = Depends(get_db)):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    # Disconnect SSH
-    await ssh_manager.remove_connection(session_id)
+    # Disconnect SSH (in whichever worker owns it)
+    if not await ssh_manager.remove_connection(session_id):
+        await _call_owner("close", session_id)
 
     # Update session status
     session.status = "closed"
+    session.ended_at = datetime.utcnow()
+    session.end_reason = "user"
     await db.commit()
 
     return None
 
 
+@router.get("/{session_id}/stats")
+async def get_session_stats(session_id: str):
+    """Get live data plane statistics for an active session"""
+    connection = ssh_manager.get_connection(session_id)
+
+    if connection:
+        stats = connection.get_stats()
+    else:
+        stats = await _call_owner("stats", session_id)
+
+    if not stats:
+        raise HTTPException(status_code=404, detail="Active session not found")
+
+    return {"session_id": session_id, **stats}
+
+
+@router.get("/{session_id}/screen")
+async def get_session_screen(
+    session_id: str, since: int = 0, fmt: str = Query("text", alias="format")
+):
+    """
+    Get the current screen of an active session
+
+    Returns the full screen, or only the rows changed since screen version
+    ``since``. ``format=ansi`` keeps colours and attributes as SGR sequences.
+    Requires SCREEN_MODEL_ENABLED and the pyte package.
+    """
+    if not settings.screen_model_enabled:
+        raise HTTPException(status_code=404, detail="Screen model is disabled")
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FORMATS)}")
+
+    args = {"since": since, "fmt": fmt}
+    connection = ssh_manager.get_connection(session_id)
+    if connection:
+        screen = await connection.get_screen(**args)
+    else:
+        screen = await _call_owner("screen", session_id, args)
+
+    if not screen:
+        raise HTTPException(status_code=404, detail="Screen not available for this session")
+
+    return {"session_id": session_id, **screen}
+
+
+async def _call_owner(op: str, session_id: str, args: Optional[dict] = None):
+    """Run an operation on the worker that owns a session, if another one does"""
+    if not settings.session_relay_enabled:
+        return None
+
+    owner = await session_registry.lookup(session_id)
+    if not owner or session_registry.is_local(owner) or owner.node != session_registry.node:
+        return None
+
+    try:
+        return await session_relay.request(owner.socket_path, op, session_id, args)
+    except RelayUnavailable as e:
+        logger.warning(f"Owner of session {session_id} unreachable: {e}")
+        await session_registry.forget(session_id, owner.worker_id)
+        return None
+
+
 @router.get("/active/count")
 async def get_active_session_count():
     """Get count of active SSH sessions"""
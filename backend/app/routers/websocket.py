@@ -4,8 +4,27 @@ WebSocket router for SSH terminal communication
 import asyncio
 import json
 import logging
+import time
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from sqlalchemy import select
+from ..database import AsyncSessionLocal
+from ..models.session import SSHSession
 from ..services.ssh_manager import ssh_manager
+from ..services.log_tail import SessionLogError, log_tail, session_log_path
+from ..services.metrics import websocket_send_latency
+from ..services.session_registry import session_registry
+from ..services.session_relay import session_relay, RelayUnavailable
+from ..services.output_hub import POLICIES, POLICY_BLOCK, DropNotice, OutputFrame
+from ..config import settings
+from ..services.terminal_protocol import (
+    PROTOCOL_BINARY,
+    FRAME_INPUT,
+    OutputDecoder,
+    negotiate_protocol,
+    parse_offset,
+    encode_output_frame,
+    decode_client_frame,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -17,23 +36,50 @@ async def websocket_ssh_endpoint(websocket: WebSocket, session_id: str):
     """
     WebSocket endpoint for SSH terminal communication
 
-    Protocol:
+    Protocol (``?protocol=json``, the default):
         Client -> Server:
             {"type": "input", "data": "command"}
             {"type": "resize", "cols": 80, "rows": 24}
 
         Server -> Client:
             {"type": "output", "data": "terminal output"}
-            {"type": "connected"}
+            {"type": "connected", "protocol": "json", "offset": 0, ...}
+            {"type": "dropped", "offset": 123, "bytes": 45}
             {"type": "disconnected", "reason": "..."}
             {"type": "error", "message": "..."}
+
+    Protocol (``?protocol=binary``):
+        Output and input are binary frames: one type byte followed by raw
+        bytes (0x01 output, 0x02 input). Control messages are the same JSON
+        text frames as above.
+
+    Reattach (``?offset=N``):
+        N is the number of raw output bytes the client has already
+        rendered. Output after N still held in the session scrollback is
+        replayed before live output; ``connected`` reports the offset of the
+        first byte sent and ``truncated`` if output between N and that
+        offset has been overwritten.
+
+    Viewers:
+        Any number of WebSockets can watch one session. ``?mode=view``
+        attaches a read-only observer whose input and resizes are ignored.
+        ``?policy=block|drop|disconnect`` picks what happens when this
+        viewer falls behind: hold up the session, skip output (reported by
+        a ``dropped`` message with the offset to resume counting from) or
+        get disconnected. Read-only viewers cannot use ``block``.
     """
     await websocket.accept()
-    logger.info(f"WebSocket connected for session {session_id}")
+    protocol = negotiate_protocol(websocket.query_params.get("protocol"))
+    logger.info(f"WebSocket connected for session {session_id} ({protocol})")
 
     # Get SSH connection
     connection = ssh_manager.get_connection(session_id)
 
+    if not connection and settings.session_relay_enabled:
+        # Session may live in another worker process
+        if await relay_to_owner(websocket, session_id):
+            return
+
     if not connection:
         await websocket.send_json({
             "type": "error",
@@ -50,28 +96,135 @@ async def websocket_ssh_endpoint(websocket: WebSocket, session_id: str):
         await websocket.close()
         return
 
-    # Setup data callback to forward SSH output to WebSocket
-    async def on_ssh_data(data: bytes):
-        """Forward SSH data to WebSocket"""
-        try:
-            await websocket.send_json({
-                "type": "output",
-                "data": data.decode("utf-8", errors="replace")
-            })
-        except Exception as e:
-            logger.error(f"Failed to send SSH output: {e}")
+    if len(connection.output_hub.viewers) >= settings.max_viewers:
+        await websocket.send_json({
+            "type": "error",
+            "message": f"SSH session {session_id} has too many viewers"
+        })
+        await websocket.close()
+        return
+
+    read_only = websocket.query_params.get("mode") == "view"
+    policy = websocket.query_params.get("policy")
+    if policy not in POLICIES or (read_only and policy == POLICY_BLOCK):
+        # Observers never hold up the session
+        policy = settings.observer_slow_policy if read_only else settings.viewer_slow_policy
+
+    offset = parse_offset(websocket.query_params.get("offset"))
+    viewer, start, replay = connection.attach(protocol, policy, read_only, offset)
+    logger.info(
+        f"Viewer {viewer.viewer_id} attached to session {session_id} ({policy}"
+        f"{', read-only' if read_only else ''}), replaying {len(replay)} bytes from {start}"
+    )
+
+    # Replay is specific to this viewer, so it is encoded here; live frames
+    # arrive already encoded by the output hub
+    if protocol == PROTOCOL_BINARY:
+        def encode_replay(data: bytes):
+            return encode_output_frame(data)
+
+        async def send_frame(frame: OutputFrame):
+            await websocket.send_bytes(frame.binary)
+    else:
+        decoder = OutputDecoder()
 
-    # Register callback
-    connection.on_data = on_ssh_data
+        def encode_replay(data: bytes):
+            text = decoder.decode(data)
+            return json.dumps({"type": "output", "data": text}) if text else None
 
-    # Send connected message
-    await websocket.send_json({"type": "connected"})
+        async def send_frame(frame: OutputFrame):
+            if frame.text is not None:
+                await websocket.send_text(frame.text)
+
+    async def forward_output():
+        """Send the replay, then this viewer's live frames, in order"""
+        send_latency = websocket_send_latency.labels(protocol)
+
+        await websocket.send_json({
+            "type": "connected",
+            "protocol": protocol,
+            "offset": start,
+            "truncated": offset is not None and start > offset,
+            "viewer": viewer.viewer_id,
+            "read_only": read_only,
+            "policy": policy,
+        })
+
+        view = memoryview(replay)
+        for chunk_start in range(0, len(view), settings.output_coalesce_max_bytes):
+            payload = encode_replay(
+                bytes(view[chunk_start:chunk_start + settings.output_coalesce_max_bytes])
+            )
+            if isinstance(payload, bytes):
+                await websocket.send_bytes(payload)
+            elif payload:
+                await websocket.send_text(payload)
+
+        while True:
+            item = await viewer.get()
+            if item is None:
+                break
+
+            try:
+                if isinstance(item, DropNotice):
+                    # Slow viewer skipped output; let it resynchronise
+                    await websocket.send_json({
+                        "type": "dropped",
+                        "offset": item.offset,
+                        "bytes": item.dropped_bytes,
+                    })
+                    continue
+
+                started = time.perf_counter()
+                await send_frame(item)
+                send_latency.observe(time.perf_counter() - started)
+            except Exception as e:
+                logger.error(f"Failed to send SSH output: {e}")
+                return
+
+        try:
+            if viewer.evicted:
+                await websocket.send_json({
+                    "type": "error",
+                    "message": "Viewer fell too far behind and was disconnected"
+                })
+            else:
+                # Viewer closed: the SSH connection is gone
+                await websocket.send_json({
+                    "type": "disconnected",
+                    "reason": "SSH connection closed"
+                })
+            await websocket.close()
+        except Exception:
+            pass
+
+    output_task = asyncio.create_task(forward_output())
 
     try:
         # Main message loop
         while True:
             # Receive message from WebSocket
-            message = await websocket.receive_text()
+            received = await websocket.receive()
+
+            if received["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(received.get("code", 1000))
+
+            if received.get("bytes") is not None:
+                # Binary frame
+                try:
+                    frame_type, payload = decode_client_frame(received["bytes"])
+                except ValueError as e:
+                    logger.error(f"Invalid binary frame: {e}")
+                    continue
+
+                if frame_type == FRAME_INPUT:
+                    if not read_only:
+                        await connection.send(payload)
+                else:
+                    logger.warning(f"Unknown frame type: {frame_type}")
+                continue
+
+            message = received.get("text") or ""
 
             try:
                 data = json.loads(message)
@@ -79,14 +232,15 @@ async def websocket_ssh_endpoint(websocket: WebSocket, session_id: str):
 
                 if msg_type == "input":
                     # User input - send to SSH
-                    user_input = data.get("data", "")
-                    await connection.send(user_input)
+                    if not read_only:
+                        await connection.send(data.get("data", ""))
 
                 elif msg_type == "resize":
-                    # Terminal resize
-                    cols = data.get("cols", 80)
-                    rows = data.get("rows", 24)
-                    await connection.resize(cols, rows)
+                    # Terminal resize (the PTY size belongs to interactive viewers)
+                    if not read_only:
+                        cols = data.get("cols", 80)
+                        rows = data.get("rows", 24)
+                        await connection.resize(cols, rows)
 
                 elif msg_type == "ping":
                     # Heartbeat
@@ -110,5 +264,120 @@ async def websocket_ssh_endpoint(websocket: WebSocket, session_id: str):
 
     finally:
         # Cleanup
-        connection.on_data = None
+        connection.detach(viewer)
+        output_task.cancel()
         logger.info(f"WebSocket handler finished for session {session_id}")
+
+
+@router.websocket("/ws/logs/{session_id}")
+async def websocket_log_tail(websocket: WebSocket, session_id: str):
+    """
+    WebSocket endpoint following a session's log as it is written
+
+    Works for active and ended sessions of any worker; the log is found
+    through the session record. ``?offset=N`` starts at byte N of the log
+    (e.g. where a download ended); by default the last
+    ``LOG_TAIL_BACKLOG_BYTES`` are sent first.
+
+    Server -> Client:
+        {"type": "log", "offset": 0, "data": "[...] OUTPUT: ...\\n"}
+        {"type": "end", "offset": 1234}  (session over, log complete)
+        {"type": "error", "message": "..."}
+    """
+    await websocket.accept()
+
+    try:
+        async with AsyncSessionLocal() as db:
+            path = await session_log_path(db, session_id)
+    except SessionLogError as e:
+        await websocket.send_json({
+            "type": "error",
+            "message": f"{e} (session {session_id})"
+        })
+        await websocket.close()
+        return
+
+    offset = parse_offset(websocket.query_params.get("offset"))
+    if offset is None:
+        offset = await asyncio.get_running_loop().run_in_executor(
+            None, log_tail.start_offset, path, settings.log_tail_backlog_bytes
+        )
+    logger.info(f"Log tail attached to session {session_id} at offset {offset}")
+
+    async def is_active() -> bool:
+        if ssh_manager.get_connection(session_id):
+            return True
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(SSHSession.status).where(SSHSession.session_id == session_id)
+            )
+            return result.scalar_one_or_none() == "active"
+
+    async def forward_log():
+        """Send the log from the offset until the session ends"""
+        end = offset
+        try:
+            async for start, data in log_tail.follow(path, offset, is_active):
+                await websocket.send_json({
+                    "type": "log",
+                    "offset": start,
+                    "data": data.decode("utf-8", errors="replace"),
+                })
+                end = start + len(data)
+            await websocket.send_json({"type": "end", "offset": end})
+            await websocket.close()
+        except Exception as e:
+            logger.error(f"Log tail for session {session_id} failed: {e}")
+
+    forward_task = asyncio.create_task(forward_log())
+
+    try:
+        while True:
+            received = await websocket.receive()
+            if received["type"] == "websocket.disconnect":
+                break
+            try:
+                if json.loads(received.get("text") or "{}").get("type") == "ping":
+                    await websocket.send_json({"type": "pong"})
+            except (json.JSONDecodeError, AttributeError):
+                pass
+    except Exception:
+        pass  # closed by forward_log
+
+    finally:
+        forward_task.cancel()
+        logger.info(f"Log tail finished for session {session_id}")
+
+
+async def relay_to_owner(websocket: WebSocket, session_id: str) -> bool:
+    """
+    Relay the WebSocket to the worker that owns the session
+
+    Args:
+        websocket: Accepted client WebSocket
+        session_id: Session identifier
+
+    Returns:
+        True if the session was relayed, False if no other worker owns it
+    """
+    owner = await session_registry.lookup(session_id)
+    if not owner or session_registry.is_local(owner):
+        return False
+
+    if owner.node != session_registry.node:
+        await websocket.send_json({
+            "type": "error",
+            "message": f"SSH session {session_id} is owned by node {owner.node}"
+        })
+        await websocket.close()
+        return True
+
+    try:
+        logger.info(f"Relaying session {session_id} to worker {owner.worker_id}")
+        await session_relay.relay(websocket, owner.socket_path, session_id)
+    except RelayUnavailable as e:
+        logger.warning(f"Owner of session {session_id} unreachable: {e}")
+        await session_registry.forget(session_id, owner.worker_id)
+        return False
+
+    return True
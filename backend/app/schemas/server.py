@@ -16,6 +16,7 @@ class ServerBase(BaseModel):
     credential_id: Optional[int] = None
     description: Optional[str] = None
     tags: Optional[str] = None
+    session_timeout: Optional[int] = Field(None, ge=0)  # idle seconds, 0 = never
 
 
 class ServerCreate(ServerBase):
@@ -33,6 +34,7 @@ class ServerUpdate(BaseModel):
     credential_id: Optional[int] = None
     description: Optional[str] = None
     tags: Optional[str] = None
+    session_timeout: Optional[int] = Field(None, ge=0)
 
 
 class ServerResponse(ServerBase):
@@ -6,6 +6,11 @@ from datetime import datetime
 from pydantic import BaseModel, Field
 
 
+# Terminal size bounds, shared with SSHConnection.resize
+MIN_TERMINAL_COLS, MAX_TERMINAL_COLS = 20, 500
+MIN_TERMINAL_ROWS, MAX_TERMINAL_ROWS = 10, 200
+
+
 class SessionCreate(BaseModel):
     """Schema for creating a session"""
     # Option 1: Connect using saved server
@@ -18,10 +23,11 @@ class SessionCreate(BaseModel):
     username: Optional[str] = None
     password: Optional[str] = None
     private_key: Optional[str] = None
+    passphrase: Optional[str] = None
 
     # Terminal settings
-    terminal_cols: int = Field(default=80, ge=20, le=500)
-    terminal_rows: int = Field(default=24, ge=10, le=200)
+    terminal_cols: int = Field(default=80, ge=MIN_TERMINAL_COLS, le=MAX_TERMINAL_COLS)
+    terminal_rows: int = Field(default=24, ge=MIN_TERMINAL_ROWS, le=MAX_TERMINAL_ROWS)
 
 
 class SessionResponse(BaseModel):
@@ -34,8 +40,11 @@ class SessionResponse(BaseModel):
     log_file_path: Optional[str] = None
     started_at: datetime
     ended_at: Optional[datetime] = None
+    end_reason: Optional[str] = None
     terminal_cols: int
     terminal_rows: int
+    bytes_in: int = 0
+    bytes_out: int = 0
 
     class Config:
         from_attributes = True
@@ -43,6 +52,6 @@ class SessionResponse(BaseModel):
 
 class SessionUpdate(BaseModel):
     """Schema for updating session"""
-    terminal_cols: Optional[int] = Field(None, ge=20, le=500)
-    terminal_rows: Optional[int] = Field(None, ge=10, le=200)
+    terminal_cols: Optional[int] = Field(None, ge=MIN_TERMINAL_COLS, le=MAX_TERMINAL_COLS)
+    terminal_rows: Optional[int] = Field(None, ge=MIN_TERMINAL_ROWS, le=MAX_TERMINAL_ROWS)
     status: Optional[str] = Field(None, pattern="^(active|closed|error)$")
@@ -0,0 +1,204 @@
+"""
+AsyncSSH engine (asyncio-native, optional dependency)
+"""
+import asyncio
+import logging
+import socket
+from typing import Optional
+import asyncssh
+from .key_loader import private_key_loader
+from .ssh_engine import EngineSession
+from .ssh_executor import get_connect_executor
+from ..config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class _ShellSession(asyncssh.SSHClientSession):
+    """Forwards channel events to the engine session"""
+
+    def __init__(self, owner: "AsyncSSHSession"):
+        self.owner = owner
+
+    def data_received(self, data: bytes, datatype):
+        self.owner.connection._handle_output(data)
+
+    def eof_received(self) -> bool:
+        self.owner._on_closed()
+        return False
+
+    def connection_lost(self, exc: Optional[Exception]):
+        self.owner._on_closed()
+
+
+class AsyncSSHSession(EngineSession):
+    """
+    Session on an AsyncSSH connection
+
+    Everything but private key parsing (cached, on the connect executor)
+    runs on the event loop: no transport threads and no reactor. Output arrives through ``data_received``,
+    backpressure maps to the channel's ``pause_reading`` (which stops
+    replenishing the SSH window), and input is queued by AsyncSSH's own
+    flow-controlled write buffer.
+    """
+
+    name = "asyncssh"
+
+    def __init__(self, connection):
+        super().__init__(connection)
+        self.conn: Optional[asyncssh.SSHClientConnection] = None
+        self.channel: Optional[asyncssh.SSHClientChannel] = None
+        self._closed = False
+
+        # Input stats
+        self.bytes_sent = 0
+        self.rejected = 0
+
+    async def open(self, width: int = 80, height: int = 24):
+        """Connect, authenticate and start the shell"""
+        conn = self.connection
+        loop = asyncio.get_running_loop()
+        timeout = settings.ssh_connect_timeout
+
+        # Resolve host
+        addresses = await self._timed(
+            "dns", loop.getaddrinfo(conn.host, conn.port, type=socket.SOCK_STREAM)
+        )
+
+        # Parse the key first (cached, off the loop), so a bad key or
+        # passphrase fails before a socket is opened
+        client_keys = None
+        if not conn.password and conn.private_key:
+            key = await self._timed(
+                "key",
+                loop.run_in_executor(
+                    get_connect_executor(),
+                    private_key_loader.load_asyncssh,
+                    conn.private_key,
+                    conn.passphrase,
+                    conn.key_cache_key,
+                ),
+            )
+            client_keys = [key]
+
+        # Open TCP connection
+        sock = await self._timed(
+            "tcp", asyncio.wait_for(self._open_socket(addresses), timeout)
+        )
+
+        # Key exchange and authentication
+        try:
+            self.conn = await self._timed(
+                "handshake",
+                asyncio.wait_for(
+                    asyncssh.connect(
+                        sock=sock,
+                        host=conn.host,
+                        port=conn.port,
+                        username=conn.username,
+                        password=conn.password,
+                        client_keys=client_keys,
+                        known_hosts=None,  # accepted as-is, same as the Paramiko engine
+                        preferred_auth="password,publickey,none",
+                        config=None,
+                        agent_path=None,
+                    ),
+                    timeout,
+                ),
+            )
+        except BaseException:
+            sock.close()
+            raise
+
+        # Open channel, request PTY and shell
+        self.channel, _ = await self._timed(
+            "channel",
+            asyncio.wait_for(
+                self.conn.create_session(
+                    lambda: _ShellSession(self),
+                    term_type="xterm-256color",
+                    term_size=(width, height),
+                    encoding=None,
+                ),
+                timeout,
+            ),
+        )
+
+    @staticmethod
+    async def _open_socket(addresses: list) -> socket.socket:
+        """Connect to the first reachable resolved address"""
+        loop = asyncio.get_running_loop()
+        last_error: Optional[Exception] = None
+        for family, socktype, proto, _, address in addresses:
+            sock = socket.socket(family, socktype, proto)
+            sock.setblocking(False)
+            try:
+                await loop.sock_connect(sock, address)
+                return sock
+            except OSError as e:
+                last_error = e
+                sock.close()
+        raise last_error or OSError("No address to connect to")
+
+    def write(self, data: bytes) -> bool:
+        """Queue input on the channel, rejecting it past the input limit"""
+        if self._closed or not self.channel:
+            return False
+
+        if self.channel.get_write_buffer_size() + len(data) > settings.input_queue_max_bytes:
+            self.rejected += 1
+            logger.warning("Input queue full, dropping input")
+            return False
+
+        self.channel.write(data)
+        self.bytes_sent += len(data)
+        return True
+
+    def resize(self, width: int, height: int):
+        """Change the PTY size"""
+        self.channel.change_terminal_size(width, height)
+
+    def pause_reading(self):
+        """Stop delivering output; the SSH window is no longer replenished"""
+        if self.channel:
+            self.channel.pause_reading()
+
+    def resume_reading(self):
+        """Resume delivering output"""
+        if self.channel:
+            self.channel.resume_reading()
+
+    async def close(self):
+        """Close the channel and the connection"""
+        self._closed = True
+
+        if self.channel:
+            self.channel.close()
+            self.channel = None
+
+        if self.conn:
+            ssh_conn = self.conn
+            self.conn = None
+            ssh_conn.close()
+            try:
+                await asyncio.wait_for(ssh_conn.wait_closed(), settings.ssh_connect_timeout)
+            except Exception:
+                pass
+
+    def get_input_stats(self) -> Optional[dict]:
+        """Get input statistics"""
+        if not self.channel:
+            return None
+        return {
+            "pending_bytes": self.channel.get_write_buffer_size(),
+            "bytes_sent": self.bytes_sent,
+            "rejected": self.rejected,
+        }
+
+    def _on_closed(self):
+        """Report EOF once to the owning connection"""
+        if self._closed:
+            return
+        self._closed = True
+        self.connection._handle_eof()
@@ -0,0 +1,257 @@
+"""
+Resolve saved servers and credentials into connection parameters
+"""
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import settings
+from ..models.server import SSHServer
+from ..models.credential import Credential
+from .encryption import encryption_service
+
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[int, Optional[int]]
+
+# (server updated_at, credential id, credential updated_at)
+Version = Tuple[datetime, Optional[int], Optional[datetime]]
+
+
+class ResolutionError(Exception):
+    """Raised when a server or credential cannot be resolved"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class ConnectionParams:
+    """Decrypted connection parameters for a saved server"""
+
+    def __init__(
+        self,
+        server_id: int,
+        credential_id: int,
+        host: str,
+        port: int,
+        username: str,
+        server_name: str,
+        password: Optional[str] = None,
+        private_key: Optional[str] = None,
+        passphrase: Optional[str] = None,
+        key_cache_key: Optional[tuple] = None,
+        session_timeout: Optional[int] = None,
+    ):
+        self.server_id = server_id
+        self.credential_id = credential_id
+        self.host = host
+        self.port = port
+        self.username = username
+        self.server_name = server_name
+        self.password = password
+        self.private_key = private_key
+        self.passphrase = passphrase
+        self.key_cache_key = key_cache_key
+        self.session_timeout = session_timeout
+
+
+class CredentialResolver:
+    """
+    Loads a server and its credential in one query and caches the result
+
+    Decrypted parameters are kept for ``ttl`` seconds, so a burst of tabs to
+    the same server costs one round of decryption. Each hit is checked
+    against the ``updated_at`` of the server and credential (one indexed
+    lookup), so a change made through any worker is seen on the next
+    resolve; ``invalidate_server`` / ``invalidate_credential`` only free
+    this worker's entries early. The TTL bounds how long secrets stay in
+    memory.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cache: Dict[CacheKey, Tuple[float, Version, ConnectionParams]] = {}
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.resolve_time = 0.0
+        self.resolve_max = 0.0
+
+    async def resolve(
+        self,
+        db: AsyncSession,
+        server_id: int,
+        credential_id: Optional[int] = None,
+    ) -> ConnectionParams:
+        """
+        Get connection parameters for a saved server
+
+        Args:
+            db: Database session
+            server_id: Server ID
+            credential_id: Credential ID, or None to use the server's credential
+
+        Returns:
+            Resolved connection parameters
+
+        Raises:
+            ResolutionError: If the server or credential is missing or incomplete
+        """
+        started = time.perf_counter()
+        key = (server_id, credential_id)
+
+        try:
+            cached = self._cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                if await self._version(db, server_id, credential_id) == cached[1]:
+                    self.hits += 1
+                    return cached[2]
+                self.stale += 1  # changed, possibly through another worker
+            else:
+                self.misses += 1
+            version, params = await self._load(db, server_id, credential_id)
+        finally:
+            self._record(started)
+
+        if len(self._cache) >= self.max_entries:
+            self._prune()
+        self._cache[key] = (time.monotonic() + self.ttl, version, params)
+        return params
+
+    def invalidate_server(self, server_id: int):
+        """
+        Drop cached parameters of a server
+
+        Args:
+            server_id: Server ID
+        """
+        for key in [k for k in self._cache if k[0] == server_id]:
+            del self._cache[key]
+
+    def invalidate_servers(self, server_ids: set):
+        """
+        Drop cached parameters of several servers (bulk updates)
+
+        Args:
+            server_ids: Server IDs
+        """
+        for key in [k for k in self._cache if k[0] in server_ids]:
+            del self._cache[key]
+
+    def invalidate_credential(self, credential_id: int):
+        """
+        Drop cached parameters that use a credential
+
+        Args:
+            credential_id: Credential ID
+        """
+        for key, (_, _, params) in list(self._cache.items()):
+            if params.credential_id == credential_id:
+                del self._cache[key]
+
+    def get_stats(self) -> dict:
+        """
+        Get cache statistics
+
+        Returns:
+            Dict with hit rate and resolution latency
+        """
+        total = self.hits + self.misses + self.stale
+        return {
+            "entries": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_rate": self.hits / total if total else 0.0,
+            "avg_resolve_ms": self.resolve_time / total * 1000 if total else 0.0,
+            "max_resolve_ms": self.resolve_max * 1000,
+        }
+
+    async def _version(
+        self, db: AsyncSession, server_id: int, credential_id: Optional[int]
+    ) -> Optional[Version]:
+        """Current version of a server and credential (None if the server is gone)"""
+        result = await db.execute(
+            select(SSHServer.updated_at, Credential.id, Credential.updated_at)
+            .outerjoin(Credential, self._join_on(credential_id))
+            .where(SSHServer.id == server_id)
+        )
+        row = result.one_or_none()
+        return tuple(row) if row is not None else None
+
+    async def _load(
+        self, db: AsyncSession, server_id: int, credential_id: Optional[int]
+    ) -> Tuple[Version, ConnectionParams]:
+        """Load and decrypt a server and credential with a single query"""
+        result = await db.execute(
+            select(SSHServer, Credential)
+            .outerjoin(Credential, self._join_on(credential_id))
+            .where(SSHServer.id == server_id)
+        )
+        row = result.one_or_none()
+
+        if row is None:
+            raise ResolutionError(404, "Server not found")
+
+        server, credential = row
+        if credential is None:
+            if credential_id is None and server.credential_id is None:
+                raise ResolutionError(400, "credential_id required when using server_id")
+            raise ResolutionError(404, "Credential not found")
+
+        if not server.username:
+            raise ResolutionError(400, "Server has no username configured")
+
+        version = (server.updated_at, credential.id, credential.updated_at)
+        return version, ConnectionParams(
+            server_id=server.id,
+            credential_id=credential.id,
+            host=server.host,
+            port=server.port,
+            username=server.username,
+            server_name=server.name,
+            password=self._decrypt(credential.encrypted_password),
+            private_key=self._decrypt(credential.encrypted_private_key),
+            passphrase=self._decrypt(credential.passphrase_encrypted),
+            key_cache_key=(credential.id, credential.updated_at),
+            session_timeout=server.session_timeout,
+        )
+
+    @staticmethod
+    def _join_on(credential_id: Optional[int]):
+        """Join condition for the requested credential or the server's own"""
+        return Credential.id == (
+            credential_id if credential_id is not None else SSHServer.credential_id
+        )
+
+    @staticmethod
+    def _decrypt(value: Optional[str]) -> Optional[str]:
+        """Decrypt an optional stored secret"""
+        return encryption_service.decrypt(value) if value else None
+
+    def _prune(self):
+        """Drop expired entries, then the oldest ones if still full"""
+        now = time.monotonic()
+        for key in [k for k, (expires, _, _) in self._cache.items() if expires <= now]:
+            del self._cache[key]
+
+        while len(self._cache) >= self.max_entries:
+            del self._cache[next(iter(self._cache))]
+
+    def _record(self, started: float):
+        """Accumulate resolution latency"""
+        elapsed = time.perf_counter() - started
+        self.resolve_time += elapsed
+        self.resolve_max = max(self.resolve_max, elapsed)
+
+
+# Global credential resolver instance
+credential_resolver = CredentialResolver(ttl=settings.credential_cache_ttl)
@@ -0,0 +1,207 @@
+"""
+File responses with HTTP Range support
+"""
+import os
+from email.utils import formatdate
+from typing import BinaryIO, Optional, Tuple
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+
+# Bytes per read when the server cannot send the file itself
+CHUNK_SIZE = 256 * 1024
+
+# ASGI extension for servers that hand the file to sendfile(2)
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+
+class RangeNotSatisfiable(ValueError):
+    """Raised when no byte of a requested range lies within the file"""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a ``Range`` header for one file
+
+    Only single ranges are served; a multi-range request gets the whole
+    file, which RFC 9110 allows.
+
+    Args:
+        header: Value of the ``Range`` header, if any
+        size: Current file size
+
+    Returns:
+        Tuple of (first byte, last byte) inclusive, or None for the whole file
+
+    Raises:
+        RangeNotSatisfiable: If the range starts past the end of the file
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, _, last = spec.strip().partition("-")
+    try:
+        start = int(first) if first else None
+        end = int(last) if last else None
+    except ValueError:
+        return None  # malformed ranges are ignored
+
+    if start is None:
+        # Suffix range: the last N bytes
+        if end is None or end < 0:
+            return None
+        if end == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(0, size - end), size - 1
+
+    if start < 0 or (end is not None and end < start):
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    return start, size - 1 if end is None else min(end, size - 1)
+
+
+class FileRangeResponse(Response):
+    """
+    Response with one byte range of a file
+
+    The file is never read into memory: servers offering the zero-copy
+    send extension are handed the open file (sendfile), others get it in
+    ``CHUNK_SIZE`` reads from the threadpool. The file is opened when the
+    response starts, so a log that grows meanwhile is served up to the
+    size it had when the request was answered.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        start: int,
+        length: int,
+        status_code: int = 200,
+        headers: Optional[dict] = None,
+        media_type: Optional[str] = None,
+        send_body: bool = True,
+        background: Optional[BackgroundTask] = None,
+    ):
+        """
+        Args:
+            path: File to send
+            start: Offset of the first byte
+            length: Number of bytes to send
+            status_code: 200, or 206 for a range
+            headers: Extra response headers
+            media_type: Content type
+            send_body: False for HEAD requests
+            background: Task run after the response
+        """
+        self.path = path
+        self.start = start
+        self.length = length
+        self.send_body = send_body
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = background
+        self.init_headers(headers)
+        self.headers["content-length"] = str(length)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+
+        if not self.send_body or not self.length:
+            await send({"type": "http.response.body", "body": b""})
+        else:
+            f = await run_in_threadpool(open, self.path, "rb")
+            try:
+                if ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+                    await send({
+                        "type": ZEROCOPY_EXTENSION,
+                        "file": f,
+                        "offset": self.start,
+                        "count": self.length,
+                    })
+                else:
+                    await self._send_chunks(f, send)
+            finally:
+                f.close()
+
+        if self.background is not None:
+            await self.background()
+
+    async def _send_chunks(self, f: BinaryIO, send: Send):
+        position = self.start
+        remaining = self.length
+        while remaining:
+            data = await run_in_threadpool(_read_at, f, position, min(CHUNK_SIZE, remaining))
+            if not data:
+                break  # truncated meanwhile; the client sees a short body
+            position += len(data)
+            remaining -= len(data)
+            await send({"type": "http.response.body", "body": data, "more_body": bool(remaining)})
+        if remaining:
+            await send({"type": "http.response.body", "body": b""})
+
+
+def file_response(
+    request: Request,
+    path: str,
+    media_type: str,
+    filename: Optional[str] = None,
+) -> Response:
+    """
+    Answer a GET or HEAD for a file, honouring ``Range`` and ``If-Range``
+
+    Args:
+        request: Incoming request
+        path: File to serve
+        media_type: Content type
+        filename: Download name for ``Content-Disposition``
+
+    Returns:
+        200 with the whole file, 206 with the requested range, or 416
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    headers = {
+        "accept-ranges": "bytes",
+        "etag": etag,
+        "last-modified": formatdate(stat.st_mtime, usegmt=True),
+    }
+    if filename:
+        headers["content-disposition"] = f'attachment; filename="{filename}"'
+
+    header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range and if_range not in (etag, headers["last-modified"]):
+        header = None  # changed since the client's copy: send it all
+
+    try:
+        byte_range = parse_range(header, size)
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={**headers, "content-range": f"bytes */{size}"})
+
+    send_body = request.method != "HEAD"
+    if byte_range is None:
+        return FileRangeResponse(path, 0, size, 200, headers, media_type, send_body)
+
+    start, end = byte_range
+    headers["content-range"] = f"bytes {start}-{end}/{size}"
+    return FileRangeResponse(path, start, end - start + 1, 206, headers, media_type, send_body)
+
+
+def _read_at(f: BinaryIO, position: int, size: int) -> bytes:
+    f.seek(position)
+    return f.read(size)
@@ -0,0 +1,137 @@
+"""
+Idle session reaper
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from .timer_wheel import TimerWheel
+from .metrics import ssh_sessions_reaped
+
+
+logger = logging.getLogger(__name__)
+
+ExpireHandler = Callable[[str], Awaitable[None]]
+
+
+class IdleReaper:
+    """
+    Closes sessions that have seen no input or output for their timeout
+
+    Activity only stamps ``connection.last_activity`` (an attribute write
+    on every input and output event). Each session sits in a timer wheel
+    at its tentative deadline; when that fires, the reaper checks the real
+    last activity and either re-files the session at its new deadline or
+    hands it to the expiry handler. A session is therefore moved in the
+    wheel at most once per timeout period, however busy it is.
+    """
+
+    def __init__(self, tick: float = 1.0):
+        """
+        Args:
+            tick: Wheel resolution in seconds
+        """
+        self.tick = tick
+        self.wheel = TimerWheel(time.monotonic(), tick=tick)
+        self._sessions: Dict[str, Tuple[object, float]] = {}  # id -> (connection, timeout)
+        self._handler: Optional[ExpireHandler] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Stats
+        self.reaped = 0
+        self.refiled = 0
+
+    def start(self, handler: ExpireHandler):
+        """
+        Start the reaper
+
+        Args:
+            handler: Called with the session id of each idle session
+        """
+        self._handler = handler
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the reaper"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def track(self, session_id: str, connection, timeout: float):
+        """
+        Start idle tracking for a session
+
+        Args:
+            session_id: Session identifier
+            connection: SSHConnection with a ``last_activity`` timestamp
+            timeout: Idle timeout in seconds; 0 or less disables reaping
+        """
+        if timeout <= 0:
+            return
+        self._sessions[session_id] = (connection, timeout)
+        self.wheel.schedule(session_id, connection.last_activity + timeout)
+
+    def untrack(self, session_id: str):
+        """
+        Stop idle tracking for a session
+
+        Args:
+            session_id: Session identifier
+        """
+        if self._sessions.pop(session_id, None):
+            self.wheel.cancel(session_id)
+
+    def get_stats(self) -> dict:
+        """
+        Get reaper statistics
+
+        Returns:
+            Dict with tracked, reaped and re-filed session counts
+        """
+        return {
+            "tracked": len(self._sessions),
+            "reaped": self.reaped,
+            "refiled": self.refiled,
+        }
+
+    async def _run(self):
+        """Advance the wheel once per tick"""
+        while True:
+            await asyncio.sleep(self.tick)
+            try:
+                await self._expire(time.monotonic())
+            except Exception as e:
+                logger.error(f"Idle reaper failed: {e}")
+
+    async def _expire(self, now: float):
+        """Reap the sessions whose deadline passed without activity"""
+        for session_id in self.wheel.advance(now):
+            entry = self._sessions.get(session_id)
+            if not entry:
+                continue
+
+            connection, timeout = entry
+            deadline = connection.last_activity + timeout
+            if deadline > now:
+                # Active since it was filed
+                self.refiled += 1
+                self.wheel.schedule(session_id, deadline)
+                continue
+
+            del self._sessions[session_id]
+            self.reaped += 1
+            ssh_sessions_reaped.inc()
+            logger.info(f"Reaping session {session_id} after {int(now - connection.last_activity)}s idle")
+            try:
+                await self._handler(session_id)
+            except Exception as e:
+                logger.error(f"Failed to reap session {session_id}: {e}")
+
+
+# Global idle reaper instance
+idle_reaper = IdleReaper()
@@ -0,0 +1,232 @@
+"""
+Flow-controlled input writer for SSH channels
+"""
+import asyncio
+import logging
+import socket
+import threading
+from collections import deque
+from typing import Callable, Deque, Optional
+from paramiko.channel import Channel
+from .ssh_executor import get_input_executor
+
+
+logger = logging.getLogger(__name__)
+
+
+class _WindowCondition(threading.Condition):
+    """
+    Channel send-window condition that also calls back on every notify
+
+    Paramiko notifies ``Channel.out_buffer_cv`` from its transport thread
+    when the server grows the window (window adjust) and when the channel
+    closes; installed in its place, this passes those moments on.
+    ``out_buffer_cv`` is a Paramiko internal, so InputWriter falls back to
+    polling the window when a channel does not have one.
+    """
+
+    def __init__(self, lock, callback: Callable[[], None]):
+        super().__init__(lock)
+        self._callback = callback
+
+    def notify_all(self):
+        super().notify_all()
+        self._callback()
+
+
+class InputWriter:
+    """
+    Per-session input queue that respects the SSH channel send window
+
+    ``channel.send`` on a non-blocking channel sends at most what fits in the
+    remote window (and one packet) and raises ``socket.timeout`` when the
+    window is exhausted, but it can still block: during a key re-exchange
+    until it completes, and when the socket buffer is full. Sends therefore
+    run on the input executor, one at a time per session, merging queued
+    chunks into larger sends. While the window is exhausted the writer waits
+    for the server's window adjust, which Paramiko signals through the
+    channel's send-window condition. Every wait is bounded, so a missed
+    signal only delays input rather than stalling it.
+    """
+
+    # Largest merged send; Paramiko caps a single send at one packet anyway
+    MAX_SEND = 32768
+
+    # Longest wait for a window adjust signal before retrying the send
+    WINDOW_WAIT = 1.0
+
+    # Retry interval when the channel has no send-window condition to hook
+    WINDOW_POLL = 0.05
+
+    def __init__(self, channel: Channel, max_pending_bytes: int = 8 * 1024 * 1024):
+        """
+        Must be called from the event loop thread.
+
+        Args:
+            channel: Open non-blocking Paramiko channel
+            max_pending_bytes: Reject writes once this much input is queued
+        """
+        self.channel = channel
+        self.max_pending_bytes = max_pending_bytes
+
+        self._pending: Deque[bytes] = deque()
+        self._pending_bytes = 0
+        self._buffer = b""  # partially sent data owned by the sender task
+        self._wakeup: Optional[asyncio.Event] = None
+        self._window_open = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+        self._loop = asyncio.get_running_loop()
+        self._window_wait = self.WINDOW_WAIT
+        if isinstance(getattr(channel, "out_buffer_cv", None), threading.Condition):
+            channel.out_buffer_cv = _WindowCondition(channel.lock, self._on_window_change)
+        else:
+            logger.warning("Channel has no send-window condition, polling the window instead")
+            self._window_wait = self.WINDOW_POLL
+
+        # Stats
+        self.bytes_sent = 0
+        self.sends = 0
+        self.merged_sends = 0
+        self.window_waits = 0
+        self.window_signals = 0
+        self.window_timeouts = 0
+        self.rejected = 0
+
+    def write(self, data: bytes) -> bool:
+        """
+        Queue input for the sender task
+
+        Args:
+            data: Raw input bytes
+
+        Returns:
+            False if the writer is closed or its queue is full
+        """
+        if self._closed:
+            return False
+
+        if not data:
+            return True
+
+        if self._pending_bytes + len(data) > self.max_pending_bytes:
+            self.rejected += 1
+            logger.warning("Input queue full, dropping input")
+            return False
+
+        self._pending.append(data)
+        self._pending_bytes += len(data)
+        self._ensure_task()
+        self._wakeup.set()
+        return True
+
+    def close(self):
+        """Stop the writer and discard queued input"""
+        self._closed = True
+        self._pending.clear()
+        self._pending_bytes = 0
+        self._buffer = b""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def get_stats(self) -> dict:
+        """
+        Get writer statistics
+
+        Returns:
+            Dict with queued bytes and send counters
+        """
+        return {
+            "pending_bytes": self._pending_bytes + len(self._buffer),
+            "bytes_sent": self.bytes_sent,
+            "sends": self.sends,
+            "merged_sends": self.merged_sends,
+            "window_waits": self.window_waits,
+            "window_signals": self.window_signals,
+            "window_timeouts": self.window_timeouts,
+            "rejected": self.rejected,
+        }
+
+    def _on_window_change(self):
+        """Send-window condition callback (Paramiko transport thread)"""
+        if self._closed:
+            return
+        self.window_signals += 1
+        try:
+            self._loop.call_soon_threadsafe(self._window_open.set)
+        except RuntimeError:
+            pass  # event loop already closed
+
+    def _send(self, data: bytes) -> bytes:
+        """
+        Send as much as the window allows (blocking, input executor)
+
+        Returns:
+            The part of data that was not sent
+
+        Raises:
+            EOFError: If the channel is closed
+        """
+        while data:
+            try:
+                sent = self.channel.send(data[:self.MAX_SEND])
+            except socket.timeout:
+                # Remote window exhausted
+                return data
+
+            if sent == 0:
+                raise EOFError("SSH channel closed")
+
+            self.sends += 1
+            self.bytes_sent += sent
+            data = data[sent:]
+        return data
+
+    def _ensure_task(self):
+        """Start the background sender if needed"""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def _take_merged(self) -> bytes:
+        """Pop queued chunks, merging a backlog into one buffer"""
+        parts = [self._pending.popleft()]
+        size = len(parts[0])
+        while self._pending and size + len(self._pending[0]) <= self.MAX_SEND:
+            chunk = self._pending.popleft()
+            parts.append(chunk)
+            size += len(chunk)
+
+        self._pending_bytes -= size
+        if len(parts) > 1:
+            self.merged_sends += 1
+            return b"".join(parts)
+        return parts[0]
+
+    async def _run(self):
+        """Deliver queued input as the channel window allows"""
+        executor = get_input_executor()
+        try:
+            while not self._closed:
+                if not self._buffer:
+                    if not self._pending:
+                        self._wakeup.clear()
+                        await self._wakeup.wait()
+                        continue
+                    self._buffer = self._take_merged()
+
+                # Cleared before sending, so an adjust during the send counts
+                self._window_open.clear()
+                self._buffer = await self._loop.run_in_executor(executor, self._send, self._buffer)
+                if self._buffer:
+                    self.window_waits += 1
+                    try:
+                        await asyncio.wait_for(self._window_open.wait(), self._window_wait)
+                    except asyncio.TimeoutError:
+                        self.window_timeouts += 1
+
+        except Exception as e:
+            logger.error(f"Input writer stopped: {e}")
+            self._closed = True
@@ -0,0 +1,204 @@
+"""
+Private key loading with a bounded in-memory cache
+"""
+import base64
+import binascii
+import logging
+import threading
+from collections import OrderedDict
+from io import StringIO
+from typing import Hashable, Optional
+import paramiko
+from ..config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class KeyLoadError(Exception):
+    """Raised when a private key cannot be parsed"""
+
+
+class PrivateKeyLoader:
+    """
+    Parses RSA, ECDSA and Ed25519 private keys, with or without passphrase
+
+    Parsing (especially of passphrase-protected keys, which run a KDF) is
+    CPU-heavy, so parsed key objects are kept in an LRU cache. Callers pass a
+    cache key of ``(credential_id, updated_at)``; an edited credential gets a
+    new ``updated_at`` and therefore never hits a stale entry, and
+    ``invalidate`` drops entries when a credential changes or is deleted.
+
+    ``load`` is blocking and is meant to run on the connect executor.
+    """
+
+    KEY_CLASSES = (paramiko.RSAKey, paramiko.ECDSAKey, paramiko.Ed25519Key)
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Hashable, paramiko.PKey]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+
+    def load(
+        self,
+        private_key: str,
+        passphrase: Optional[str] = None,
+        cache_key: Optional[tuple] = None,
+    ) -> paramiko.PKey:
+        """
+        Get a parsed private key
+
+        Args:
+            private_key: PEM/OpenSSH private key content
+            passphrase: Passphrase for encrypted keys
+            cache_key: (credential_id, updated_at), or None to skip caching
+
+        Returns:
+            Parsed Paramiko key
+
+        Raises:
+            KeyLoadError: If the key type is unsupported or the passphrase is wrong
+        """
+        return self._cached(cache_key, self._parse, private_key, passphrase)
+
+    def load_asyncssh(
+        self,
+        private_key: str,
+        passphrase: Optional[str] = None,
+        cache_key: Optional[tuple] = None,
+    ):
+        """
+        Get a parsed private key for the AsyncSSH engine
+
+        Shares the cache (and ``invalidate``) with ``load``.
+
+        Args:
+            private_key: PEM/OpenSSH private key content
+            passphrase: Passphrase for encrypted keys
+            cache_key: (credential_id, updated_at), or None to skip caching
+
+        Returns:
+            Parsed ``asyncssh.SSHKey``
+
+        Raises:
+            KeyLoadError: If the key cannot be parsed or the passphrase is wrong
+        """
+        if cache_key is not None:
+            cache_key = tuple(cache_key) + ("asyncssh",)
+        return self._cached(cache_key, self._parse_asyncssh, private_key, passphrase)
+
+    def _cached(self, cache_key: Optional[tuple], parse, private_key: str, passphrase: Optional[str]):
+        """Look a key up in the LRU cache, parsing and storing it on a miss"""
+        if cache_key is not None:
+            with self._lock:
+                key = self._cache.get(cache_key)
+                if key is not None:
+                    self._cache.move_to_end(cache_key)
+                    self.hits += 1
+                    return key
+                self.misses += 1
+
+        key = parse(private_key, passphrase)
+
+        if cache_key is not None:
+            with self._lock:
+                self._cache[cache_key] = key
+                self._cache.move_to_end(cache_key)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+
+        return key
+
+    def invalidate(self, credential_id: int):
+        """
+        Drop all cached keys of a credential
+
+        Args:
+            credential_id: Credential ID
+        """
+        with self._lock:
+            for cache_key in [k for k in self._cache if k[0] == credential_id]:
+                del self._cache[cache_key]
+
+    def get_stats(self) -> dict:
+        """
+        Get cache statistics
+
+        Returns:
+            Dict with cache size and hit/miss counters
+        """
+        return {
+            "entries": len(self._cache),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _parse(self, private_key: str, passphrase: Optional[str]) -> paramiko.PKey:
+        """Try each supported key type in turn, likeliest first"""
+        errors = []
+        for key_class in self._candidates(private_key):
+            try:
+                return key_class.from_private_key(
+                    StringIO(private_key), password=passphrase or None
+                )
+            except paramiko.PasswordRequiredException:
+                raise KeyLoadError("Private key is encrypted and no passphrase was given")
+            except Exception as e:
+                errors.append(f"{key_class.__name__}: {e}")
+
+        logger.debug(f"Private key parse attempts failed: {errors}")
+        raise KeyLoadError("Unsupported private key type or wrong passphrase")
+
+    @staticmethod
+    def _parse_asyncssh(private_key: str, passphrase: Optional[str]):
+        import asyncssh  # optional dependency, only used by that engine
+
+        try:
+            return asyncssh.import_private_key(private_key, passphrase or None)
+        except (asyncssh.KeyImportError, asyncssh.KeyEncryptionError) as e:
+            raise KeyLoadError(f"Cannot load private key: {e}")
+
+    def _candidates(self, private_key: str) -> tuple:
+        """
+        Order key classes by the type the key text advertises
+
+        Every failed attempt on an encrypted key runs the KDF again, so trying
+        the right class first saves most of the parse time. PEM keys name
+        their type in the armor line; OpenSSH keys carry the public key type
+        in plain text ahead of the encrypted section.
+        """
+        hint = private_key[:64]
+        if "BEGIN RSA" in hint:
+            first = paramiko.RSAKey
+        elif "BEGIN EC" in hint:
+            first = paramiko.ECDSAKey
+        elif "BEGIN OPENSSH" in hint:
+            body = "".join(
+                line for line in private_key.strip().splitlines()[1:8]
+                if not line.startswith("-----")
+            )
+            try:
+                head = base64.b64decode(body[:len(body) - len(body) % 4])
+            except (binascii.Error, ValueError):
+                head = b""
+            if b"ssh-ed25519" in head:
+                first = paramiko.Ed25519Key
+            elif b"ecdsa-sha2" in head:
+                first = paramiko.ECDSAKey
+            elif b"ssh-rsa" in head:
+                first = paramiko.RSAKey
+            else:
+                return self.KEY_CLASSES
+        else:
+            return self.KEY_CLASSES
+
+        return (first,) + tuple(k for k in self.KEY_CLASSES if k is not first)
+
+
+# Global private key loader instance
+private_key_loader = PrivateKeyLoader(max_entries=settings.key_cache_size)
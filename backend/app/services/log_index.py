@@ -0,0 +1,511 @@
+"""
+Incremental full-text index over session logs
+"""
+import asyncio
+import logging
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from .log_writer import LogFlush, log_writer
+from .server_search import fts_query
+from ..config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Largest slice of a log indexed as one segment; search reads matching
+# segments back, so this also bounds the cost of a hit
+SEGMENT_MAX_BYTES = 256 * 1024
+
+# Partial line carried into the next segment, so a command typed across
+# a flush is still indexed whole
+TAIL_CHARS = 256
+
+MATCH_TEXT_CHARS = 300
+
+DIRECTIONS = ("input", "output")
+
+_SCHEMA = (
+    "PRAGMA journal_mode=WAL",
+    """
+    CREATE TABLE IF NOT EXISTS log_files (
+        id INTEGER PRIMARY KEY,
+        path TEXT UNIQUE NOT NULL,
+        indexed_bytes INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS log_segments (
+        id INTEGER PRIMARY KEY,
+        file_id INTEGER NOT NULL,
+        offset INTEGER NOT NULL,
+        length INTEGER NOT NULL,
+        started_at TEXT,
+        ended_at TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_log_segments_file_id ON log_segments (file_id, offset)",
+    "CREATE INDEX IF NOT EXISTS ix_log_segments_ended_at ON log_segments (ended_at)",
+    # Contentless: only the index is stored, text is read back from the log
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS log_fts USING fts5(
+        input, output, content='', columnsize=0
+    )
+    """,
+)
+
+# "[2024-01-01 12:00:00] INPUT: >> " / "[2024-01-01 12:00:00] OUTPUT: "
+_RECORD = re.compile(r"\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\] (INPUT: >> |OUTPUT: )")
+_RECORD_LINE = re.compile(r"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\] (?:(INPUT): >> |OUTPUT: )", re.M)
+
+# Escape sequences (CSI, OSC, two-byte) and other control characters
+_ESCAPES = re.compile(
+    r"\x1b\[[0-?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)|\x1b[@-_]|[\x00-\x08\x0b-\x1f]"
+)
+_ERASE = re.compile(r"[^\n][\x08\x7f]")
+
+
+def clean_text(text: str) -> str:
+    """Terminal text as typed or shown: no escapes, backspaces applied"""
+    while "\x7f" in text or "\x08" in text:
+        erased = _ERASE.sub("", text)
+        if erased == text:
+            text = text.replace("\x7f", "").replace("\x08", "")
+            break
+        text = erased
+    return _ESCAPES.sub("", text)
+
+
+def split_directions(data: bytes) -> Tuple[Optional[str], Optional[str], Dict[str, str]]:
+    """
+    Split log data into the text typed and the text shown
+
+    Args:
+        data: Whole lines of a log file
+
+    Returns:
+        Tuple of (first timestamp, last timestamp, direction -> raw text)
+    """
+    # [text before the first record, timestamp, input marker, text, ...]
+    parts = _RECORD_LINE.split(data.decode("utf-8", errors="replace"))
+    texts: Dict[str, List[str]] = {direction: [] for direction in DIRECTIONS}
+    for marker, text in zip(parts[2::3], parts[3::3]):
+        texts["output" if marker is None else "input"].append(text[:-1] if text.endswith("\n") else text)
+    joined = {
+        direction: "".join(chunks).replace("\r\n", "\n").replace("\r", "\n")
+        for direction, chunks in texts.items()
+    }
+    if len(parts) < 4:
+        return None, None, joined
+    return parts[1], parts[-3], joined
+
+
+def parse_records(data: bytes, base: int) -> List[Tuple[int, str, str, str]]:
+    """
+    Split log data into records
+
+    Args:
+        data: Whole lines of a log file
+        base: File offset of ``data``
+
+    Returns:
+        List of (offset, timestamp, direction, text); text is raw apart from
+        line endings, since keystrokes and escapes span records
+    """
+    records = []
+    offset = base
+    lines = data.split(b"\n")
+    if not lines[-1]:
+        lines.pop()  # the final newline ends the last record
+    for line in lines:
+        text = line.decode("utf-8", errors="replace")
+        match = _RECORD.match(text)
+        if match:
+            direction = "input" if match.group(2).startswith("INPUT") else "output"
+            records.append([offset, match.group(1), direction, text[match.end():]])
+        elif records:
+            records[-1][3] += "\n" + text  # output spanning lines
+        offset += len(line) + 1
+    return [(o, ts, d, t.replace("\r\n", "\n").replace("\r", "\n")) for o, ts, d, t in records]
+
+
+class LogIndex:
+    """
+    Inverted index over the input and output of every session log
+
+    The log writer reports each file it flushed; the indexer reads the
+    new bytes of those files (still in the page cache) on its own thread
+    and adds them to an SQLite FTS5 index in a separate database file, one
+    segment per flush. Only the index is stored; search results are read
+    back from the logs, so the index stays a fraction of the log size.
+    Files that grew while the server was down are caught up at startup.
+    """
+
+    def __init__(self, path: str, log_dir: str):
+        """
+        Args:
+            path: Index database file
+            log_dir: Directory of the session logs
+        """
+        self.path = path
+        self.log_dir = log_dir
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-index")
+        self._db: Optional[sqlite3.Connection] = None  # owned by the executor thread
+        self._dirty: Set[str] = set()
+        self._closed: Set[str] = set()
+        self._tails: Dict[str, Dict[str, str]] = {}  # path -> direction -> partial line
+        self._task: Optional[asyncio.Task] = None
+        self.enabled = False
+
+        # Stats (this process)
+        self.bytes_indexed = 0
+        self.segments_indexed = 0
+        self.index_time = 0.0
+        self.failures = 0
+
+    def start(self):
+        """Index new log data on every flush, catching up on older logs first"""
+        if self.enabled:
+            return
+        self.enabled = True
+        log_writer.add_listener(self.notify)
+        self._schedule(catch_up=True)
+
+    async def stop(self):
+        """Finish indexing what has been flushed"""
+        if self._task:
+            await self._task
+        if self._db is not None:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._db.close)
+            self._db = None
+        self._executor.shutdown(wait=True)
+
+    def notify(self, flushes: List[LogFlush]):
+        """
+        Log writer listener: note files with new data
+
+        Args:
+            flushes: Files written or closed by the last flush
+        """
+        for flush in flushes:
+            if flush.size:
+                self._dirty.add(flush.path)
+            if flush.closed:
+                self._closed.add(flush.path)
+        self._schedule()
+
+    async def search(
+        self,
+        q: str,
+        paths: Optional[List[str]] = None,
+        direction: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 100,
+    ) -> List[dict]:
+        """
+        Find log lines matching a query
+
+        Args:
+            q: Search text (lines with every word, the last as a prefix)
+            paths: Only these log files
+            direction: ``input`` or ``output`` only
+            since: Only output from this time on
+            until: Only output before this time
+            limit: Maximum matching lines
+
+        Returns:
+            Matches per log file, most recent first: [{"path", "matches":
+            [{"offset", "timestamp", "direction", "text"}]}]
+        """
+        match = fts_query(q)
+        if match is None or not self.enabled:
+            return []
+        if direction:
+            match = f"{direction} : ({match})"
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self._search, match, q, paths, direction, since, until, limit
+        )
+
+    async def get_index_stats(self) -> dict:
+        """
+        Get index totals (all workers) and this process's indexing cost
+
+        Returns:
+            Dict with file/segment counts, sizes and indexing overhead
+        """
+        loop = asyncio.get_running_loop()
+        totals = await loop.run_in_executor(None, self._totals) if self.enabled else {}
+        return {**totals, **self.get_stats()}
+
+    def get_stats(self) -> dict:
+        """
+        Get indexing statistics of this process
+
+        Returns:
+            Dict with bytes indexed, index size and time per MB
+        """
+        megabytes = self.bytes_indexed / (1024 * 1024)
+        index_bytes = self._index_size()
+        return {
+            "enabled": self.enabled,
+            "index_bytes": index_bytes,
+            "bytes_indexed": self.bytes_indexed,
+            "segments_indexed": self.segments_indexed,
+            "index_seconds": round(self.index_time, 3),
+            "index_ms_per_mb": round(self.index_time * 1000 / megabytes, 1) if megabytes else None,
+            "pending_files": len(self._dirty),
+            "failures": self.failures,
+        }
+
+    def _schedule(self, catch_up: bool = False):
+        if not self.enabled:
+            return
+        if catch_up or (self._dirty and (self._task is None or self._task.done())):
+            previous = self._task
+            self._task = asyncio.create_task(self._drain(previous, catch_up))
+
+    async def _drain(self, previous: Optional[asyncio.Task], catch_up: bool):
+        """Index dirty files on the index thread until none are left"""
+        if previous:
+            await previous
+        loop = asyncio.get_running_loop()
+        if catch_up:
+            await loop.run_in_executor(self._executor, self._catch_up)
+        while self._dirty:
+            paths, self._dirty = self._dirty, set()
+            closed, self._closed = self._closed, set()
+            await loop.run_in_executor(self._executor, self._index_paths, paths, closed)
+
+    # Everything below runs on the index thread
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            for statement in _SCHEMA:
+                self._db.execute(statement)
+        return self._db
+
+    def _catch_up(self):
+        """Index log data written while no indexer was running"""
+        try:
+            db = self._connect()
+            indexed = dict(db.execute("SELECT path, indexed_bytes FROM log_files"))
+            stale = []
+            for root, _, files in os.walk(self.log_dir):
+                for name in files:
+                    if not name.endswith(".log"):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        if os.path.getsize(path) != indexed.get(path, 0):
+                            stale.append(path)
+                    except OSError:
+                        continue
+            if stale:
+                logger.info(f"Indexing {len(stale)} session logs")
+                self._index_paths(stale, set(stale))
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Log index catch-up failed: {e}")
+
+    def _index_paths(self, paths, closed: Set[str]):
+        for path in paths:
+            try:
+                self._index_file(path)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Failed to index {path}: {e}")
+        for path in closed:
+            self._tails.pop(path, None)
+
+    def _index_file(self, path: str):
+        """Index the whole lines appended to a file since the last pass"""
+        db = self._connect()
+        started = time.perf_counter()
+        indexed = 0
+        db.execute("BEGIN IMMEDIATE")  # one indexer per file across workers
+        try:
+            row = db.execute("SELECT id, indexed_bytes FROM log_files WHERE path = ?", (path,)).fetchone()
+            if row is None:
+                file_id = db.execute("INSERT INTO log_files (path) VALUES (?)", (path,)).lastrowid
+                offset = 0
+            else:
+                file_id, offset = row
+
+            size = os.path.getsize(path)
+            if size < offset:
+                # Truncated or replaced: the old segments no longer match the file
+                db.execute("DELETE FROM log_segments WHERE file_id = ?", (file_id,))
+                self._tails.pop(path, None)
+                offset = 0
+
+            with open(path, "rb") as f:
+                while offset < size:
+                    f.seek(offset)
+                    data = f.read(min(SEGMENT_MAX_BYTES, size - offset))
+                    end = data.rfind(b"\n")
+                    if end < 0:
+                        if len(data) < SEGMENT_MAX_BYTES:
+                            break  # partial line, wait for the rest
+                        end = len(data) - 1
+                    data = data[:end + 1]
+                    self._add_segment(db, path, file_id, offset, data)
+                    offset += len(data)
+                    indexed += len(data)
+
+            db.execute("UPDATE log_files SET indexed_bytes = ? WHERE id = ?", (offset, file_id))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+        self.bytes_indexed += indexed
+        self.index_time += time.perf_counter() - started
+
+    def _add_segment(self, db: sqlite3.Connection, path: str, file_id: int, offset: int, data: bytes):
+        started_at, ended_at, raw = split_directions(data)
+        if started_at is None:
+            return
+
+        tails = self._tails.setdefault(path, {})
+        text = {}
+        for direction in DIRECTIONS:
+            joined = tails.get(direction, "") + raw[direction]
+            text[direction] = clean_text(joined)
+            tails[direction] = joined[joined.rfind("\n") + 1:][-TAIL_CHARS:]
+
+        segment_id = db.execute(
+            "INSERT INTO log_segments (file_id, offset, length, started_at, ended_at) VALUES (?, ?, ?, ?, ?)",
+            (file_id, offset, len(data), started_at, ended_at),
+        ).lastrowid
+        db.execute(
+            "INSERT INTO log_fts (rowid, input, output) VALUES (?, ?, ?)",
+            (segment_id, text["input"], text["output"]),
+        )
+        self.segments_indexed += 1
+
+    # Searches run on the default executor with their own connection
+
+    def _search(self, match, q, paths, direction, since, until, limit) -> List[dict]:
+        sql = (
+            "SELECT f.path, s.offset, s.length FROM log_fts"
+            " JOIN log_segments s ON s.id = log_fts.rowid"
+            " JOIN log_files f ON f.id = s.file_id"
+            " WHERE log_fts MATCH ?"
+        )
+        args: list = [match]
+        if since:
+            sql += " AND s.ended_at >= ?"
+            args.append(since.strftime("%Y-%m-%d %H:%M:%S"))
+        if until:
+            sql += " AND s.started_at < ?"
+            args.append(until.strftime("%Y-%m-%d %H:%M:%S"))
+        if paths is not None:
+            if not paths:
+                return []
+            sql += f" AND f.path IN ({', '.join('?' * len(paths))})"
+            args.extend(paths)
+        sql += " ORDER BY s.id DESC"
+
+        since_text = since.strftime("%Y-%m-%d %H:%M:%S") if since else None
+        until_text = until.strftime("%Y-%m-%d %H:%M:%S") if until else None
+        words = [word.lower() for word in re.findall(r"\w+", q)]
+        results: Dict[str, List[dict]] = {}
+        found = 0
+
+        # Segments are read back newest first until enough lines matched
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            for path, offset, length in db.execute(sql, args):
+                try:
+                    with open(path, "rb") as f:
+                        f.seek(offset)
+                        data = f.read(length)
+                except OSError:
+                    continue
+                matches = [
+                    m for m in _matching_lines(parse_records(data, offset), words, direction)
+                    if (not since_text or m["timestamp"] >= since_text)
+                    and (not until_text or m["timestamp"] < until_text)
+                ][:limit - found]
+                if matches:
+                    results.setdefault(path, []).extend(matches)
+                    found += len(matches)
+                    if found >= limit:
+                        break
+        finally:
+            db.close()
+
+        return [{"path": path, "matches": matches} for path, matches in results.items()]
+
+    def _totals(self) -> dict:
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            files, indexed = db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(indexed_bytes), 0) FROM log_files"
+            ).fetchone()
+            segments = db.execute("SELECT COUNT(*) FROM log_segments").fetchone()[0]
+        except sqlite3.OperationalError:
+            files = indexed = segments = 0
+        finally:
+            db.close()
+        index_bytes = self._index_size()
+        return {
+            "files": files,
+            "segments": segments,
+            "log_bytes": indexed,
+            "index_to_log_ratio": round(index_bytes / indexed, 3) if indexed else None,
+        }
+
+    def _index_size(self) -> int:
+        size = 0
+        for suffix in ("", "-wal"):
+            try:
+                size += os.path.getsize(self.path + suffix)
+            except OSError:
+                pass
+        return size
+
+
+def _matching_lines(records, words: List[str], direction: Optional[str]) -> List[dict]:
+    """Lines of a segment containing every query word, keystrokes joined into lines"""
+    lines = []
+    current: Dict[str, list] = {}  # direction -> [offset, timestamp, text]
+    for offset, timestamp, record_direction, text in records:
+        if direction and record_direction != direction:
+            continue
+        for i, part in enumerate(text.split("\n")):
+            if i:
+                line = current.pop(record_direction, None)
+                if line is not None:
+                    lines.append((record_direction, *line))
+            if part:
+                # A line starts at the record holding its first character
+                line = current.setdefault(record_direction, [offset, timestamp, ""])
+                line[2] += part
+    lines.extend((d, *line) for d, line in current.items())
+
+    matches = []
+    for line_direction, offset, timestamp, text in sorted(lines, key=lambda line: line[1]):
+        text = clean_text(text)
+        lowered = text.lower()
+        if text.strip() and all(word in lowered for word in words):
+            matches.append({
+                "offset": offset,
+                "timestamp": timestamp,
+                "direction": line_direction,
+                "text": text.strip()[:MATCH_TEXT_CHARS],
+            })
+    return matches
+
+
+# Global log index instance
+log_index = LogIndex(settings.log_index_path, settings.log_dir)
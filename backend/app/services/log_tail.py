@@ -0,0 +1,217 @@
+"""
+Live tail of session logs
+"""
+import asyncio
+import logging
+import os
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy import func, select
+from .log_writer import LogFlush, log_writer
+from ..config import settings
+from ..models.session import SSHSession
+
+
+logger = logging.getLogger(__name__)
+
+# Most bytes sent per message
+READ_BYTES = 64 * 1024
+
+
+class SessionLogError(LookupError):
+    """Raised when a session has no log of its own to serve"""
+
+
+class SharedLogError(SessionLogError):
+    """Raised for a log file recorded for more than one session"""
+
+
+async def session_log_path(db, session_id: str) -> str:
+    """
+    Locate a session's log through its session record
+
+    Logs named before the session ID was part of the name can belong to
+    several sessions opened in the same second; those are never served,
+    since they hold other sessions' input and output.
+
+    Args:
+        db: Database session
+        session_id: Session identifier
+
+    Returns:
+        Path of the session's log
+
+    Raises:
+        SessionLogError: If the session or its log does not exist
+        SharedLogError: If other sessions share the log
+    """
+    result = await db.execute(
+        select(SSHSession.log_file_path).where(SSHSession.session_id == session_id)
+    )
+    row = result.one_or_none()
+
+    if row is None:
+        raise SessionLogError("Session not found")
+
+    path = row.log_file_path
+    if not path or not os.path.exists(path):
+        raise SessionLogError("Log not found")
+
+    result = await db.execute(
+        select(func.count()).select_from(SSHSession).where(SSHSession.log_file_path == path)
+    )
+    if result.scalar_one() > 1:
+        raise SharedLogError("Log is shared with other sessions")
+
+    return path
+
+
+class _Follower:
+    """One tail of one log file"""
+
+    __slots__ = ("event", "closed")
+
+    def __init__(self):
+        self.event = asyncio.Event()
+        self.closed = False
+
+
+class LogTail:
+    """
+    Follows session logs as the log writer appends to them
+
+    Followers of a log written by this process are woken by the log
+    writer's flush notifications, so new lines arrive one flush after
+    they were logged, without polling. Logs written by another worker
+    are polled every ``poll_interval`` seconds.
+    """
+
+    def __init__(self, poll_interval: float):
+        """
+        Args:
+            poll_interval: Seconds between reads without a notification
+        """
+        self.poll_interval = poll_interval
+        self._followers: Dict[str, Set[_Follower]] = {}
+        self._started = False
+
+    def start(self):
+        """Subscribe to log writer flushes"""
+        if not self._started:
+            self._started = True
+            log_writer.add_listener(self.notify)
+
+    def notify(self, flushes: List[LogFlush]):
+        """
+        Log writer listener: wake the followers of flushed files
+
+        Args:
+            flushes: Files written or closed by the last flush
+        """
+        for flush in flushes:
+            for follower in self._followers.get(flush.path, ()):
+                follower.closed = follower.closed or flush.closed
+                follower.event.set()
+
+    async def follow(
+        self,
+        path: str,
+        offset: int,
+        is_active: Callable[[], Awaitable[bool]],
+    ) -> AsyncIterator[Tuple[int, bytes]]:
+        """
+        Read a log from an offset, then as it grows
+
+        Only whole lines are returned. Ends once the log writer closes the
+        file, or when the file stops growing and ``is_active`` says the
+        session is over (logs of other workers).
+
+        Args:
+            path: Log file
+            offset: Byte offset to start at
+            is_active: Whether the session may still write to the log
+
+        Yields:
+            (offset, data) chunks of at most ``READ_BYTES``
+        """
+        follower = _Follower()
+        self._followers.setdefault(path, set()).add(follower)
+        loop = asyncio.get_running_loop()
+        polled = False
+        try:
+            while True:
+                follower.event.clear()
+                data = await loop.run_in_executor(None, _read_lines, path, offset)
+                if data:
+                    yield offset, data
+                    offset += len(data)
+                    continue
+                if follower.closed:
+                    return
+                if polled and not await is_active():
+                    return
+
+                try:
+                    await asyncio.wait_for(follower.event.wait(), self.poll_interval)
+                    polled = False
+                except asyncio.TimeoutError:
+                    polled = True  # written by another worker, or idle
+        finally:
+            followers = self._followers.get(path)
+            if followers is not None:
+                followers.discard(follower)
+                if not followers:
+                    del self._followers[path]
+
+    def start_offset(self, path: str, backlog: int) -> int:
+        """
+        Offset of the first whole line in the last ``backlog`` bytes
+
+        Args:
+            path: Log file
+            backlog: Bytes of history to start with
+
+        Returns:
+            Byte offset to follow from
+        """
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return 0
+        if size <= backlog:
+            return 0
+        with open(path, "rb") as f:
+            f.seek(size - backlog)
+            data = f.read(backlog)
+        newline = data.find(b"\n")
+        return size - backlog + newline + 1 if newline >= 0 else size
+
+    def get_stats(self) -> dict:
+        """
+        Get follower counts
+
+        Returns:
+            Dict with followed files and followers
+        """
+        return {
+            "files": len(self._followers),
+            "followers": sum(len(followers) for followers in self._followers.values()),
+        }
+
+
+def _read_lines(path: str, offset: int) -> Optional[bytes]:
+    """Whole lines of a file from an offset (None if it does not exist yet)"""
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read(READ_BYTES)
+    except FileNotFoundError:
+        return None
+    end = data.rfind(b"\n")
+    if end < 0:
+        # A line longer than a message goes out in pieces
+        return data if len(data) == READ_BYTES else None
+    return data[:end + 1]
+
+
+# Global log tail instance
+log_tail = LogTail(settings.log_tail_poll_interval)
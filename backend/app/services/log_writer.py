@@ -0,0 +1,436 @@
+"""
+Buffered session log writer shared by all SSH sessions
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from .terminal_protocol import OutputDecoder
+from .session_recording import (
+    RecordingBuffer,
+    EVENT_OUTPUT,
+    EVENT_INPUT,
+    EVENT_RESIZE,
+)
+from ..config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Record type that closes a stream
+_CLOSE = -1
+
+
+class LogFlush:
+    """A session log file that was just written to (or closed)"""
+
+    __slots__ = ("path", "size", "closed")
+
+    def __init__(self, path: str, size: Optional[int], closed: bool):
+        self.path = path
+        self.size = size  # file size after the write, None if never opened
+        self.closed = closed
+
+
+FlushListener = Callable[[List[LogFlush]], None]
+
+
+class LogStream:
+    """
+    Handle for one session log file
+
+    Sessions hand raw bytes to ``write``; decoding, timestamp formatting,
+    recording and file I/O all happen later on the writer task.
+    """
+
+    def __init__(
+        self,
+        writer: "SessionLogWriter",
+        path: str,
+        recording: Optional[RecordingBuffer] = None,
+    ):
+        self.writer = writer
+        self.path = path
+        self.recording = recording
+        self.closed = False
+
+        # Wall-clock anchor so records only need a monotonic timestamp
+        self._wall_base = time.time()
+        self._mono_base = time.monotonic()
+
+        # Writer-side state (only touched by the writer task)
+        self._decoders = {False: OutputDecoder(), True: OutputDecoder()}
+        self._pending: List[str] = []
+        self._pending_bytes = 0
+        self._pending_since = 0.0
+        self._file = None
+        self._stamp_second = -1
+        self._stamp = ""
+
+    def write(self, data: bytes, is_input: bool):
+        """
+        Queue session data for logging
+
+        Args:
+            data: Raw bytes
+            is_input: True if data is user input, False if server output
+        """
+        if not self.closed:
+            kind = EVENT_INPUT if is_input else EVENT_OUTPUT
+            self.writer.submit(self, time.monotonic(), kind, data)
+
+    def resize(self, width: int, height: int):
+        """
+        Record a terminal resize
+
+        Args:
+            width: Terminal width in characters
+            height: Terminal height in characters
+        """
+        if not self.closed and self.recording:
+            data = f"{width}x{height}".encode("ascii")
+            self.writer.submit(self, time.monotonic(), EVENT_RESIZE, data)
+
+    def close(self):
+        """Flush and close the log file once queued records are written"""
+        if not self.closed:
+            self.closed = True
+            self.writer.submit(self, time.monotonic(), _CLOSE, b"")
+
+    def _record(self, timestamp: float, kind: int, data: bytes):
+        """Append an event to the recording"""
+        if self.recording:
+            self.recording.add(timestamp - self._mono_base, kind, data)
+
+    def _format(self, timestamp: float, is_input: bool, data: bytes) -> Optional[str]:
+        """Render a record as a log line"""
+        text = self._decoders[is_input].decode(data)
+        if not text:
+            return None
+
+        second = int(self._wall_base + (timestamp - self._mono_base))
+        if second != self._stamp_second:
+            self._stamp_second = second
+            self._stamp = datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S")
+
+        return self._line(is_input, text)
+
+    def _line(self, is_input: bool, text: str) -> str:
+        """Prefix text with the current timestamp and direction"""
+        if is_input:
+            return f"[{self._stamp}] INPUT: >> {text}"
+        return f"[{self._stamp}] OUTPUT: {text}"
+
+
+class SessionLogWriter:
+    """
+    Single writer task for all session logs
+
+    Records go through one bounded queue (bounded by bytes). The writer keeps
+    each session's file open and flushes a session's buffered lines when they
+    exceed ``flush_bytes`` or have been pending for ``flush_interval``.
+    """
+
+    def __init__(
+        self,
+        max_queue_bytes: int = 16 * 1024 * 1024,
+        flush_bytes: int = 65536,
+        flush_interval: float = 1.0,
+    ):
+        self.max_queue_bytes = max_queue_bytes
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._queued_bytes = 0
+        self._streams: Dict[int, LogStream] = {}
+        self._listeners: List[FlushListener] = []
+
+        # Stats
+        self.records = 0
+        self.bytes_written = 0
+        self.flushes = 0
+        self.dropped = 0
+
+    def open(
+        self,
+        path: str,
+        recording_path: Optional[str] = None,
+        width: int = 80,
+        height: int = 24,
+    ) -> LogStream:
+        """
+        Open a log stream for a session
+
+        Args:
+            path: Absolute path to the log file
+            recording_path: Path of the session recording, or None to disable
+            width: Terminal width the session starts with
+            height: Terminal height the session starts with
+
+        Returns:
+            LogStream handle
+        """
+        recording = None
+        if recording_path:
+            recording = RecordingBuffer(
+                recording_path,
+                width=width,
+                height=height,
+                chunk_bytes=settings.recording_chunk_bytes,
+                chunk_seconds=settings.recording_chunk_seconds,
+            )
+        return LogStream(self, path, recording)
+
+    def add_listener(self, listener: FlushListener):
+        """
+        Register a callback for written log data
+
+        Args:
+            listener: Called on the event loop after every batch flush with
+                the files that grew or were closed; must not block
+        """
+        self._listeners.append(listener)
+
+    def submit(self, stream: LogStream, timestamp: float, kind: int, data: bytes):
+        """
+        Enqueue a record without blocking
+
+        Records are dropped (and counted) if the queue is over its byte limit.
+
+        Args:
+            stream: Target log stream
+            timestamp: time.monotonic() when the data was seen
+            kind: Event type (output, input, resize) or the close marker
+            data: Raw bytes
+        """
+        if self._task is None or self._task.done():
+            self._start()
+
+        if data and self._queued_bytes + len(data) > self.max_queue_bytes:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"Log writer queue full, {self.dropped} records dropped")
+            return
+
+        self._queued_bytes += len(data)
+        self._queue.put_nowait((stream, timestamp, kind, data))
+
+    async def close(self):
+        """Write everything queued, flush and close all files"""
+        if self._task is None:
+            return
+
+        self._queue.put_nowait(None)
+        try:
+            await self._task
+        finally:
+            self._task = None
+            self._queue = None
+
+    def get_stats(self) -> dict:
+        """
+        Get writer statistics
+
+        Returns:
+            Dict with queue depth, throughput counters and drops
+        """
+        return {
+            "queue_records": self._queue.qsize() if self._queue else 0,
+            "queue_bytes": self._queued_bytes,
+            "open_files": len(self._streams),
+            "records": self.records,
+            "bytes_written": self.bytes_written,
+            "flushes": self.flushes,
+            "dropped": self.dropped,
+        }
+
+    def _start(self):
+        """Start the writer task on the running loop"""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        """
+        Writer task main loop
+
+        Each iteration drains everything queued without awaiting, then hands
+        all buffers that are due to a single executor call, so file I/O never
+        runs on the event loop and costs one thread hop per batch.
+        """
+        queue = self._queue
+        running = True
+        try:
+            while running:
+                try:
+                    item = await asyncio.wait_for(queue.get(), self._next_deadline())
+                except asyncio.TimeoutError:
+                    item = False
+
+                closing: List[LogStream] = []
+                while item is not None:
+                    if item:
+                        stream = self._handle(*item)
+                        if stream is not None:
+                            closing.append(stream)
+                    if queue.empty():
+                        break
+                    item = queue.get_nowait()
+                else:
+                    running = False
+
+                await self._write(self._collect(closing, final=not running))
+        finally:
+            leftover = list(self._streams.values())
+            if leftover:
+                await self._write(self._collect(leftover, final=True))
+
+    def _handle(self, stream: LogStream, timestamp: float, kind: int, data: bytes):
+        """
+        Buffer one queued record
+
+        Returns:
+            The stream if the record is a close marker, else None
+        """
+        self._queued_bytes -= len(data)
+        self._streams[id(stream)] = stream
+
+        if kind == _CLOSE:
+            return stream
+
+        self.records += 1
+        stream._record(timestamp, kind, data)
+        if kind == EVENT_RESIZE:
+            return None
+
+        line = stream._format(timestamp, kind == EVENT_INPUT, data)
+        if line is None:
+            return None
+
+        if not stream._pending:
+            stream._pending_since = time.monotonic()
+        stream._pending.append(line)
+        stream._pending_bytes += len(line)
+        return None
+
+    def _next_deadline(self) -> Optional[float]:
+        """Seconds until the oldest pending buffer is due, or None if idle"""
+        pending = [
+            s._pending_since + self.flush_interval
+            for s in self._streams.values() if s._pending
+        ]
+        pending += [
+            s.recording._opened_at + s.recording.chunk_seconds
+            for s in self._streams.values() if s.recording and s.recording._count
+        ]
+        if not pending:
+            return None
+        return max(min(pending) - time.monotonic(), 0)
+
+    def _collect(self, closing: List[LogStream], final: bool = False) -> list:
+        """
+        Take the buffers that are due for writing
+
+        Args:
+            closing: Streams whose close marker was processed
+            final: Write and close every stream (writer shutdown)
+
+        Returns:
+            List of (stream, payload, recording chunk, close) tuples
+        """
+        now = time.monotonic()
+        closing_ids = {id(s) for s in closing}
+        batch = []
+
+        for stream in list(self._streams.values()):
+            close = final or id(stream) in closing_ids
+            if close:
+                for is_input, decoder in stream._decoders.items():
+                    tail = decoder.flush()
+                    if tail:
+                        stream._pending.append(stream._line(is_input, tail))
+            text_due = stream._pending and (
+                stream._pending_bytes >= self.flush_bytes
+                or now - stream._pending_since >= self.flush_interval
+            )
+            recording_due = stream.recording and stream.recording.due(now)
+            if not (close or text_due or recording_due):
+                continue
+
+            payload = b""
+            if stream._pending:
+                payload = ("\n".join(stream._pending) + "\n").encode("utf-8")
+                stream._pending = []
+                stream._pending_bytes = 0
+
+            chunk = None
+            if stream.recording and (close or recording_due):
+                chunk = stream.recording.take()
+
+            batch.append((stream, payload, chunk, close))
+            if close:
+                self._streams.pop(id(stream), None)
+
+        return batch
+
+    async def _write(self, batch: list):
+        """Write a batch of buffers in one executor call"""
+        if not batch:
+            return
+
+        loop = asyncio.get_running_loop()
+        written, flushed = await loop.run_in_executor(None, self._write_batch, batch)
+        self.bytes_written += written
+        self.flushes += 1
+
+        if flushed:
+            for listener in self._listeners:
+                try:
+                    listener(flushed)
+                except Exception as e:
+                    logger.error(f"Log flush listener failed: {e}")
+
+    @staticmethod
+    def _write_batch(batch: list) -> tuple:
+        """
+        Blocking part of a flush, runs in the default executor
+
+        Returns:
+            Tuple of (bytes written, LogFlush per file written or closed)
+        """
+        written = 0
+        flushed = []
+        for stream, payload, chunk, close in batch:
+            try:
+                size = None
+                if payload:
+                    if stream._file is None:
+                        stream._file = open(stream.path, "ab")
+                    stream._file.write(payload)
+                    stream._file.flush()
+                    written += len(payload)
+                if stream._file is not None:
+                    size = stream._file.tell()
+                if chunk:
+                    stream.recording.write_chunk(chunk)
+                if close:
+                    if stream._file is not None:
+                        stream._file.close()
+                        stream._file = None
+                    if stream.recording:
+                        stream.recording.close()
+                if payload or close:
+                    flushed.append(LogFlush(stream.path, size, close))
+            except Exception as e:
+                logger.error(f"Failed to write log {stream.path}: {e}")
+        return written, flushed
+
+
+# Global log writer instance
+log_writer = SessionLogWriter(
+    max_queue_bytes=settings.log_queue_max_bytes,
+    flush_bytes=settings.log_flush_bytes,
+    flush_interval=settings.log_flush_interval,
+)
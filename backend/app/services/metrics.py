@@ -0,0 +1,327 @@
+"""
+Lightweight Prometheus metrics registry
+"""
+import bisect
+import logging
+import math
+import os
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# (name, type, help, [(labels, value), ...])
+MetricFamily = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """Render a label set as {a="1",b="2"}"""
+    if not labels:
+        return ""
+    inner = ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items())
+    return "{" + inner + "}"
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value"""
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _CounterChild:
+    """A single labelled counter series"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class _GaugeChild:
+    """A single labelled gauge series"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+
+class _HistogramChild:
+    """A single labelled histogram series"""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Metric:
+    """
+    A metric family with optional labels
+
+    Updates are plain attribute arithmetic on the event loop thread, so no
+    locking is done. Hot paths should keep the child returned by ``labels``
+    instead of looking it up per update.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        """
+        Get the series for a set of label values
+
+        Args:
+            *values: Label values, in labelnames order
+
+        Returns:
+            Series object (inc/set/observe)
+        """
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _label_dict(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def render(self, const_labels: Dict[str, str]) -> List[str]:
+        """Render the family in text exposition format"""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for key, child in self._children.items():
+            lines.append(
+                f"{self.name}{_format_labels({**const_labels, **self._label_dict(key)})} "
+                f"{_format_value(child.value)}"
+            )
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        """Increment the unlabelled series"""
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        """Set the unlabelled series"""
+        self.labels().set(value)
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observations"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        """Observe a value on the unlabelled series"""
+        self.labels().observe(value)
+
+    def render(self, const_labels: Dict[str, str]) -> List[str]:
+        """Render cumulative buckets, sum and count"""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for key, child in self._children.items():
+            labels = {**const_labels, **self._label_dict(key)}
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                bucket_labels = {**labels, "le": _format_value(bound)}
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {child.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds metric families and scrape-time collectors
+
+    Metrics that already exist as counters elsewhere (reactor wakeups, log
+    writer queue depth, per-session byte counts) are read by collectors when
+    ``/metrics`` is scraped instead of being mirrored on every update.
+
+    Every series carries a ``worker`` label (the process ID): with several
+    workers, each scrape reaches one of them, and the label keeps their
+    counters apart instead of one series jumping between their values.
+    Aggregate with ``sum without (worker)``.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create (or get) a counter"""
+        return self._add(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Create (or get) a gauge"""
+        return self._add(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Create (or get) a histogram"""
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[MetricFamily]]):
+        """
+        Register a scrape-time collector
+
+        Args:
+            collector: Callable returning (name, type, help, samples) tuples
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Render all metrics in Prometheus text exposition format
+
+        Returns:
+            Exposition text
+        """
+        # Read per scrape, so a worker forked after import reports its own ID
+        worker = {"worker": str(os.getpid())}
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render(worker))
+
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                logger.error(f"Metrics collector failed: {e}")
+                continue
+
+            for name, kind, documentation, samples in families:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels({**worker, **labels})} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def _add(self, metric: _Metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+
+# Global metrics registry
+metrics = MetricsRegistry()
+
+# Data plane metrics updated directly from the SSH hot paths
+ssh_connects = metrics.counter(
+    "ssh_connect_total",
+    "SSH connection attempts by result and failure reason",
+    ["result", "reason"],
+)
+ssh_connect_duration = metrics.histogram(
+    "ssh_connect_duration_seconds",
+    "Time to establish an SSH session",
+    ["pooled"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+ssh_session_lifetime = metrics.histogram(
+    "ssh_session_lifetime_seconds",
+    "Lifetime of SSH sessions",
+    buckets=(1, 10, 60, 300, 900, 1800, 3600, 7200, 14400, 28800, 86400),
+)
+websocket_send_latency = metrics.histogram(
+    "websocket_send_seconds",
+    "Time to hand one output frame to the WebSocket",
+    ["protocol"],
+)
+ssh_sessions_reaped = metrics.counter(
+    "ssh_sessions_reaped_total",
+    "SSH sessions closed by the idle reaper",
+)
+session_persist_flush_duration = metrics.histogram(
+    "session_persist_flush_seconds",
+    "Time to write one batch of session state to the database",
+)
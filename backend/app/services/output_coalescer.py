@@ -0,0 +1,138 @@
+"""
+Latency-bounded output coalescing for SSH sessions
+"""
+import asyncio
+import time
+from typing import Callable, List, Optional
+
+
+class OutputCoalescer:
+    """
+    Merges small output chunks into larger frames
+
+    Chunks are held until either the latency budget expires or the byte
+    threshold is reached, whichever comes first. A small chunk arriving on a
+    quiet line (typically a keystroke echo) is flushed immediately so
+    interactive typing never waits for the timer.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[bytes], None],
+        delay: float = 0.003,
+        max_bytes: int = 65536,
+        immediate_bytes: int = 64,
+    ):
+        """
+        Args:
+            flush: Called with each merged frame
+            delay: Latency budget in seconds
+            max_bytes: Flush as soon as this many bytes are pending
+            immediate_bytes: Chunks up to this size on a quiet line skip the timer
+        """
+        self._flush_callback = flush
+        self.delay = delay
+        self.max_bytes = max_bytes
+        self.immediate_bytes = immediate_bytes
+
+        self._pending: List[bytes] = []
+        self._pending_bytes = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._last_flush = 0.0
+
+        # Stats
+        self._started = time.monotonic()
+        self.chunks_in = 0
+        self.frames_out = 0
+        self.bytes_out = 0
+        self.immediate_flushes = 0
+        self.size_flushes = 0
+        self.timer_flushes = 0
+
+    def push(self, data: bytes):
+        """
+        Add a chunk of output
+
+        Args:
+            data: Raw output bytes
+        """
+        self.chunks_in += 1
+        now = time.monotonic()
+
+        if (
+            not self._pending
+            and len(data) <= self.immediate_bytes
+            and now - self._last_flush >= self.delay
+        ):
+            self.immediate_flushes += 1
+            self._emit(data, now)
+            return
+
+        self._pending.append(data)
+        self._pending_bytes += len(data)
+
+        if self._pending_bytes >= self.max_bytes:
+            self.size_flushes += 1
+            self.flush()
+        elif self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.delay, self._on_timer)
+
+    def flush(self):
+        """Flush pending output now"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._pending:
+            return
+
+        if len(self._pending) == 1:
+            data = self._pending[0]
+        else:
+            data = b"".join(self._pending)
+
+        self._pending = []
+        self._pending_bytes = 0
+        self._emit(data, time.monotonic())
+
+    def close(self):
+        """Flush pending output and stop the timer"""
+        self.flush()
+
+    def get_stats(self) -> dict:
+        """
+        Get coalescing statistics
+
+        Returns:
+            Dict with frame counts, frames/sec and average bytes per frame
+        """
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        return {
+            "delay_ms": self.delay * 1000,
+            "max_bytes": self.max_bytes,
+            "chunks_in": self.chunks_in,
+            "frames_out": self.frames_out,
+            "bytes_out": self.bytes_out,
+            "frames_per_sec": round(self.frames_out / elapsed, 2),
+            "bytes_per_frame": (
+                round(self.bytes_out / self.frames_out, 1) if self.frames_out else 0
+            ),
+            "immediate_flushes": self.immediate_flushes,
+            "size_flushes": self.size_flushes,
+            "timer_flushes": self.timer_flushes,
+            "pending_bytes": self._pending_bytes,
+        }
+
+    def _on_timer(self):
+        """Latency budget expired"""
+        self._timer = None
+        self.timer_flushes += 1
+        self.flush()
+
+    def _emit(self, data: bytes, now: float):
+        """Hand a frame to the flush callback"""
+        self._last_flush = now
+        self.frames_out += 1
+        self.bytes_out += len(data)
+        self._flush_callback(data)
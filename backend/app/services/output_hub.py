@@ -0,0 +1,315 @@
+"""
+Fan-out of session output to any number of viewers
+"""
+import itertools
+import json
+import logging
+from typing import Callable, Dict, List, Optional, Set
+from .output_queue import OutputQueue
+from .terminal_protocol import (
+    PROTOCOL_BINARY,
+    PROTOCOL_JSON,
+    OutputDecoder,
+    encode_output_frame,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# What happens when a viewer's queue is full
+POLICY_BLOCK = "block"            # pause the SSH channel until the viewer catches up
+POLICY_DROP = "drop"              # skip output for this viewer, then report the gap
+POLICY_DISCONNECT = "disconnect"  # evict the viewer
+POLICIES = (POLICY_BLOCK, POLICY_DROP, POLICY_DISCONNECT)
+
+
+class OutputFrame:
+    """
+    One chunk of session output, encoded once for every viewer
+
+    ``binary`` and ``text`` are the ready-to-send WebSocket payloads for
+    the binary and JSON protocols; each is only built while a viewer of
+    that protocol is attached.
+    """
+
+    __slots__ = ("data", "end", "binary", "text")
+
+    def __init__(self, data: bytes, end: int):
+        self.data = data
+        self.end = end
+        self.binary: Optional[bytes] = None
+        self.text: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+class DropNotice:
+    """Queued in place of output a POLICY_DROP viewer skipped"""
+
+    __slots__ = ("offset", "dropped_bytes")
+
+    def __init__(self, offset: int, dropped_bytes: int):
+        self.offset = offset
+        self.dropped_bytes = dropped_bytes
+
+    def __len__(self) -> int:
+        return 0
+
+
+class Viewer:
+    """
+    One subscriber to a session's output
+
+    Frames are queued in a bounded ``OutputQueue``. When it fills up the
+    viewer's policy decides whether the whole session waits for it, it
+    misses output, or it is evicted.
+    """
+
+    def __init__(
+        self,
+        hub: "OutputHub",
+        viewer_id: int,
+        protocol: str,
+        policy: str,
+        read_only: bool,
+        max_bytes: int,
+    ):
+        self.hub = hub
+        self.viewer_id = viewer_id
+        self.protocol = protocol
+        self.policy = policy
+        self.read_only = read_only
+        self.queue = OutputQueue(max_bytes, on_pause=self._on_full, on_resume=self._on_drained)
+
+        self.offset = 0  # absolute offset after the last frame handed out
+        self.evicted = False
+        self._dropping = False
+        self._gap_bytes = 0
+
+        # Stats
+        self.dropped_bytes = 0
+        self.dropped_frames = 0
+
+    def offer(self, frame: OutputFrame):
+        """
+        Queue a published frame, applying the slow-consumer policy
+
+        Args:
+            frame: Shared output frame
+        """
+        if self._dropping:
+            self._gap_bytes += len(frame)
+            self.dropped_bytes += len(frame)
+            self.dropped_frames += 1
+            return
+
+        if self._gap_bytes:
+            self.queue.put(DropNotice(frame.end - len(frame), self._gap_bytes))
+            self._gap_bytes = 0
+        self.queue.put(frame)
+
+    async def get(self):
+        """
+        Wait for the next frame or drop notice
+
+        Returns:
+            OutputFrame or DropNotice, or None once the viewer is closed
+        """
+        item = await self.queue.get()
+        if isinstance(item, OutputFrame):
+            self.offset = item.end
+        elif isinstance(item, DropNotice):
+            self.offset = item.offset
+        return item
+
+    def close(self):
+        """Stop queueing; get() returns None once drained"""
+        self.queue.close()
+
+    def get_stats(self) -> dict:
+        """
+        Get viewer statistics
+
+        Returns:
+            Dict with viewer settings, queue state and dropped output
+        """
+        return {
+            "id": self.viewer_id,
+            "protocol": self.protocol,
+            "policy": self.policy,
+            "read_only": self.read_only,
+            "offset": self.offset,
+            "queue": self.queue.get_stats(),
+            "dropped_bytes": self.dropped_bytes,
+            "dropped_frames": self.dropped_frames,
+            "evicted": self.evicted,
+        }
+
+    def _on_full(self):
+        """Queue reached its high-water mark"""
+        if self.policy == POLICY_BLOCK:
+            self.hub._block(self)
+        elif self.policy == POLICY_DROP:
+            self._dropping = True
+        else:
+            logger.warning(f"Evicting slow viewer {self.viewer_id}")
+            self.evicted = True
+            self.queue.clear()
+            self.queue.close()
+            self.hub.unsubscribe(self)
+
+    def _on_drained(self):
+        """Queue drained below its low-water mark"""
+        if self.policy == POLICY_BLOCK:
+            self.hub._unblock(self)
+        elif self.policy == POLICY_DROP:
+            self._dropping = False
+
+
+class OutputHub:
+    """
+    Publishes a session's output frames to all attached viewers
+
+    Each frame is encoded once per wire protocol in use and the same
+    objects are queued for every viewer. The SSH channel is paused while
+    any POLICY_BLOCK viewer has a full queue, which keeps SSH flow control
+    working with several consumers.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        on_pause: Callable[[], None],
+        on_resume: Callable[[], None],
+    ):
+        """
+        Args:
+            max_bytes: Queue limit of each viewer
+            on_pause: Called when a blocking viewer falls behind
+            on_resume: Called when no blocking viewer is behind any more
+        """
+        self.max_bytes = max_bytes
+        self._on_pause = on_pause
+        self._on_resume = on_resume
+
+        self.viewers: Set[Viewer] = set()
+        self._blocked: Set[Viewer] = set()
+        self._protocols: Dict[str, int] = {PROTOCOL_BINARY: 0, PROTOCOL_JSON: 0}
+        self._decoder = OutputDecoder()
+        self._ids = itertools.count(1)
+        self._closed = False
+
+        self.end = 0  # absolute offset after the last published frame
+        self.detached_at = 0  # offset delivered when the last viewer left
+
+        # Stats
+        self.frames = 0
+        self.encodings = 0
+        self.evictions = 0
+
+    def publish(self, data: bytes):
+        """
+        Encode a frame and queue it for every viewer
+
+        Args:
+            data: Raw output bytes
+        """
+        self.end += len(data)
+        self.frames += 1
+        if not self.viewers:
+            return
+
+        frame = OutputFrame(data, self.end)
+        if self._protocols[PROTOCOL_BINARY]:
+            frame.binary = encode_output_frame(data)
+            self.encodings += 1
+        if self._protocols[PROTOCOL_JSON]:
+            text = self._decoder.decode(data)
+            if text:
+                frame.text = json.dumps({"type": "output", "data": text})
+                self.encodings += 1
+
+        for viewer in list(self.viewers):
+            viewer.offer(frame)
+
+    def subscribe(self, protocol: str, policy: str, read_only: bool) -> Viewer:
+        """
+        Attach a new viewer; it receives frames published from now on
+
+        Args:
+            protocol: Wire protocol of the viewer's WebSocket
+            policy: Slow-consumer policy (one of POLICIES)
+            read_only: Whether the viewer may send input
+
+        Returns:
+            The new viewer
+        """
+        viewer = Viewer(self, next(self._ids), protocol, policy, read_only, self.max_bytes)
+        viewer.offset = self.end
+        if self._closed:
+            viewer.close()
+            return viewer
+
+        if protocol == PROTOCOL_JSON and not self._protocols[PROTOCOL_JSON]:
+            # Nobody fed the shared decoder meanwhile; start clean
+            self._decoder = OutputDecoder()
+        self._protocols[protocol] += 1
+        self.viewers.add(viewer)
+        return viewer
+
+    def unsubscribe(self, viewer: Viewer):
+        """
+        Detach a viewer
+
+        Args:
+            viewer: Viewer returned by subscribe()
+        """
+        if viewer not in self.viewers:
+            return
+
+        self.viewers.discard(viewer)
+        self._protocols[viewer.protocol] -= 1
+        if viewer.evicted:
+            self.evictions += 1
+        else:
+            viewer.close()
+        self._unblock(viewer)
+
+        if not self.viewers:
+            # Output the viewer never received counts as unseen
+            self.detached_at = viewer.offset
+
+    def close(self):
+        """Close every viewer (the session has ended)"""
+        self._closed = True
+        for viewer in self.viewers:
+            viewer.close()
+
+    def get_stats(self) -> dict:
+        """
+        Get fan-out statistics
+
+        Returns:
+            Dict with frame and encoding counts and per-viewer stats
+        """
+        return {
+            "viewers": len(self.viewers),
+            "blocked": len(self._blocked),
+            "frames": self.frames,
+            "encodings": self.encodings,
+            "evictions": self.evictions,
+            "detail": [viewer.get_stats() for viewer in self.viewers],
+        }
+
+    def _block(self, viewer: Viewer):
+        if viewer in self.viewers and viewer not in self._blocked:
+            self._blocked.add(viewer)
+            if len(self._blocked) == 1:
+                self._on_pause()
+
+    def _unblock(self, viewer: Viewer):
+        if viewer in self._blocked:
+            self._blocked.discard(viewer)
+            if not self._blocked:
+                self._on_resume()
@@ -0,0 +1,164 @@
+"""
+Bounded, ordered output queue with backpressure
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Deque, Optional, Sized
+
+
+class OutputQueue:
+    """
+    Ordered queue of output frames between an SSH session and its consumer
+
+    The producer side (``put``) never blocks, since it runs inside reactor
+    callbacks. Instead, once the queued bytes reach ``max_bytes`` the queue
+    calls ``on_pause`` so the producer stops reading from the SSH channel;
+    Paramiko then stops extending the channel window and SSH flow control
+    throttles the remote side. ``on_resume`` is called when the consumer has
+    drained the queue below the low-water mark.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        on_pause: Callable[[], None],
+        on_resume: Callable[[], None],
+        low_water_ratio: float = 0.5,
+    ):
+        """
+        Args:
+            max_bytes: High-water mark that pauses the producer
+            on_pause: Called when the queue becomes full
+            on_resume: Called when the queue drains below the low-water mark
+            low_water_ratio: Low-water mark as a fraction of max_bytes
+        """
+        self.max_bytes = max_bytes
+        self.low_water = int(max_bytes * low_water_ratio)
+        self._on_pause = on_pause
+        self._on_resume = on_resume
+
+        self._frames: Deque[Sized] = deque()
+        self._bytes = 0
+        self._waiter: Optional[asyncio.Future] = None
+        self._closed = False
+
+        # Backpressure state
+        self.paused = False
+        self._paused_at = 0.0
+        self.stalls = 0
+        self.stall_time = 0.0
+        self.peak_bytes = 0
+
+    def put(self, frame: Sized):
+        """
+        Append a frame, pausing the producer if the queue is full
+
+        Args:
+            frame: Output bytes (or any frame object; its len() is counted)
+        """
+        if self._closed:
+            return
+
+        self._frames.append(frame)
+        self._bytes += len(frame)
+        if self._bytes > self.peak_bytes:
+            self.peak_bytes = self._bytes
+
+        self._wake()
+
+        if not self.paused and self._bytes >= self.max_bytes:
+            self.paused = True
+            self._paused_at = time.monotonic()
+            self.stalls += 1
+            self._on_pause()
+
+    def requeue(self, frame: Sized):
+        """
+        Put a frame back at the head of the queue
+
+        Used by a consumer that was interrupted before delivering a frame,
+        so ordering is preserved for the next consumer.
+
+        Args:
+            frame: Frame previously returned by get()
+        """
+        self._frames.appendleft(frame)
+        self._bytes += len(frame)
+
+    async def get(self) -> Optional[Sized]:
+        """
+        Wait for the next frame
+
+        Returns:
+            Next frame, or None once the queue is closed and drained
+        """
+        while not self._frames:
+            if self._closed:
+                return None
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiter = waiter
+            try:
+                await waiter
+            finally:
+                if self._waiter is waiter:
+                    self._waiter = None
+
+        frame = self._frames.popleft()
+        self._bytes -= len(frame)
+
+        if self.paused and self._bytes <= self.low_water:
+            self.paused = False
+            self.stall_time += time.monotonic() - self._paused_at
+            self._on_resume()
+
+        return frame
+
+    def clear(self) -> int:
+        """
+        Drop every queued frame, resuming the producer if it was paused
+
+        Returns:
+            Number of bytes dropped
+        """
+        dropped = self._bytes
+        self._frames.clear()
+        self._bytes = 0
+
+        if self.paused:
+            self.paused = False
+            self.stall_time += time.monotonic() - self._paused_at
+            self._on_resume()
+
+        return dropped
+
+    def close(self):
+        """Stop accepting frames; get() returns None once drained"""
+        self._closed = True
+        self._wake()
+
+    def get_stats(self) -> dict:
+        """
+        Get queue statistics
+
+        Returns:
+            Dict with current depth, stall count and cumulative stall time
+        """
+        stall_time = self.stall_time
+        if self.paused:
+            stall_time += time.monotonic() - self._paused_at
+
+        return {
+            "depth_frames": len(self._frames),
+            "depth_bytes": self._bytes,
+            "peak_bytes": self.peak_bytes,
+            "max_bytes": self.max_bytes,
+            "paused": self.paused,
+            "stalls": self.stalls,
+            "stall_time_ms": round(stall_time * 1000, 1),
+        }
+
+    def _wake(self):
+        """Wake a consumer waiting in get()"""
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
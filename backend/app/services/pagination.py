@@ -0,0 +1,115 @@
+"""
+Keyset (cursor) pagination for list endpoints
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import DateTime, Select, tuple_
+
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class CursorError(ValueError):
+    """Raised for a malformed cursor or one issued for another sort order"""
+
+
+class KeysetPage:
+    """
+    One page of a listing ordered by (sort column, id)
+
+    Instead of ``OFFSET``, the next page starts after the last row of the
+    previous one: the cursor holds that row's sort value and id, and the
+    query adds ``(column, id) < (value, id)`` (or ``>``). With an index
+    ending in the sort column (SQLite appends the rowid to every index)
+    each page is an index range scan of ``limit`` rows, however deep it
+    is and however large the table grows.
+    """
+
+    def __init__(self, sorts: Dict[str, object], id_column, sort: str, limit: int = DEFAULT_LIMIT):
+        """
+        Args:
+            sorts: Sort name -> non-nullable column (prefix ``-`` for descending)
+            id_column: Unique tie-breaker column
+            sort: Requested sort (``name`` or ``-name``)
+            limit: Page size
+
+        Raises:
+            CursorError: If the sort is not one of ``sorts``
+        """
+        self.descending = sort.startswith("-")
+        name = sort.lstrip("-")
+        if name not in sorts:
+            options = ", ".join(f"{key}, -{key}" for key in sorts)
+            raise CursorError(f"sort must be one of {options}")
+
+        self.sort = sort
+        self.column = sorts[name]
+        self.id_column = id_column
+        self.limit = limit
+
+    def apply(self, query: Select, cursor: Optional[str] = None) -> Select:
+        """
+        Order and limit a query, starting after a cursor
+
+        Args:
+            query: Filtered select of the listed entity
+            cursor: Cursor from the previous page, if any
+
+        Returns:
+            Query fetching one row more than the page (to detect the end)
+
+        Raises:
+            CursorError: If the cursor is malformed or for another sort
+        """
+        keys = (self.column, self.id_column)
+        if cursor:
+            # Bind with the column types so values compare like stored ones
+            last = tuple_(*self._decode(cursor), types=[key.type for key in keys])
+            query = query.where(tuple_(*keys) < last if self.descending else tuple_(*keys) > last)
+
+        order = [key.desc() if self.descending else key.asc() for key in keys]
+        return query.order_by(*order).limit(self.limit + 1)
+
+    def split(self, rows: Sequence) -> Tuple[List, Optional[str]]:
+        """
+        Split fetched rows into the page and the next cursor
+
+        Args:
+            rows: Result of the query built by ``apply``
+
+        Returns:
+            Tuple of (rows of this page, cursor of the next page or None)
+        """
+        rows = list(rows)
+        if len(rows) <= self.limit:
+            return rows, None
+
+        rows = rows[:self.limit]
+        last = rows[-1]
+        value = getattr(last, self.column.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        return rows, self._encode(value, getattr(last, self.id_column.key))
+
+    def _encode(self, value, last_id) -> str:
+        payload = json.dumps([self.sort, value, last_id], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+    def _decode(self, cursor: str) -> tuple:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            sort, value, last_id = json.loads(base64.urlsafe_b64decode(padded))
+            if isinstance(self.column.type, DateTime):
+                value = datetime.fromisoformat(value)
+        except (ValueError, TypeError) as e:
+            raise CursorError("Invalid cursor") from e
+
+        if sort != self.sort:
+            raise CursorError("Cursor was issued for a different sort order")
+        return value, last_id
@@ -0,0 +1,247 @@
+"""
+Paramiko SSH engine
+"""
+import asyncio
+import functools
+import logging
+import socket
+from typing import Optional
+import paramiko
+from paramiko.channel import Channel
+from .ssh_engine import EngineSession
+from .ssh_reactor import ssh_reactor
+from .ssh_executor import get_connect_executor
+from .transport_pool import transport_pool, make_pool_key, PooledTransport
+from .input_writer import InputWriter
+from .key_loader import private_key_loader
+from ..config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class ParamikoSession(EngineSession):
+    """
+    Session on a Paramiko transport
+
+    Blocking Paramiko calls run on the connect executor, output is read by
+    the shared reactor, input goes through a flow-controlled InputWriter,
+    and authenticated transports are shared through the transport pool.
+    """
+
+    name = "paramiko"
+
+    def __init__(self, connection):
+        super().__init__(connection)
+        self.transport: Optional[paramiko.Transport] = None
+        self.channel: Optional[Channel] = None
+        self.input: Optional[InputWriter] = None
+        self._pool_entry: Optional[PooledTransport] = None
+
+    async def open(self, width: int = 80, height: int = 24):
+        """Connect (or reuse a pooled transport), open a channel and start the shell"""
+        conn = self.connection
+
+        if settings.transport_pool_enabled:
+            # Reuse an authenticated transport to the same target if possible
+            pool_key = make_pool_key(
+                conn.host, conn.port, conn.username, conn.password, conn.private_key
+            )
+            self._pool_entry, self.pooled = await transport_pool.acquire(
+                pool_key, self._open_transport
+            )
+            self.transport = self._pool_entry.transport
+
+            try:
+                self.channel = await self._open_channel()
+            except Exception:
+                if not self.pooled:
+                    raise
+                # Shared transport refused another channel, use a fresh one
+                logger.info(f"Pooled transport to {conn.host} refused a channel")
+                transport_pool.retire(self._pool_entry)
+                transport_pool.release(self._pool_entry)
+                self._pool_entry = None
+                self._pool_entry, self.pooled = await transport_pool.acquire(
+                    pool_key, self._open_transport, reuse=False
+                )
+                self.transport = self._pool_entry.transport
+                self.failure = None
+                self.channel = await self._open_channel()
+        else:
+            self.transport = await self._open_transport()
+            self.channel = await self._open_channel()
+
+        # Request PTY and shell
+        await self._run_phase("pty", self._start_shell, width, height)
+
+        self.channel.setblocking(0)
+        self.input = InputWriter(
+            self.channel, max_pending_bytes=settings.input_queue_max_bytes
+        )
+
+        # Watch channel for output
+        ssh_reactor.register(self.channel, conn._handle_output, conn._handle_eof)
+
+    async def _open_transport(self) -> paramiko.Transport:
+        """
+        Resolve, connect, negotiate keys and authenticate a new transport
+
+        Returns:
+            Authenticated transport
+        """
+        conn = self.connection
+
+        # Parse (or fetch the cached) key first: a bad key or passphrase
+        # fails before a socket is opened, as with the asyncssh engine
+        key = None
+        if not conn.password and conn.private_key:
+            key = await self._run_phase(
+                "key", private_key_loader.load,
+                conn.private_key, conn.passphrase, conn.key_cache_key,
+            )
+
+        # Resolve host
+        addresses = await self._run_phase(
+            "dns", socket.getaddrinfo, conn.host, conn.port, 0, socket.SOCK_STREAM
+        )
+
+        # Open TCP connection
+        sock = await self._run_phase("tcp", self._open_socket, addresses)
+
+        transport = paramiko.Transport(sock)
+        transport.banner_timeout = settings.ssh_connect_timeout
+        transport.auth_timeout = settings.ssh_connect_timeout
+        try:
+            # Key exchange
+            await self._run_phase(
+                "kex", transport.start_client, timeout=settings.ssh_connect_timeout
+            )
+            # Host keys are accepted as-is (same as AutoAddPolicy)
+
+            # Authenticate
+            await self._run_phase("auth", self._authenticate, transport, key)
+        except Exception:
+            await asyncio.get_running_loop().run_in_executor(
+                get_connect_executor(), transport.close
+            )
+            raise
+
+        return transport
+
+    async def _open_channel(self) -> Channel:
+        """
+        Open a session channel on the current transport
+
+        Returns:
+            New channel
+        """
+        return await self._run_phase(
+            "channel", self.transport.open_session,
+            timeout=settings.ssh_connect_timeout,
+        )
+
+    async def _run_phase(self, phase: str, func, *args, **kwargs):
+        """
+        Run one blocking connect phase on the connect executor and time it
+
+        Args:
+            phase: Phase name recorded in timings
+            func: Blocking callable
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Return value of func
+        """
+        loop = asyncio.get_running_loop()
+        return await self._timed(
+            phase,
+            loop.run_in_executor(
+                get_connect_executor(), functools.partial(func, *args, **kwargs)
+            ),
+        )
+
+    @staticmethod
+    def _open_socket(addresses: list) -> socket.socket:
+        """Connect to the first reachable resolved address (blocking)"""
+        last_error: Optional[Exception] = None
+        for family, socktype, proto, _, address in addresses:
+            sock = socket.socket(family, socktype, proto)
+            sock.settimeout(settings.ssh_connect_timeout)
+            try:
+                sock.connect(address)
+                return sock
+            except OSError as e:
+                last_error = e
+                sock.close()
+        raise last_error or OSError("No address to connect to")
+
+    def _authenticate(self, transport: paramiko.Transport, key: Optional[paramiko.PKey]):
+        """Authenticate a transport (blocking)"""
+        conn = self.connection
+        if conn.password:
+            transport.auth_password(conn.username, conn.password)
+        elif key is not None:
+            transport.auth_publickey(conn.username, key)
+        else:
+            transport.auth_none(conn.username)
+
+    def _start_shell(self, width: int, height: int):
+        """Request a PTY and start the shell (blocking)"""
+        self.channel.get_pty(term="xterm-256color", width=width, height=height)
+        self.channel.invoke_shell()
+
+    def write(self, data: bytes) -> bool:
+        """Send input through the flow-controlled writer"""
+        if not self.input:
+            return False
+        return self.input.write(data)
+
+    def resize(self, width: int, height: int):
+        """Change the PTY size"""
+        self.channel.resize_pty(width=width, height=height)
+
+    def pause_reading(self):
+        """Stop reading the channel; SSH flow control throttles the server"""
+        if self.channel:
+            ssh_reactor.pause(self.channel)
+
+    def resume_reading(self):
+        """Resume reading the channel"""
+        if self.channel:
+            ssh_reactor.resume(self.channel)
+
+    async def close(self):
+        """Close the channel and release or close the transport"""
+        if self.input:
+            self.input.close()
+
+        if self.channel:
+            ssh_reactor.unregister(self.channel)
+            try:
+                self.channel.close()
+            except Exception:
+                pass
+            self.channel = None
+
+        if self._pool_entry:
+            # Shared transport stays open for other sessions
+            transport_pool.release(self._pool_entry)
+            self._pool_entry = None
+            self.transport = None
+
+        if self.transport:
+            transport = self.transport
+            self.transport = None
+            try:
+                # Transport.close() joins the transport thread
+                await asyncio.get_running_loop().run_in_executor(
+                    get_connect_executor(), transport.close
+                )
+            except Exception:
+                pass
+
+    def get_input_stats(self) -> Optional[dict]:
+        """Get input writer statistics"""
+        return self.input.get_stats() if self.input else None
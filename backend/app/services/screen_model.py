@@ -0,0 +1,298 @@
+"""
+Server-side terminal screen model (optional, requires pyte)
+"""
+import logging
+import time
+from typing import List, Optional, Tuple
+
+try:
+    import pyte
+    from pyte import graphics, modes
+except ImportError:  # optional dependency
+    pyte = None
+
+
+logger = logging.getLogger(__name__)
+
+FORMAT_TEXT = "text"
+FORMAT_ANSI = "ansi"
+FORMATS = (FORMAT_TEXT, FORMAT_ANSI)
+
+# Catch-ups larger than this are parsed on an executor thread
+INLINE_PARSE_BYTES = 16384
+
+_warned_missing = False
+
+if pyte is not None:
+    # Colour name -> SGR parameter
+    _FG_CODES = {name: str(code) for code, name in {**graphics.FG_ANSI, **graphics.FG_AIXTERM}.items()}
+    _BG_CODES = {name: str(code) for code, name in {**graphics.BG_ANSI, **graphics.BG_AIXTERM}.items()}
+
+# Char attribute -> SGR parameter
+_FLAG_CODES = (
+    ("bold", "1"),
+    ("italics", "3"),
+    ("underscore", "4"),
+    ("blink", "5"),
+    ("reverse", "7"),
+    ("strikethrough", "9"),
+)
+
+
+if pyte is not None:
+    class _Screen(pyte.Screen):
+        """
+        pyte screen with a fast path for printable ASCII
+
+        ``pyte.Screen.draw`` builds a new cell per character and looks up
+        its width; runs of printable ASCII (the bulk of terminal output)
+        are width 1, so they are written a line segment at a time with
+        cells (immutable) shared per attribute set.
+        """
+
+        max_attr_sets = 256
+
+        def __init__(self, columns: int, lines: int):
+            super().__init__(columns, lines)
+            self._cells: dict = {}  # attrs -> {char: cell}
+
+        def draw(self, data: str):
+            if not (data.isascii() and data.isprintable()) or modes.IRM in self.mode:
+                return super().draw(data)
+
+            data = data.translate(self.g1_charset if self.charset else self.g0_charset)
+            cursor = self.cursor
+            attrs = cursor.attrs
+            cells = self._cells.get(attrs)
+            if cells is None:
+                if len(self._cells) >= self.max_attr_sets:
+                    self._cells.clear()
+                cells = self._cells[attrs] = {}
+            columns = self.columns
+
+            pos = 0
+            while pos < len(data):
+                if cursor.x >= columns:
+                    if modes.DECAWM in self.mode:
+                        self.dirty.add(cursor.y)
+                        self.carriage_return()
+                        self.linefeed()
+                    else:
+                        cursor.x = columns - 1
+
+                x = cursor.x
+                take = min(len(data) - pos, columns - x)
+                line = self.buffer[cursor.y]
+                for char in data[pos:pos + take]:
+                    cell = cells.get(char)
+                    if cell is None:
+                        cell = cells[char] = attrs._replace(data=char)
+                    line[x] = cell
+                    x += 1
+                cursor.x = x
+                pos += take
+
+            self.dirty.add(cursor.y)
+
+
+def _color_code(color: str, codes: dict, extended: str) -> Optional[str]:
+    """SGR parameter for a pyte colour (name or 6-digit hex)"""
+    if color == "default":
+        return None
+    if color in codes:
+        return codes[color]
+    try:
+        red, green, blue = (int(color[i:i + 2], 16) for i in (0, 2, 4))
+    except ValueError:
+        return None
+    return f"{extended};2;{red};{green};{blue}"
+
+
+class ScreenModel:
+    """
+    Current screen grid and cursor of a session
+
+    The model catches up lazily: it remembers the stream offset it has
+    parsed and, when a snapshot is requested or the terminal is resized,
+    the session feeds it the output produced since then from the
+    scrollback. Sessions nobody asks about cost nothing, and a burst of
+    output never stalls the event loop on terminal emulation. If more output arrived
+    than the scrollback retains, the screen is rebuilt from what is left;
+    full-screen programs repaint continuously, so this converges quickly.
+
+    Every catch-up is a new version (``seq``). Each row remembers the
+    version that last changed it, so a client holding version N can ask
+    for just the rows changed since.
+    """
+
+    def __init__(self, cols: int = 80, rows: int = 24):
+        """
+        Args:
+            cols: Terminal width in characters
+            rows: Terminal height in characters
+        """
+        self.screen = _Screen(cols, rows)
+        self.stream = pyte.ByteStream(self.screen)
+        self.offset = 0  # stream offset parsed so far
+        self.seq = 0
+        self._line_seq: List[int] = [0] * rows
+        self._full_seq = 0  # rows before this version are not comparable
+
+        # Stats
+        self.bytes_parsed = 0
+        self.parse_time = 0.0
+        self.gaps = 0
+
+    def feed(self, start: int, data: bytes):
+        """
+        Parse output (blocking; large catch-ups run on an executor)
+
+        Args:
+            start: Stream offset of the first byte of data
+            data: Output read from the scrollback at ``start``
+        """
+        self.seq += 1
+        if start > self.offset:
+            # Output was overwritten before we parsed it
+            self.gaps += 1
+            self.screen.reset()
+            self.stream = pyte.ByteStream(self.screen)
+            self._full_seq = self.seq
+
+        started = time.perf_counter()
+        self.stream.feed(data)
+        self.parse_time += time.perf_counter() - started
+        self.bytes_parsed += len(data)
+        self.offset = start + len(data)
+
+        for row in self.screen.dirty:
+            if row < len(self._line_seq):
+                self._line_seq[row] = self.seq
+        self.screen.dirty.clear()
+
+    def resize(self, cols: int, rows: int):
+        """
+        Resize the screen (feed the output produced at the old size first)
+
+        Args:
+            cols: Terminal width in characters
+            rows: Terminal height in characters
+        """
+        if (cols, rows) == (self.screen.columns, self.screen.lines):
+            return
+
+        self.screen.resize(rows, cols)
+        self.screen.dirty.clear()
+        self.seq += 1
+        self._full_seq = self.seq
+        self._line_seq = [self.seq] * rows
+
+    def snapshot(self, since: int = 0, fmt: str = FORMAT_TEXT) -> dict:
+        """
+        Render the screen, or the rows changed since a version
+
+        Args:
+            since: Version the client already has (0 for a full snapshot)
+            fmt: ``text`` for plain rows, ``ansi`` for rows with SGR attributes
+
+        Returns:
+            Dict with version, size, cursor and a list of [row, content]
+        """
+        full = since <= 0 or since < self._full_seq or since > self.seq
+        rows = [
+            row for row, seq in enumerate(self._line_seq)
+            if full or seq > since
+        ]
+        render = self._render_ansi if fmt == FORMAT_ANSI else self._render_text
+        cursor = self.screen.cursor
+        return {
+            "seq": self.seq,
+            "offset": self.offset,
+            "full": full,
+            "cols": self.screen.columns,
+            "rows": self.screen.lines,
+            "cursor": {"x": cursor.x, "y": cursor.y, "hidden": cursor.hidden},
+            "format": fmt,
+            "lines": [[row, render(row)] for row in rows],
+        }
+
+    def get_stats(self) -> dict:
+        """
+        Get parser statistics
+
+        Returns:
+            Dict with bytes parsed, parse throughput and gap count
+        """
+        return {
+            "seq": self.seq,
+            "offset": self.offset,
+            "bytes_parsed": self.bytes_parsed,
+            "parse_ms": round(self.parse_time * 1000, 1),
+            "parse_mb_per_sec": (
+                round(self.bytes_parsed / self.parse_time / 1e6, 2) if self.parse_time else None
+            ),
+            "gaps": self.gaps,
+        }
+
+    def _render_text(self, row: int) -> str:
+        line = self.screen.buffer[row]
+        return "".join(line[column].data for column in range(self.screen.columns)).rstrip()
+
+    def _render_ansi(self, row: int) -> str:
+        """Row with SGR sequences; each row starts from default attributes"""
+        line = self.screen.buffer[row]
+        parts: List[str] = []
+        current: Tuple[str, ...] = ()
+
+        # Trailing default blanks carry no information
+        width = self.screen.columns
+        while width and line[width - 1].data == " " and _is_plain(line[width - 1]):
+            width -= 1
+
+        for column in range(width):
+            char = line[column]
+            params = _sgr_params(char)
+            if params != current:
+                parts.append("\x1b[" + ";".join(("0",) + params) + "m")
+                current = params
+            parts.append(char.data)
+
+        if current:
+            parts.append("\x1b[0m")
+        return "".join(parts)
+
+
+def _is_plain(char) -> bool:
+    return char.fg == "default" and char.bg == "default" and not char.reverse
+
+
+def _sgr_params(char) -> Tuple[str, ...]:
+    """SGR parameters (after a reset) that reproduce a character's attributes"""
+    params = [code for flag, code in _FLAG_CODES if getattr(char, flag)]
+    fg = _color_code(char.fg, _FG_CODES, "38")
+    if fg:
+        params.append(fg)
+    bg = _color_code(char.bg, _BG_CODES, "48")
+    if bg:
+        params.append(bg)
+    return tuple(params)
+
+
+def create_screen_model(cols: int = 80, rows: int = 24) -> Optional[ScreenModel]:
+    """
+    Create a screen model if pyte is installed
+
+    Args:
+        cols: Terminal width in characters
+        rows: Terminal height in characters
+
+    Returns:
+        ScreenModel, or None without pyte
+    """
+    global _warned_missing
+    if pyte is None:
+        if not _warned_missing:
+            logger.warning("SCREEN_MODEL_ENABLED is set but pyte is not installed (pip install pyte)")
+            _warned_missing = True
+        return None
+    return ScreenModel(cols, rows)
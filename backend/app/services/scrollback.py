@@ -0,0 +1,111 @@
+"""
+Bounded scrollback of recent session output
+"""
+from typing import Tuple
+
+
+class ScrollbackBuffer:
+    """
+    Fixed-size byte ring holding the most recent output of a session
+
+    Positions are absolute stream offsets: byte N is the N-th output byte
+    since the session started. A client that tracks how many output bytes
+    it has rendered can reattach and ask for everything after that offset.
+
+    The ring grows up to ``capacity`` as output arrives (idle sessions stay
+    small) and is then overwritten in place, so an append copies only the
+    new bytes.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: Maximum number of bytes retained
+        """
+        self.capacity = capacity
+        self._buffer = bytearray()
+        self.end = 0  # absolute offset one past the newest byte
+
+    @property
+    def start(self) -> int:
+        """Absolute offset of the oldest retained byte"""
+        return max(0, self.end - self.capacity)
+
+    def append(self, data: bytes):
+        """
+        Add output, overwriting the oldest bytes once full
+
+        Args:
+            data: Raw output bytes
+        """
+        size = len(data)
+        if not size or not self.capacity:
+            self.end += size
+            return
+
+        if size >= self.capacity:
+            # Only the tail survives; lay it out at its ring position
+            data = memoryview(data)[size - self.capacity:]
+            self.end += size
+            pos = self.end % self.capacity
+            if len(self._buffer) < self.capacity:
+                self._buffer = bytearray(self.capacity)
+            self._buffer[pos:] = data[:self.capacity - pos]
+            self._buffer[:pos] = data[self.capacity - pos:]
+            return
+
+        if len(self._buffer) < self.capacity:
+            # Still filling: ring position equals the buffer length
+            room = self.capacity - len(self._buffer)
+            self._buffer += data[:room]
+            self.end += min(size, room)
+            data = memoryview(data)[room:]
+            size = len(data)
+            if not size:
+                return
+
+        pos = self.end % self.capacity
+        first = min(size, self.capacity - pos)
+        self._buffer[pos:pos + first] = data[:first]
+        if first < size:
+            self._buffer[:size - first] = data[first:]
+        self.end += size
+
+    def read_from(self, offset: int) -> Tuple[int, bytes]:
+        """
+        Copy out retained output after an offset
+
+        Args:
+            offset: Absolute offset the reader already has up to
+
+        Returns:
+            Tuple of (start offset, data); start is later than offset when
+            the requested bytes have already been overwritten
+        """
+        start = min(max(offset, self.start), self.end)
+        size = self.end - start
+        if not size:
+            return start, b""
+
+        if len(self._buffer) < self.capacity:
+            return start, bytes(self._buffer[start:self.end])
+
+        pos = start % self.capacity
+        if pos + size <= self.capacity:
+            return start, bytes(self._buffer[pos:pos + size])
+        return start, bytes(self._buffer[pos:]) + bytes(self._buffer[:size - (self.capacity - pos)])
+
+    def get_stats(self) -> dict:
+        """
+        Get scrollback statistics
+
+        Returns:
+            Dict with capacity, retained bytes and the retained offset range
+        """
+        return {
+            "capacity": self.capacity,
+            "retained_bytes": self.end - self.start,
+            "allocated_bytes": len(self._buffer),
+            "start": self.start,
+            "end": self.end,
+        }
@@ -0,0 +1,325 @@
+"""
+Bulk import and export of the server inventory (NDJSON or CSV)
+"""
+import codecs
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from .credential_resolver import credential_resolver
+from .server_search import server_search
+from ..database import AsyncSessionLocal
+from ..models.credential import Credential
+from ..models.server import SSHServer
+from ..schemas.server import ServerCreate, ServerResponse
+
+
+logger = logging.getLogger(__name__)
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+FORMATS = (FORMAT_NDJSON, FORMAT_CSV)
+
+MEDIA_TYPES = {FORMAT_NDJSON: "application/x-ndjson", FORMAT_CSV: "text/csv"}
+
+# Rows per transaction (import) and per query (export)
+BATCH_SIZE = 500
+
+# Errors listed in an import report; the rest are only counted
+MAX_REPORTED_ERRORS = 1000
+
+EXPORT_FIELDS = list(ServerResponse.model_fields)
+
+Record = Tuple[int, Optional[dict], Optional[str]]  # (line, fields, parse error)
+
+
+class InventoryFormatError(ValueError):
+    """Raised when an import stream cannot be read at all (e.g. no CSV header)"""
+
+
+async def read_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Record]:
+    """
+    Parse an import stream record by record
+
+    Args:
+        chunks: Request body chunks
+        fmt: ``ndjson`` (one JSON object per line) or ``csv`` (header row first)
+
+    Yields:
+        (line number, fields, None), or (line number, None, error) for a
+        record that cannot be parsed
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    header: Optional[List[str]] = None
+    pending = ""  # CSV record spanning lines (quoted newline)
+    pending_line = 0
+    line_no = 0
+    buffer = ""
+
+    async def lines():
+        nonlocal buffer
+        async for chunk in chunks:
+            buffer += decoder.decode(chunk)
+            *complete, buffer = buffer.split("\n")
+            for line in complete:
+                yield line
+        buffer += decoder.decode(b"", final=True)
+        if buffer:
+            yield buffer
+
+    async for line in lines():
+        line_no += 1
+        line = line.rstrip("\r")
+
+        if fmt == FORMAT_NDJSON:
+            if not line.strip():
+                continue
+            try:
+                fields = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(fields, dict):
+                yield line_no, None, "Expected a JSON object"
+                continue
+            yield line_no, fields, None
+            continue
+
+        # CSV: quotes are doubled inside fields, so an odd count means the
+        # record continues on the next line
+        if pending:
+            pending += "\n" + line
+        else:
+            if not line.strip():
+                continue
+            pending, pending_line = line, line_no
+        if pending.count('"') % 2:
+            continue
+        record, pending = pending, ""
+
+        try:
+            values = next(csv.reader([record]))
+        except csv.Error as e:
+            yield pending_line, None, f"Invalid CSV: {e}"
+            continue
+
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield pending_line, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        # Empty cells are left unset (defaults on create, unchanged on update)
+        yield pending_line, {name: value for name, value in zip(header, values) if value != ""}, None
+
+    if pending:
+        yield pending_line, None, "Unterminated quoted field"
+    if fmt == FORMAT_CSV and header is None:
+        raise InventoryFormatError("CSV import needs a header row")
+
+
+class ImportReport:
+    """Counts and per-row errors of one import"""
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+
+    def error(self, line: int, name: Optional[str], message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "name": name, "error": message})
+
+    def to_dict(self) -> dict:
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+class ServerInventory:
+    """
+    Batched upsert and streaming export of SSH servers
+
+    Imported rows are validated against ``ServerCreate`` and matched to
+    existing servers by name. Each batch costs one SELECT for the
+    existing names, one multi-row INSERT and one executemany UPDATE, all
+    in a single transaction. Updates only touch the fields present in a
+    row. A row that fails validation is reported and skipped without
+    affecting the rest of its batch.
+    """
+
+    async def import_servers(self, chunks: AsyncIterator[bytes], fmt: str) -> dict:
+        """
+        Create or update servers from an NDJSON or CSV stream
+
+        Args:
+            chunks: Request body chunks
+            fmt: ``ndjson`` or ``csv``
+
+        Returns:
+            Report with created/updated/failed counts and per-row errors
+
+        Raises:
+            InventoryFormatError: If the stream cannot be read at all
+        """
+        report = ImportReport()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Credential.id))
+            credential_ids = set(result.scalars().all())
+
+            batch: Dict[str, Tuple[int, ServerCreate]] = {}
+            async for line, fields, parse_error in read_records(chunks, fmt):
+                if parse_error:
+                    report.error(line, None, parse_error)
+                    continue
+
+                name = fields.get("name")
+                try:
+                    server = ServerCreate(**fields)
+                except ValidationError as e:
+                    report.error(line, name, _format_errors(e))
+                    continue
+                if server.credential_id is not None and server.credential_id not in credential_ids:
+                    report.error(line, server.name, f"Credential {server.credential_id} not found")
+                    continue
+
+                if server.name in batch:
+                    # The same name twice in a batch: the later row wins
+                    await self._write_batch(db, batch, report)
+                    batch = {}
+                batch[server.name] = (line, server)
+                if len(batch) >= BATCH_SIZE:
+                    await self._write_batch(db, batch, report)
+                    batch = {}
+
+            if batch:
+                await self._write_batch(db, batch, report)
+
+        logger.info(
+            f"Server import: {report.created} created, {report.updated} updated, "
+            f"{report.failed} failed"
+        )
+        return report.to_dict()
+
+    async def export_servers(self, fmt: str) -> AsyncIterator[bytes]:
+        """
+        Stream all servers, ``BATCH_SIZE`` rows per query
+
+        Args:
+            fmt: ``ndjson`` or ``csv`` (readable by ``import_servers``)
+
+        Yields:
+            Encoded chunks of output
+        """
+        if fmt == FORMAT_CSV:
+            yield _csv_line(EXPORT_FIELDS)
+
+        last_id = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(SSHServer)
+                    .where(SSHServer.id > last_id)
+                    .order_by(SSHServer.id)
+                    .limit(BATCH_SIZE)
+                )
+                servers = result.scalars().all()
+            if not servers:
+                return
+
+            lines = []
+            for server in servers:
+                row = ServerResponse.model_validate(server).model_dump(mode="json")
+                if fmt == FORMAT_CSV:
+                    lines.append(_csv_line(["" if row[f] is None else row[f] for f in EXPORT_FIELDS]))
+                else:
+                    lines.append(json.dumps(row, separators=(",", ":")).encode("utf-8") + b"\n")
+            yield b"".join(lines)
+            last_id = servers[-1].id
+
+    async def _write_batch(self, db, batch: Dict[str, Tuple[int, ServerCreate]], report: ImportReport):
+        """Upsert one batch in a transaction (row by row if the batch fails)"""
+        try:
+            created, updated = await self._upsert(db, list(batch.values()))
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.warning(f"Server import batch failed, retrying row by row: {e}")
+            created = updated = 0
+            for line, server in batch.values():
+                try:
+                    row_created, row_updated = await self._upsert(db, [(line, server)])
+                    await db.commit()
+                except Exception as row_error:
+                    await db.rollback()
+                    report.error(line, server.name, str(getattr(row_error, "orig", None) or row_error))
+                    continue
+                created += row_created
+                updated += row_updated
+
+        report.created += created
+        report.updated += updated
+
+    async def _upsert(self, db, rows: List[Tuple[int, ServerCreate]]) -> Tuple[int, int]:
+        """Insert new names and update existing ones (no commit)"""
+        names = [server.name for _, server in rows]
+        result = await db.execute(select(SSHServer.name, SSHServer.id).where(SSHServer.name.in_(names)))
+        existing = dict(result.all())
+
+        now = datetime.utcnow()
+        inserts = [
+            {**server.model_dump(), "created_at": now, "updated_at": now}
+            for _, server in rows if server.name not in existing
+        ]
+        updates = [
+            {**server.model_dump(exclude_unset=True), "id": existing[server.name], "updated_at": now}
+            for _, server in rows if server.name in existing
+        ]
+
+        tags = {}
+        if inserts:
+            result = await db.execute(insert(SSHServer).returning(SSHServer.id, SSHServer.tags), inserts)
+            tags.update(result.all())
+        # Executemany needs the same columns in every row
+        for group in _group_by_columns(updates).values():
+            await db.execute(update(SSHServer), group)
+        if updates:
+            credential_resolver.invalidate_servers({row["id"] for row in updates})
+            tags.update((row["id"], row["tags"]) for row in updates if "tags" in row)
+
+        # The full-text index follows by trigger; tag rows are written here
+        await server_search.set_tags(db, tags)
+        return len(inserts), len(updates)
+
+
+def _group_by_columns(rows: List[dict]) -> Dict[tuple, List[dict]]:
+    groups: Dict[tuple, List[dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    return groups
+
+
+def _format_errors(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+
+def _csv_line(values: list) -> bytes:
+    out = io.StringIO()
+    csv.writer(out, lineterminator="\n").writerow(values)
+    return out.getvalue().encode("utf-8")
+
+
+# Global server inventory instance
+server_inventory = ServerInventory()
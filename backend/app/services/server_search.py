@@ -0,0 +1,270 @@
+"""
+Tag index and full-text search over servers
+"""
+import asyncio
+import json
+import logging
+import re
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import column, delete, func, insert, or_, select, table, text
+from sqlalchemy.exc import OperationalError
+from ..database import AsyncSessionLocal, engine
+from ..models.server import SSHServer
+from ..models.server_tag import ServerTag
+
+
+logger = logging.getLogger(__name__)
+
+MAX_TAG_LENGTH = 64
+
+# Column weights for ranking: name, host, description, tags
+RANK_WEIGHTS = (10.0, 5.0, 1.0, 3.0)
+
+_fts = table("ssh_servers_fts", column("rowid"), column("rank"))
+
+# External-content FTS5 table over ssh_servers, kept in sync by triggers
+# (so every write path, including bulk import, updates it)
+_FTS_DDL = (
+    """
+    CREATE VIRTUAL TABLE ssh_servers_fts USING fts5(
+        name, host, description, tags,
+        content='ssh_servers', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ssh_servers_fts_insert AFTER INSERT ON ssh_servers BEGIN
+        INSERT INTO ssh_servers_fts (rowid, name, host, description, tags)
+        VALUES (new.id, new.name, new.host, new.description, new.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ssh_servers_fts_delete AFTER DELETE ON ssh_servers BEGIN
+        INSERT INTO ssh_servers_fts (ssh_servers_fts, rowid, name, host, description, tags)
+        VALUES ('delete', old.id, old.name, old.host, old.description, old.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS ssh_servers_fts_update AFTER UPDATE ON ssh_servers BEGIN
+        INSERT INTO ssh_servers_fts (ssh_servers_fts, rowid, name, host, description, tags)
+        VALUES ('delete', old.id, old.name, old.host, old.description, old.tags);
+        INSERT INTO ssh_servers_fts (rowid, name, host, description, tags)
+        VALUES (new.id, new.name, new.host, new.description, new.tags);
+    END
+    """,
+    "INSERT INTO ssh_servers_fts (ssh_servers_fts, rank) VALUES ('rank', 'bm25({weights})')",
+    "INSERT INTO ssh_servers_fts (ssh_servers_fts) VALUES ('rebuild')",
+)
+
+
+def parse_tags(value: Optional[str]) -> List[str]:
+    """
+    Normalize the ``tags`` field of a server
+
+    Args:
+        value: JSON list of strings (as stored), or a comma-separated list
+
+    Returns:
+        Distinct lowercase tags in their original order
+    """
+    if not value:
+        return []
+    try:
+        parsed = json.loads(value)
+    except ValueError:
+        parsed = value.split(",")
+    if isinstance(parsed, str):
+        parsed = parsed.split(",")
+    if not isinstance(parsed, list):
+        return []
+
+    tags = []
+    for tag in parsed:
+        if not isinstance(tag, str):
+            continue
+        tag = tag.strip().lower()[:MAX_TAG_LENGTH]
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def fts_query(q: str) -> Optional[str]:
+    """
+    Turn user input into an FTS5 query: every word must match, the last
+    one as a prefix
+
+    Words are quoted, so FTS5 syntax in the input is searched for
+    literally; ``web-01.prod`` becomes the phrase "web 01 prod".
+
+    Args:
+        q: Search text
+
+    Returns:
+        MATCH expression, or None if the input has no words
+    """
+    words = [word.replace('"', "") for word in q.split()]
+    words = [word for word in words if re.search(r"\w", word)]
+    if not words:
+        return None
+    return " ".join([f'"{word}"' for word in words[:-1]] + [f'"{words[-1]}"*'])
+
+
+class ServerSearch:
+    """
+    Tag lookups and ranked full-text search over servers
+
+    Tags are normalized from the ``tags`` JSON string into
+    ``server_tags`` (one indexed row per tag) whenever a server is
+    written through the API or imported. Name, host, description and
+    tags are indexed by an SQLite FTS5 table that triggers keep in sync;
+    on other databases, or without FTS5, search falls back to LIKE.
+    """
+
+    def __init__(self):
+        self.fts_enabled = False
+
+    async def setup(self, attempts: int = 5):
+        """
+        Create the FTS index (first run) and backfill missing tag rows
+
+        Args:
+            attempts: Tries when several workers start at once
+        """
+        for attempt in range(attempts):
+            try:
+                async with engine.begin() as conn:
+                    self.fts_enabled = await conn.run_sync(self._create_fts)
+                break
+            except OperationalError as e:
+                if attempt == attempts - 1:
+                    logger.warning(f"Full-text search disabled: {e}")
+                    break
+                await asyncio.sleep(0.2 * (attempt + 1))
+
+        await self._backfill_tags()
+
+    async def set_tags(self, db, tags: Dict[int, Optional[str]]):
+        """
+        Replace the tag rows of servers (no commit)
+
+        Args:
+            db: Database session
+            tags: Server ID -> ``tags`` field value
+        """
+        if not tags:
+            return
+        await db.execute(delete(ServerTag).where(ServerTag.server_id.in_(list(tags))))
+        rows = [
+            {"server_id": server_id, "tag": tag}
+            for server_id, value in tags.items()
+            for tag in parse_tags(value)
+        ]
+        if rows:
+            await db.execute(insert(ServerTag), rows)
+
+    def filter_by_tags(self, query, tags: Iterable[str]):
+        """
+        Restrict a server query to servers carrying all of the tags
+
+        Args:
+            query: Select of SSHServer
+            tags: Required tags
+
+        Returns:
+            Filtered query
+        """
+        tags = {tag.strip().lower() for tag in tags if tag.strip()}
+        if not tags:
+            return query
+        tagged = (
+            select(ServerTag.server_id)
+            .where(ServerTag.tag.in_(tags))
+            .group_by(ServerTag.server_id)
+            .having(func.count() == len(tags))
+        )
+        return query.where(SSHServer.id.in_(tagged))
+
+    async def search(self, db, q: str, tags: Iterable[str] = (), limit: int = 20) -> List[SSHServer]:
+        """
+        Find servers by name, host, description and tags
+
+        Args:
+            db: Database session
+            q: Search text (words are ANDed, the last one prefix-matched)
+            tags: Tags every result must carry
+            limit: Maximum results
+
+        Returns:
+            Servers, best match first
+        """
+        match = fts_query(q)
+        if match is None:
+            query = self.filter_by_tags(select(SSHServer), tags).order_by(SSHServer.name)
+        elif self.fts_enabled:
+            # rank is bm25 with RANK_WEIGHTS (configured on the table)
+            query = (
+                self.filter_by_tags(select(SSHServer), tags)
+                .join(_fts, _fts.c.rowid == SSHServer.id)
+                .where(text("ssh_servers_fts MATCH :match").bindparams(match=match))
+                .order_by(_fts.c.rank)
+            )
+        else:
+            query = self.filter_by_tags(select(SSHServer), tags)
+            for word in q.split():
+                pattern = f"%{word}%"
+                query = query.where(or_(
+                    SSHServer.name.ilike(pattern),
+                    SSHServer.host.ilike(pattern),
+                    SSHServer.description.ilike(pattern),
+                    SSHServer.tags.ilike(pattern),
+                ))
+            query = query.order_by(SSHServer.name)
+
+        result = await db.execute(query.limit(limit))
+        return list(result.scalars().all())
+
+    async def tag_counts(self, db) -> List[dict]:
+        """
+        List tags in use
+
+        Returns:
+            [{"tag", "servers"}], most used first
+        """
+        count = func.count().label("servers")
+        result = await db.execute(
+            select(ServerTag.tag, count).group_by(ServerTag.tag).order_by(count.desc(), ServerTag.tag)
+        )
+        return [{"tag": tag, "servers": servers} for tag, servers in result.all()]
+
+    @staticmethod
+    def _create_fts(conn) -> bool:
+        """Create the FTS table and triggers unless present (sync)"""
+        if conn.dialect.name != "sqlite":
+            return False
+        exists = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ssh_servers_fts'"
+        )).first()
+        if exists:
+            return True
+        weights = ", ".join(str(weight) for weight in RANK_WEIGHTS)
+        for statement in _FTS_DDL:
+            conn.execute(text(statement.replace("{weights}", weights)))
+        logger.info("Created full-text index over servers")
+        return True
+
+    async def _backfill_tags(self):
+        """Normalize tags of servers that have none indexed (e.g. after upgrading)"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(SSHServer.id, SSHServer.tags)
+                .where(SSHServer.tags.is_not(None), SSHServer.tags != "")
+                .where(~SSHServer.id.in_(select(ServerTag.server_id)))
+            )
+            missing = {server_id: tags for server_id, tags in result.all() if parse_tags(tags)}
+            if missing:
+                await self.set_tags(db, missing)
+                await db.commit()
+                logger.info(f"Indexed tags of {len(missing)} servers")
+
+
+# Global server search instance
+server_search = ServerSearch()
@@ -0,0 +1,219 @@
+"""
+Write-behind persistence of session state
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from sqlalchemy import func, select, update
+from .metrics import session_persist_flush_duration
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models.session import SSHSession
+from ..models.session_owner import SessionOwner
+
+
+logger = logging.getLogger(__name__)
+
+# Flushes an ended session is retried for while its row does not exist yet
+END_RETRIES = 3
+
+
+class SessionPersister:
+    """
+    Batches session row updates into periodic transactions
+
+    The connection manager reports session ends here instead of writing
+    to the database itself. Live sessions are tracked, and their byte
+    counters and terminal size are read once per flush; a row is only
+    written when they changed. Each flush is a single transaction, so
+    the database sees one commit per interval however much traffic and
+    however many sessions there are.
+    """
+
+    def __init__(self, interval: float = 2.0):
+        """
+        Args:
+            interval: Seconds between flushes
+        """
+        self.interval = interval
+        self._live: Dict[str, Tuple[object, Optional[tuple]]] = {}  # id -> (connection, last written)
+        self._ended: Dict[str, Tuple[dict, int]] = {}  # id -> (values, flushes tried)
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+        # Stats
+        self.flushes = 0
+        self.rows_written = 0
+        self.failures = 0
+
+    def start(self):
+        """Start the flush task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush task and write out everything pending"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def track(self, session_id: str, connection):
+        """
+        Persist the counters of a live session on every flush
+
+        Args:
+            session_id: Session identifier
+            connection: SSHConnection
+        """
+        self._live[session_id] = (connection, None)
+
+    def end(self, session_id: str, connection, reason: str, status: str = "closed"):
+        """
+        Record the end of a session
+
+        Args:
+            session_id: Session identifier
+            connection: SSHConnection that was closed
+            reason: Why the session ended (user, remote, idle_timeout, shutdown)
+            status: Final session status
+        """
+        self._live.pop(session_id, None)
+        self._ended[session_id] = ({
+            **self._counters(connection),
+            "status": status,
+            "ended_at": datetime.utcnow(),
+            "end_reason": reason,
+            "log_file_path": connection.log_file_path,
+        }, 0)
+
+    async def flush(self):
+        """Write pending updates in one transaction"""
+        async with self._lock:
+            live = {}
+            for session_id, (connection, written) in self._live.items():
+                counters = self._counters(connection)
+                snapshot = tuple(counters.values())
+                if snapshot != written:
+                    live[session_id] = (counters, snapshot)
+
+            ended, self._ended = self._ended, {}
+            if not live and not ended:
+                return
+
+            started = time.perf_counter()
+            missed = {}
+            try:
+                async with AsyncSessionLocal() as db:
+                    for session_id, (values, _) in live.items():
+                        await self._update(db, session_id, values)
+                    for session_id, (values, tries) in ended.items():
+                        if not await self._update(db, session_id, values):
+                            missed[session_id] = (values, tries + 1)
+                    await db.commit()
+            except Exception as e:
+                # Keep everything for the next flush
+                self.failures += 1
+                for session_id, entry in ended.items():
+                    self._ended.setdefault(session_id, entry)
+                logger.error(f"Failed to persist session state: {e}")
+                return
+
+            for session_id, (_, snapshot) in live.items():
+                if session_id in self._live:
+                    self._live[session_id] = (self._live[session_id][0], snapshot)
+
+            # A session can end before the request that created it has
+            # inserted its row; retry those a few times
+            for session_id, (values, tries) in missed.items():
+                if tries < END_RETRIES:
+                    self._ended.setdefault(session_id, (values, tries))
+                else:
+                    logger.warning(f"Dropped end of session {session_id}: no session row")
+
+            self.flushes += 1
+            self.rows_written += len(live) + len(ended) - len(missed)
+            session_persist_flush_duration.observe(time.perf_counter() - started)
+
+    async def reconcile(self) -> int:
+        """
+        Close session rows left active by a previous run
+
+        A session is stale when no live worker owns it. With the session
+        relay enabled, ownership comes from the registry (so sessions of
+        the other workers are left alone); without it, this process is
+        the only one and every active row is stale.
+
+        Returns:
+            Number of sessions closed
+        """
+        query = (
+            update(SSHSession)
+            .where(SSHSession.status == "active")
+            .values(
+                status="closed",
+                ended_at=func.coalesce(SSHSession.ended_at, datetime.utcnow()),
+                end_reason="server_exit",
+            )
+        )
+        if settings.session_relay_enabled:
+            query = query.where(SSHSession.session_id.not_in(select(SessionOwner.session_id)))
+
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(query.execution_options(synchronize_session=False))
+            await db.commit()
+
+        if result.rowcount:
+            logger.info(f"Closed {result.rowcount} stale active sessions")
+        return result.rowcount
+
+    def get_stats(self) -> dict:
+        """
+        Get persister statistics
+
+        Returns:
+            Dict with tracked sessions, pending ends and flush counts
+        """
+        return {
+            "tracked": len(self._live),
+            "pending_ends": len(self._ended),
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "failures": self.failures,
+        }
+
+    async def _run(self):
+        """Flush once per interval"""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    @staticmethod
+    async def _update(db, session_id: str, values: dict) -> bool:
+        """Update one session row; False if it does not exist"""
+        result = await db.execute(
+            update(SSHSession)
+            .where(SSHSession.session_id == session_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount > 0
+
+    @staticmethod
+    def _counters(connection) -> dict:
+        return {
+            "bytes_in": connection.bytes_in,
+            "bytes_out": connection.bytes_out,
+            "terminal_cols": connection.cols,
+            "terminal_rows": connection.rows,
+        }
+
+
+# Global session persister instance
+session_persister = SessionPersister(settings.session_persist_interval)
@@ -0,0 +1,286 @@
+"""
+Seekable, chunk-compressed session recordings
+
+A recording is two files next to the session's text log:
+
+    <name>.rec
+        8-byte magic, a length-prefixed JSON header, then a sequence of
+        zlib-compressed chunks, each prefixed with its compressed length.
+        A decompressed chunk is a run of events:
+        ``<d time><B type><I length><data>``, where time is seconds since
+        the start of the session and type is ``o`` (output), ``i`` (input)
+        or ``r`` (resize, data ``b"<cols>x<rows>"``).
+
+    <name>.rec.idx
+        One fixed-size entry per chunk:
+        ``<d start><d end><Q file offset><I compressed length><I events>``.
+
+The index is a few dozen bytes per chunk, so readers can binary-search it to
+find the chunks covering a time range and decompress only those.
+"""
+import bisect
+import json
+import os
+import struct
+import time
+import zlib
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from .terminal_protocol import OutputDecoder
+
+
+MAGIC = b"SSHREC1\n"
+
+EVENT_OUTPUT = ord("o")
+EVENT_INPUT = ord("i")
+EVENT_RESIZE = ord("r")
+
+_EVENT = struct.Struct("<dBI")
+_INDEX = struct.Struct("<ddQII")
+_LENGTH = struct.Struct("<I")
+
+
+def recording_path_for(log_file_path: str) -> str:
+    """
+    Get the recording path that belongs to a session log
+
+    Args:
+        log_file_path: Path of the session's text log
+
+    Returns:
+        Path of the .rec file
+    """
+    return os.path.splitext(log_file_path)[0] + ".rec"
+
+
+class RecordingBuffer:
+    """
+    Writer-side event buffer for one recording
+
+    Events are appended to an uncompressed chunk; the log writer takes the
+    chunk once it is large or old enough and compresses it off the loop.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        width: int = 80,
+        height: int = 24,
+        chunk_bytes: int = 262144,
+        chunk_seconds: float = 10.0,
+    ):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.header = {"width": width, "height": height, "timestamp": int(time.time())}
+        self.chunk_bytes = chunk_bytes
+        self.chunk_seconds = chunk_seconds
+
+        self._events = bytearray()
+        self._count = 0
+        self._start = 0.0
+        self._end = 0.0
+        self._opened_at = 0.0
+
+        # File handles, only touched from the writer's executor job
+        self.file: Optional[BinaryIO] = None
+        self.index_file: Optional[BinaryIO] = None
+
+    def add(self, offset: float, event_type: int, data: bytes):
+        """
+        Append an event to the current chunk
+
+        Args:
+            offset: Seconds since the start of the session
+            event_type: EVENT_OUTPUT, EVENT_INPUT or EVENT_RESIZE
+            data: Event payload
+        """
+        if not self._count:
+            self._start = offset
+            self._opened_at = time.monotonic()
+        self._end = offset
+        self._count += 1
+        self._events += _EVENT.pack(offset, event_type, len(data))
+        self._events += data
+
+    def due(self, now: float) -> bool:
+        """Check whether the current chunk should be written"""
+        return bool(self._count) and (
+            len(self._events) >= self.chunk_bytes
+            or now - self._opened_at >= self.chunk_seconds
+        )
+
+    def take(self) -> Optional[Tuple[bytes, float, float, int]]:
+        """
+        Detach the current chunk
+
+        Returns:
+            Tuple of (raw events, start, end, event count), or None if empty
+        """
+        if not self._count:
+            return None
+
+        chunk = (bytes(self._events), self._start, self._end, self._count)
+        self._events = bytearray()
+        self._count = 0
+        return chunk
+
+    def write_chunk(self, chunk: Tuple[bytes, float, float, int]):
+        """
+        Compress and append a chunk plus its index entry (blocking)
+
+        Args:
+            chunk: Value returned by take()
+        """
+        raw, start, end, count = chunk
+
+        if self.file is None:
+            self.file = open(self.path, "ab")
+            self.index_file = open(self.index_path, "ab")
+            if self.file.tell() == 0:
+                header = json.dumps(self.header).encode("utf-8")
+                self.file.write(MAGIC + _LENGTH.pack(len(header)) + header)
+
+        compressed = zlib.compress(raw, 6)
+        offset = self.file.tell()
+        self.file.write(_LENGTH.pack(len(compressed)) + compressed)
+        self.file.flush()
+
+        # Index entry goes last, so readers never see a chunk that isn't there
+        self.index_file.write(_INDEX.pack(start, end, offset, len(compressed), count))
+        self.index_file.flush()
+
+    def close(self):
+        """Close file handles (blocking)"""
+        for handle in (self.file, self.index_file):
+            if handle is not None:
+                handle.close()
+        self.file = None
+        self.index_file = None
+
+
+class RecordingReader:
+    """Random-access reader for a recording"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Path of the .rec file
+
+        Raises:
+            FileNotFoundError: If the recording does not exist
+            ValueError: If the file is not a recording
+        """
+        self.path = path
+
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a session recording: {path}")
+            (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+            self.header = json.loads(f.read(length))
+
+        self.index: List[Tuple[float, float, int, int, int]] = []
+        index_path = path + ".idx"
+        if os.path.exists(index_path):
+            with open(index_path, "rb") as f:
+                data = f.read()
+            usable = len(data) - len(data) % _INDEX.size
+            self.index = [entry for entry in _INDEX.iter_unpack(data[:usable])]
+
+        self._ends = [entry[1] for entry in self.index]
+
+    @property
+    def duration(self) -> float:
+        """Time of the last indexed event"""
+        return self._ends[-1] if self._ends else 0.0
+
+    def seek(self, timestamp: float) -> Optional[dict]:
+        """
+        Find the chunk containing a timestamp
+
+        Args:
+            timestamp: Seconds since the start of the session
+
+        Returns:
+            Chunk position info, or None if past the end of the recording
+        """
+        position = bisect.bisect_left(self._ends, timestamp)
+        if position >= len(self.index):
+            return None
+
+        start, end, offset, length, count = self.index[position]
+        return {
+            "chunk": position,
+            "chunk_start": start,
+            "chunk_end": end,
+            "file_offset": offset,
+            "compressed_bytes": length,
+            "events": count,
+        }
+
+    def iter_events(
+        self, start: float = 0.0, end: Optional[float] = None
+    ) -> Iterator[Tuple[float, int, bytes]]:
+        """
+        Iterate events in a time range, decompressing only covering chunks
+
+        Args:
+            start: Range start in seconds since session start
+            end: Range end (inclusive), or None for the end of the recording
+
+        Yields:
+            Tuples of (time, event_type, data)
+        """
+        position = bisect.bisect_left(self._ends, start)
+        if position >= len(self.index):
+            return
+
+        with open(self.path, "rb") as f:
+            for chunk_start, _, offset, length, _ in self.index[position:]:
+                if end is not None and chunk_start > end:
+                    return
+
+                f.seek(offset + _LENGTH.size)
+                raw = zlib.decompress(f.read(length))
+
+                pos = 0
+                while pos < len(raw):
+                    t, event_type, size = _EVENT.unpack_from(raw, pos)
+                    pos += _EVENT.size
+                    data = raw[pos:pos + size]
+                    pos += size
+
+                    if t < start:
+                        continue
+                    if end is not None and t > end:
+                        return
+                    yield t, event_type, data
+
+    def iter_asciicast(
+        self, start: float = 0.0, end: Optional[float] = None
+    ) -> Iterator[str]:
+        """
+        Export a time range as asciicast v2 lines
+
+        Args:
+            start: Range start in seconds since session start
+            end: Range end (inclusive), or None for the end of the recording
+
+        Yields:
+            Newline-terminated asciicast lines (header first)
+        """
+        header = {
+            "version": 2,
+            "width": self.header.get("width", 80),
+            "height": self.header.get("height", 24),
+            "timestamp": self.header.get("timestamp"),
+        }
+        yield json.dumps(header) + "\n"
+
+        decoders = {EVENT_OUTPUT: OutputDecoder(), EVENT_INPUT: OutputDecoder()}
+        for t, event_type, data in self.iter_events(start, end):
+            if event_type == EVENT_RESIZE:
+                text = data.decode("ascii")
+            else:
+                text = decoders[event_type].decode(data)
+                if not text:
+                    continue
+            yield json.dumps([round(t - start, 6), chr(event_type), text]) + "\n"
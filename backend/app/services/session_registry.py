@@ -0,0 +1,145 @@
+"""
+Shared registry of which worker owns each live session
+"""
+import logging
+import os
+import socket
+from typing import Optional
+from sqlalchemy import delete, select
+from ..config import settings
+from ..database import AsyncSessionLocal
+from ..models.session_owner import SessionOwner
+
+
+logger = logging.getLogger(__name__)
+
+
+class SessionRegistry:
+    """
+    Records session ownership in the database
+
+    With several uvicorn workers each worker holds its own SSH connections.
+    The registry lets any worker find the owner of a session and the Unix
+    socket its relay listens on.
+    """
+
+    def __init__(self):
+        self.node = socket.gethostname()
+        self.worker_id = f"{self.node}:{os.getpid()}"
+        self.socket_path = os.path.join(
+            os.path.abspath(settings.ipc_dir), f"worker-{os.getpid()}.sock"
+        )
+
+    async def register(self, session_id: str):
+        """
+        Record this worker as the owner of a session
+
+        Args:
+            session_id: Session identifier
+        """
+        async with AsyncSessionLocal() as db:
+            await db.merge(SessionOwner(
+                session_id=session_id,
+                node=self.node,
+                worker_id=self.worker_id,
+                socket_path=self.socket_path,
+            ))
+            await db.commit()
+
+    async def unregister(self, session_id: str):
+        """
+        Remove a session owned by this worker
+
+        Args:
+            session_id: Session identifier
+        """
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                delete(SessionOwner).where(
+                    SessionOwner.session_id == session_id,
+                    SessionOwner.worker_id == self.worker_id,
+                )
+            )
+            await db.commit()
+
+    async def lookup(self, session_id: str) -> Optional[SessionOwner]:
+        """
+        Find the owner of a session
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Owner record, or None if no worker owns the session
+        """
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(SessionOwner).where(SessionOwner.session_id == session_id)
+            )
+            return result.scalar_one_or_none()
+
+    async def forget(self, session_id: str, worker_id: str):
+        """
+        Drop a stale ownership record (the owner no longer answers)
+
+        Args:
+            session_id: Session identifier
+            worker_id: Worker recorded as owner
+        """
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                delete(SessionOwner).where(
+                    SessionOwner.session_id == session_id,
+                    SessionOwner.worker_id == worker_id,
+                )
+            )
+            await db.commit()
+        logger.info(f"Dropped stale owner {worker_id} of session {session_id}")
+
+    async def purge_stale(self):
+        """Drop records of this worker and of local workers that are gone"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(SessionOwner.worker_id, SessionOwner.socket_path)
+                .where(SessionOwner.node == self.node)
+                .distinct()
+            )
+            stale = [
+                worker_id for worker_id, path in result.all()
+                if worker_id == self.worker_id or not _worker_alive(worker_id, path)
+            ]
+            if stale:
+                await db.execute(
+                    delete(SessionOwner).where(SessionOwner.worker_id.in_(stale))
+                )
+                await db.commit()
+                logger.info(f"Purged session owners of stale workers: {stale}")
+
+    async def clear_worker(self):
+        """Drop every record of this worker (shutdown)"""
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                delete(SessionOwner).where(SessionOwner.worker_id == self.worker_id)
+            )
+            await db.commit()
+
+    def is_local(self, owner: SessionOwner) -> bool:
+        """Check whether an owner record belongs to this worker"""
+        return owner.worker_id == self.worker_id
+
+
+def _worker_alive(worker_id: str, socket_path: str) -> bool:
+    """Check a worker on this node (a killed worker leaves its socket behind)"""
+    if not os.path.exists(socket_path):
+        return False
+    try:
+        os.kill(int(worker_id.rsplit(":", 1)[1]), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        pass  # exists, owned by another user
+    return True
+
+
+# Global session registry instance
+session_registry = SessionRegistry()
@@ -0,0 +1,299 @@
+"""
+Worker-to-worker relay for sessions owned by another process
+"""
+import asyncio
+import json
+import logging
+import os
+import struct
+from typing import Awaitable, Callable, Optional, Tuple
+from fastapi import WebSocket
+from .session_registry import session_registry
+from .ssh_manager import ssh_manager
+from ..config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Relay frame: <B kind><I length><payload>
+_HEADER = struct.Struct("<BI")
+KIND_HELLO = 0
+KIND_TEXT = 1
+KIND_BYTES = 2
+KIND_CLOSE = 3
+
+WebSocketHandler = Callable[..., Awaitable[None]]
+
+
+class RelayUnavailable(Exception):
+    """Raised when the owning worker cannot be reached"""
+
+
+def _write_frame(writer: asyncio.StreamWriter, kind: int, payload: bytes = b""):
+    writer.write(_HEADER.pack(kind, len(payload)) + payload)
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    """
+    Read one relay frame
+
+    Returns:
+        Tuple of (kind, payload); KIND_CLOSE on EOF
+    """
+    try:
+        header = await reader.readexactly(_HEADER.size)
+        kind, length = _HEADER.unpack(header)
+        return kind, await reader.readexactly(length)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return KIND_CLOSE, b""
+
+
+class RelayWebSocket:
+    """
+    WebSocket stand-in backed by a relay connection
+
+    Implements the subset of ``fastapi.WebSocket`` the terminal endpoint
+    uses, so the owning worker runs the unchanged endpoint for a client
+    that is physically connected to another worker.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        query_params: dict,
+    ):
+        self.reader = reader
+        self.writer = writer
+        self.query_params = query_params
+        self.closed = False
+
+    async def accept(self):
+        """The relaying worker already accepted the real WebSocket"""
+
+    async def receive(self) -> dict:
+        kind, payload = await _read_frame(self.reader)
+        if kind == KIND_TEXT:
+            return {"type": "websocket.receive", "text": payload.decode("utf-8")}
+        if kind == KIND_BYTES:
+            return {"type": "websocket.receive", "bytes": payload}
+
+        code = struct.unpack("<H", payload)[0] if len(payload) == 2 else 1000
+        return {"type": "websocket.disconnect", "code": code}
+
+    async def send_text(self, data: str):
+        await self._send(KIND_TEXT, data.encode("utf-8"))
+
+    async def send_json(self, data):
+        await self.send_text(json.dumps(data))
+
+    async def send_bytes(self, data: bytes):
+        await self._send(KIND_BYTES, data)
+
+    async def close(self, code: int = 1000):
+        if self.closed:
+            return
+        try:
+            await self._send(KIND_CLOSE, struct.pack("<H", code))
+        except Exception:
+            pass
+        self.closed = True
+        self.writer.close()
+
+    async def _send(self, kind: int, payload: bytes):
+        if self.closed:
+            raise ConnectionError("Relay connection closed")
+        _write_frame(self.writer, kind, payload)
+        await self.writer.drain()
+
+
+class SessionRelay:
+    """
+    Unix-socket relay between uvicorn workers
+
+    Every worker listens on its own socket (see ``session_registry``). A
+    worker that receives a WebSocket for a session owned by another worker
+    forwards frames to the owner in both directions; the owner feeds them
+    through the normal terminal endpoint via ``RelayWebSocket``. Close and
+    stats requests for remote sessions use the same socket.
+    """
+
+    def __init__(self):
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._handler: Optional[WebSocketHandler] = None
+
+    async def start(self, handler: WebSocketHandler):
+        """
+        Start listening for relayed requests
+
+        Args:
+            handler: Terminal endpoint, called as handler(websocket, session_id)
+        """
+        self._handler = handler
+        path = session_registry.socket_path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.unlink(path)
+
+        try:
+            self._server = await asyncio.start_unix_server(self._handle, path=path)
+        except (NotImplementedError, AttributeError, OSError) as e:
+            logger.warning(f"Session relay disabled: {e}")
+            return
+
+        await session_registry.purge_stale()
+        logger.info(f"Session relay listening on {path}")
+
+    async def stop(self):
+        """Stop listening and remove the socket"""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            try:
+                os.unlink(session_registry.socket_path)
+            except OSError:
+                pass
+
+    async def relay(self, websocket: WebSocket, socket_path: str, session_id: str):
+        """
+        Pipe an accepted WebSocket to the worker that owns the session
+
+        Args:
+            websocket: Accepted client WebSocket
+            socket_path: Relay socket of the owning worker
+            session_id: Session identifier
+
+        Raises:
+            RelayUnavailable: If the owner cannot be reached
+        """
+        reader, writer = await self._open(socket_path, {
+            "op": "attach",
+            "session_id": session_id,
+            "query": dict(websocket.query_params),
+        })
+
+        async def upstream():
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    code = message.get("code", 1000)
+                    _write_frame(writer, KIND_CLOSE, struct.pack("<H", code))
+                    await writer.drain()
+                    return
+                if message.get("bytes") is not None:
+                    _write_frame(writer, KIND_BYTES, message["bytes"])
+                else:
+                    _write_frame(writer, KIND_TEXT, (message.get("text") or "").encode("utf-8"))
+                await writer.drain()
+
+        async def downstream():
+            while True:
+                kind, payload = await _read_frame(reader)
+                if kind == KIND_TEXT:
+                    await websocket.send_text(payload.decode("utf-8"))
+                elif kind == KIND_BYTES:
+                    await websocket.send_bytes(payload)
+                else:
+                    code = struct.unpack("<H", payload)[0] if len(payload) == 2 else 1000
+                    try:
+                        await websocket.close(code=code)
+                    except Exception:
+                        pass
+                    return
+
+        tasks = [asyncio.create_task(upstream()), asyncio.create_task(downstream())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+        logger.info(f"Relay for session {session_id} finished")
+
+    async def request(
+        self, socket_path: str, op: str, session_id: str, args: Optional[dict] = None
+    ) -> dict:
+        """
+        Run a one-shot request (close, stats, screen) on the owning worker
+
+        Args:
+            socket_path: Relay socket of the owning worker
+            op: Operation name
+            session_id: Session identifier
+            args: Operation arguments
+
+        Returns:
+            Response payload
+
+        Raises:
+            RelayUnavailable: If the owner cannot be reached
+        """
+        reader, writer = await self._open(socket_path, {
+            "op": op,
+            "session_id": session_id,
+            "args": args or {},
+        })
+        try:
+            kind, payload = await asyncio.wait_for(_read_frame(reader), 30)
+        finally:
+            writer.close()
+        if kind != KIND_TEXT:
+            raise RelayUnavailable("Owner closed the relay connection")
+        return json.loads(payload)
+
+    async def _open(
+        self, socket_path: str, hello: dict
+    ) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Connect to a worker and send the request header"""
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_unix_connection(socket_path), settings.ssh_connect_timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise RelayUnavailable(str(e)) from e
+
+        _write_frame(writer, KIND_HELLO, json.dumps(hello).encode("utf-8"))
+        await writer.drain()
+        return reader, writer
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one relayed request on the owning worker"""
+        try:
+            kind, payload = await _read_frame(reader)
+            if kind != KIND_HELLO:
+                return
+            hello = json.loads(payload)
+            op = hello.get("op")
+            session_id = hello.get("session_id", "")
+
+            if op == "attach":
+                websocket = RelayWebSocket(reader, writer, hello.get("query") or {})
+                await self._handler(websocket, session_id)
+                await websocket.close()
+                return
+
+            if op == "close":
+                response = {"closed": await ssh_manager.remove_connection(session_id, reason="user")}
+            elif op == "stats":
+                connection = ssh_manager.get_connection(session_id)
+                response = connection.get_stats() if connection else None
+            elif op == "screen":
+                connection = ssh_manager.get_connection(session_id)
+                response = (
+                    await connection.get_screen(**hello.get("args", {})) if connection else None
+                )
+            else:
+                response = {"error": f"Unknown relay op: {op}"}
+
+            _write_frame(writer, KIND_TEXT, json.dumps(response).encode("utf-8"))
+            await writer.drain()
+
+        except Exception as e:
+            logger.error(f"Relay request failed: {e}")
+        finally:
+            writer.close()
+
+
+# Global session relay instance
+session_relay = SessionRelay()
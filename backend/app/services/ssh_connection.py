@@ -1,19 +1,40 @@
 """
-SSH Connection handler using Paramiko
+SSH Connection handler
 """
 import asyncio
 import logging
-from typing import Optional, Callable
-from datetime import datetime
-import paramiko
-from paramiko.channel import Channel
+import time
+from typing import Optional, Callable, Tuple, Union
+from .ssh_engine import EngineSession, create_engine_session
+from .output_coalescer import OutputCoalescer
+from .output_hub import OutputHub, Viewer
+from .scrollback import ScrollbackBuffer
+from .screen_model import INLINE_PARSE_BYTES, ScreenModel, create_screen_model
+from .log_writer import log_writer, LogStream
+from .session_recording import recording_path_for
+from .metrics import ssh_connects, ssh_connect_duration, ssh_session_lifetime
+from ..config import settings
+from ..schemas.session import (
+    MIN_TERMINAL_COLS, MAX_TERMINAL_COLS, MIN_TERMINAL_ROWS, MAX_TERMINAL_ROWS,
+)
 
 
 logger = logging.getLogger(__name__)
 
 
+def _in_bounds(value, low: int, high: int) -> bool:
+    # bool is an int subclass; sizes come from client JSON
+    return type(value) is int and low <= value <= high
+
+
 class SSHConnection:
-    """Manages a single SSH connection with PTY support"""
+    """
+    Manages a single SSH connection with PTY support
+
+    The SSH protocol work is done by an engine session (Paramiko or
+    AsyncSSH, see ``settings.ssh_engine``); this class owns the
+    engine-independent output, logging and metrics path.
+    """
 
     def __init__(
         self,
@@ -23,95 +44,148 @@ class SSHConnection:
         password: Optional[str] = None,
         private_key: Optional[str] = None,
         server_name: Optional[str] = None,
+        passphrase: Optional[str] = None,
+        key_cache_key: Optional[tuple] = None,
+        cols: int = 80,
+        rows: int = 24,
     ):
         self.host = host
         self.port = port
         self.username = username
         self.password = password
         self.private_key = private_key
+        self.passphrase = passphrase
+        self.key_cache_key = key_cache_key
         self.server_name = server_name or host
 
-        self.client: Optional[paramiko.SSHClient] = None
-        self.channel: Optional[Channel] = None
+        self.engine: Optional[EngineSession] = None
         self.connected = False
         self.session_id: Optional[str] = None
 
         # Callbacks
-        self.on_data: Optional[Callable[[bytes], None]] = None
         self.on_disconnect: Optional[Callable[[], None]] = None
 
+        # Fan-out to the attached WebSocket viewers
+        self.output_hub = OutputHub(
+            max_bytes=settings.output_queue_max_bytes,
+            on_pause=self._pause_reading,
+            on_resume=self._resume_reading,
+        )
+
+        # Output coalescing
+        self.output = OutputCoalescer(
+            flush=self.output_hub.publish,
+            delay=settings.output_coalesce_delay_ms / 1000,
+            max_bytes=settings.output_coalesce_max_bytes,
+            immediate_bytes=settings.output_immediate_bytes,
+        )
+
+        # Recent output, replayed when a client reattaches
+        self.scrollback = ScrollbackBuffer(settings.scrollback_bytes)
+
+        # Screen grid for snapshots, parsed lazily from the scrollback
+        self.screen: Optional[ScreenModel] = (
+            create_screen_model(cols, rows) if settings.screen_model_enabled else None
+        )
+        self._screen_lock = asyncio.Lock()
+
         # Logging
-        self.log_buffer = []
         self.log_file_path: Optional[str] = None
+        self.log_stream: Optional[LogStream] = None
+
+        # Traffic counters (read by the metrics collector)
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.connected_at: Optional[float] = None
+
+        # Terminal size (persisted with the session)
+        self.cols = cols
+        self.rows = rows
+
+        # Idle tracking (read by the idle reaper)
+        self.last_activity = time.monotonic()
+
+    @property
+    def connect_timings(self) -> dict:
+        """Connection setup timings (ms per phase)"""
+        return self.engine.timings if self.engine else {}
+
+    @property
+    def connect_failure(self) -> Optional[str]:
+        """Name of the setup phase that failed, if any"""
+        return self.engine.failure if self.engine else None
+
+    @property
+    def pooled(self) -> bool:
+        """Whether the session reuses a pooled transport"""
+        return self.engine.pooled if self.engine else False
 
     async def connect(self) -> bool:
         """
         Establish SSH connection
 
+        Each setup phase is timed separately into ``connect_timings`` (ms).
+
         Returns:
             True if connection successful, False otherwise
         """
-        try:
-            # Create SSH client
-            self.client = paramiko.SSHClient()
-            self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-
-            # Prepare authentication
-            auth_kwargs = {
-                "hostname": self.host,
-                "port": self.port,
-                "username": self.username,
-            }
-
-            if self.password:
-                auth_kwargs["password"] = self.password
-            elif self.private_key:
-                # Load private key
-                from io import StringIO
-                key_file = StringIO(self.private_key)
-                auth_kwargs["pkey"] = paramiko.RSAKey.from_private_key(key_file)
-
-            # Connect in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None, lambda: self.client.connect(**auth_kwargs, timeout=10)
-            )
+        started = time.perf_counter()
 
-            # Open PTY channel
-            self.channel = self.client.invoke_shell(
-                term="xterm-256color", width=80, height=24
-            )
-            self.channel.setblocking(0)
+        try:
+            self.engine = create_engine_session(self)
+            await self.engine.open(width=self.cols, height=self.rows)
 
+            elapsed = time.perf_counter() - started
+            self.connect_timings["total"] = round(elapsed * 1000, 2)
             self.connected = True
-            logger.info(f"SSH connected to {self.host}:{self.port}")
-
-            # Start reading output
-            asyncio.create_task(self._read_loop())
+            self.connected_at = time.monotonic()
+            ssh_connects.labels("success", "none").inc()
+            ssh_connect_duration.labels(str(self.pooled).lower()).observe(elapsed)
+            logger.info(
+                f"SSH connected to {self.host}:{self.port} in "
+                f"{self.connect_timings['total']} ms ({self._format_timings()}"
+                f"{', pooled transport' if self.pooled else ''}, {self.engine.name})"
+            )
 
             return True
 
         except Exception as e:
-            logger.error(f"SSH connection failed: {e}")
+            if self.engine:
+                self.connect_timings["total"] = round((time.perf_counter() - started) * 1000, 2)
+            ssh_connects.labels("failure", self.connect_failure or "setup").inc()
+            logger.error(
+                f"SSH connection failed during {self.connect_failure or 'setup'}: {e} "
+                f"({self._format_timings()})"
+            )
             await self.disconnect()
             return False
 
-    async def send(self, data: str) -> bool:
+    def _format_timings(self) -> str:
+        """Render connect timings for log messages"""
+        return " ".join(f"{phase}={ms}ms" for phase, ms in self.connect_timings.items())
+
+    async def send(self, data: Union[str, bytes]) -> bool:
         """
         Send data to SSH channel
 
         Args:
-            data: String data to send
+            data: String or raw bytes to send
 
         Returns:
             True if sent successfully
         """
-        if not self.connected or not self.channel:
+        if not self.connected or not self.engine:
             return False
 
         try:
-            self.channel.send(data)
-            self._log_data(f">> {data}", is_input=True)
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+            if not self.engine.write(data):
+                return False
+            self.bytes_in += len(data)
+            self.last_activity = time.monotonic()
+            if self.log_stream:
+                self.log_stream.write(data, is_input=True)
             return True
         except Exception as e:
             logger.error(f"Failed to send data: {e}")
@@ -126,13 +200,27 @@ class SSHConnection:
             height: Terminal height in characters
 
         Returns:
-            True if resized successfully
+            True if resized successfully, False if not connected or the
+            size is not an int within the SessionCreate bounds
         """
-        if not self.connected or not self.channel:
+        if not self.connected or not self.engine:
+            return False
+        if not (
+            _in_bounds(width, MIN_TERMINAL_COLS, MAX_TERMINAL_COLS)
+            and _in_bounds(height, MIN_TERMINAL_ROWS, MAX_TERMINAL_ROWS)
+        ):
+            logger.warning(f"Ignoring invalid terminal size {width!r}x{height!r}")
             return False
 
         try:
-            self.channel.resize_pty(width=width, height=height)
+            self.engine.resize(width, height)
+            self.cols, self.rows = width, height
+            if self.screen:
+                async with self._screen_lock:
+                    await self._sync_screen()
+                    self.screen.resize(width, height)
+            if self.log_stream:
+                self.log_stream.resize(width, height)
             logger.debug(f"Terminal resized to {width}x{height}")
             return True
         except Exception as e:
@@ -143,22 +231,19 @@ class SSHConnection:
         """Close SSH connection and cleanup"""
         self.connected = False
 
-        if self.channel:
-            try:
-                self.channel.close()
-            except:
-                pass
-            self.channel = None
+        if self.connected_at is not None:
+            ssh_session_lifetime.observe(time.monotonic() - self.connected_at)
+            self.connected_at = None
 
-        if self.client:
-            try:
-                self.client.close()
-            except:
-                pass
-            self.client = None
+        if self.engine:
+            await self.engine.close()
+
+        self.output.close()
+        self.output_hub.close()
 
-        # Save logs
-        await self._save_logs()
+        # Flush and close log
+        if self.log_stream:
+            self.log_stream.close()
 
         # Trigger disconnect callback
         if self.on_disconnect:
@@ -169,76 +254,135 @@ class SSHConnection:
 
         logger.info(f"SSH disconnected from {self.host}:{self.port}")
 
-    async def _read_loop(self):
-        """Background task to read SSH output"""
-        while self.connected and self.channel:
-            try:
-                # Check if data available
-                if self.channel.recv_ready():
-                    data = self.channel.recv(4096)
-                    if data:
-                        # Log data
-                        self._log_data(data.decode("utf-8", errors="replace"), is_input=False)
-
-                        # Send to callback
-                        if self.on_data:
-                            try:
-                                import inspect
-                                result = self.on_data(data)
-                                # If callback is async, schedule it as a task
-                                if inspect.iscoroutine(result):
-                                    asyncio.create_task(result)
-                            except Exception as e:
-                                logger.error(f"Error in data callback: {e}")
-
-                # Check if channel closed
-                if self.channel.exit_status_ready():
-                    logger.info("SSH channel closed by server")
-                    await self.disconnect()
-                    break
-
-                # Small delay to prevent CPU spinning
-                await asyncio.sleep(0.01)
-
-            except Exception as e:
-                logger.error(f"Error in read loop: {e}")
-                await self.disconnect()
-                break
-
-    def _log_data(self, data: str, is_input: bool):
-        """
-        Log SSH session data
+    def _handle_output(self, data: bytes):
+        """
+        Handle output read from the SSH channel by the engine
+
+        Args:
+            data: Raw bytes received from the server
+        """
+        self.bytes_out += len(data)
+        self.last_activity = time.monotonic()
+        self.scrollback.append(data)
+
+        # Log data
+        if self.log_stream:
+            self.log_stream.write(data, is_input=False)
+
+        # Merge into frames for the data callback
+        self.output.push(data)
+
+    def attach(
+        self,
+        protocol: str,
+        policy: str,
+        read_only: bool = False,
+        offset: Optional[int] = None,
+    ) -> Tuple[Viewer, int, bytes]:
+        """
+        Attach a viewer to the session output
+
+        Pending coalesced output is published first, so the replay and the
+        viewer's live frames meet exactly at the current end of the stream.
 
         Args:
-            data: Data to log
-            is_input: True if data is user input, False if server output
+            protocol: Wire protocol of the viewer
+            policy: Slow-consumer policy of the viewer
+            read_only: Whether the viewer may send input
+            offset: Output offset the client has rendered up to; by default
+                output nobody has seen yet (or none if others are watching)
+
+        Returns:
+            Tuple of (viewer, replay start offset, replay data)
         """
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        direction = "INPUT" if is_input else "OUTPUT"
-        log_entry = f"[{timestamp}] {direction}: {data}"
+        self.output.flush()
+        self.last_activity = time.monotonic()
+        if offset is None:
+            hub = self.output_hub
+            offset = hub.end if hub.viewers else hub.detached_at
 
-        self.log_buffer.append(log_entry)
+        viewer = self.output_hub.subscribe(protocol, policy, read_only)
+        start, replay = self.scrollback.read_from(offset)
+        return viewer, start, replay
 
-        # Flush buffer if too large (>100 entries)
-        if len(self.log_buffer) > 100:
-            asyncio.create_task(self._save_logs())
+    async def get_screen(self, since: int = 0, fmt: str = "text") -> Optional[dict]:
+        """
+        Get a snapshot of the current screen, or the rows changed since a version
 
-    async def _save_logs(self):
-        """Save buffered logs to file"""
-        if not self.log_buffer or not self.log_file_path:
+        Args:
+            since: Screen version the client already has
+            fmt: ``text`` or ``ansi``
+
+        Returns:
+            Snapshot dict, or None without a screen model
+        """
+        if not self.screen:
+            return None
+        async with self._screen_lock:
+            await self._sync_screen()
+            return self.screen.snapshot(since, fmt)
+
+    async def _sync_screen(self):
+        """Feed the screen model the output produced since its last catch-up"""
+        start, data = self.scrollback.read_from(self.screen.offset)
+        if not data and start == self.screen.offset:
             return
+        if len(data) <= INLINE_PARSE_BYTES:
+            self.screen.feed(start, data)
+        else:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.screen.feed, start, data)
 
-        try:
-            import aiofiles
+    def detach(self, viewer: Viewer):
+        """
+        Detach a viewer from the session output
 
-            async with aiofiles.open(self.log_file_path, "a", encoding="utf-8") as f:
-                await f.write("\n".join(self.log_buffer) + "\n")
+        Args:
+            viewer: Viewer returned by attach()
+        """
+        self.output_hub.unsubscribe(viewer)
+
+    def _pause_reading(self):
+        """Stop reading the channel while the output queue is full"""
+        if self.engine:
+            self.engine.pause_reading()
+            logger.debug(f"Session {self.session_id} output paused (viewer behind)")
+
+    def _resume_reading(self):
+        """Resume reading the channel once the output queue has drained"""
+        if self.engine:
+            self.engine.resume_reading()
+            logger.debug(f"Session {self.session_id} output resumed")
+
+    def _handle_eof(self):
+        """Handle channel EOF reported by the engine"""
+        if not self.connected:
+            return
 
-            self.log_buffer.clear()
-            logger.debug(f"Logs saved to {self.log_file_path}")
+        logger.info("SSH channel closed by server")
+        asyncio.create_task(self.disconnect())
 
-        except Exception as e:
-            logger.error(f"Failed to save logs: {e}")
+    def get_stats(self) -> dict:
+        """
+        Get data plane statistics for this session
+
+        Returns:
+            Dict of per-stage statistics
+        """
+        return {
+            "output": self.output.get_stats(),
+            "viewers": self.output_hub.get_stats(),
+            "scrollback": self.scrollback.get_stats(),
+            "idle_seconds": round(time.monotonic() - self.last_activity, 1),
+            "bytes": {"in": self.bytes_in, "out": self.bytes_out},
+            "screen": self.screen.get_stats() if self.screen else None,
+            "input": self.engine.get_input_stats() if self.engine else None,
+            "connect": {
+                **self.connect_timings,
+                "pooled": self.pooled,
+                "engine": self.engine.name if self.engine else None,
+            },
+        }
 
     def set_log_file(self, file_path: str):
         """
@@ -248,3 +392,7 @@ class SSHConnection:
             file_path: Absolute path to log file
         """
         self.log_file_path = file_path
+        recording_path = (
+            recording_path_for(file_path) if settings.recording_enabled else None
+        )
+        self.log_stream = log_writer.open(file_path, recording_path, self.cols, self.rows)
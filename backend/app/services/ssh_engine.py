@@ -0,0 +1,138 @@
+"""
+Pluggable SSH engines behind SSHConnection
+"""
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Awaitable, Optional, TypeVar
+from ..config import settings
+
+if TYPE_CHECKING:
+    from .ssh_connection import SSHConnection
+
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ("paramiko", "asyncssh")
+
+T = TypeVar("T")
+
+
+class EngineSession(ABC):
+    """
+    The SSH side of one terminal session
+
+    ``SSHConnection`` owns everything engine-independent (output coalescing
+    and queueing, logging, recording, metrics). An engine session connects,
+    authenticates and starts a PTY shell, then hands output to
+    ``connection._handle_output`` and reports EOF through
+    ``connection._handle_eof``. Setup phases are timed into ``timings`` (ms)
+    and a failing phase is recorded in ``failure``.
+    """
+
+    name = ""
+
+    def __init__(self, connection: "SSHConnection"):
+        self.connection = connection
+        self.timings: dict = {}
+        self.failure: Optional[str] = None
+        self.pooled = False
+
+    @abstractmethod
+    async def open(self, width: int = 80, height: int = 24):
+        """
+        Connect, authenticate and start the shell
+
+        Args:
+            width: Initial terminal width
+            height: Initial terminal height
+
+        Raises:
+            Exception: Any connect error; ``failure`` names the phase
+        """
+
+    @abstractmethod
+    def write(self, data: bytes) -> bool:
+        """
+        Send or queue input without blocking
+
+        Args:
+            data: Raw input bytes
+
+        Returns:
+            False if the input was rejected
+        """
+
+    @abstractmethod
+    def resize(self, width: int, height: int):
+        """Change the PTY size"""
+
+    @abstractmethod
+    def pause_reading(self):
+        """Stop delivering output (backpressure from the output queue)"""
+
+    @abstractmethod
+    def resume_reading(self):
+        """Resume delivering output"""
+
+    @abstractmethod
+    async def close(self):
+        """Close the channel and release or close the connection"""
+
+    def get_input_stats(self) -> Optional[dict]:
+        """
+        Get input path statistics
+
+        Returns:
+            Dict of input counters, or None before the shell is open
+        """
+        return None
+
+    async def _timed(self, phase: str, awaitable: Awaitable[T]) -> T:
+        """
+        Await one setup phase and record its duration
+
+        Args:
+            phase: Phase name recorded in timings
+            awaitable: Work for the phase
+
+        Returns:
+            Result of the awaitable
+        """
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        except BaseException:
+            self.failure = phase
+            raise
+        finally:
+            self.timings[phase] = round((time.perf_counter() - started) * 1000, 2)
+
+
+def create_engine_session(connection: "SSHConnection") -> EngineSession:
+    """
+    Create an engine session of the configured engine
+
+    Args:
+        connection: Owning SSH connection
+
+    Returns:
+        Engine session for settings.ssh_engine
+
+    Raises:
+        RuntimeError: If the engine is unknown or its library is missing
+    """
+    if settings.ssh_engine == "paramiko":
+        from .paramiko_engine import ParamikoSession
+        return ParamikoSession(connection)
+
+    if settings.ssh_engine == "asyncssh":
+        try:
+            from .asyncssh_engine import AsyncSSHSession
+        except ImportError as e:
+            raise RuntimeError(
+                "SSH_ENGINE=asyncssh requires the asyncssh package"
+            ) from e
+        return AsyncSSHSession(connection)
+
+    raise RuntimeError(f"Unknown SSH engine: {settings.ssh_engine}")
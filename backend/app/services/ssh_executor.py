@@ -0,0 +1,45 @@
+"""
+Dedicated executors for blocking Paramiko calls
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from ..config import settings
+
+
+_connect_executor: Optional[ThreadPoolExecutor] = None
+_input_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_connect_executor() -> ThreadPoolExecutor:
+    """
+    Get the executor used for blocking connection setup and teardown
+
+    Returns:
+        Shared thread pool sized by settings.ssh_connect_workers
+    """
+    global _connect_executor
+    if _connect_executor is None:
+        _connect_executor = ThreadPoolExecutor(
+            max_workers=settings.ssh_connect_workers,
+            thread_name_prefix="ssh-connect",
+        )
+    return _connect_executor
+
+
+def get_input_executor() -> ThreadPoolExecutor:
+    """
+    Get the executor that sends session input
+
+    Kept apart from the connect executor, so slow handshakes never delay
+    keystrokes and a send stuck on a full socket never delays a connect.
+
+    Returns:
+        Shared thread pool sized by settings.ssh_input_workers
+    """
+    global _input_executor
+    if _input_executor is None:
+        _input_executor = ThreadPoolExecutor(
+            max_workers=settings.ssh_input_workers,
+            thread_name_prefix="ssh-input",
+        )
+    return _input_executor
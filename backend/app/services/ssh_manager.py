@@ -3,10 +3,16 @@ SSH Connection Manager - manages multiple SSH connections
 """
 import asyncio
 import logging
-from typing import Dict, Optional
+from typing import Dict, Optional, Set
 from datetime import datetime
 import os
 from .ssh_connection import SSHConnection
+from .idle_reaper import idle_reaper
+from .session_persister import session_persister
+from .log_writer import log_writer
+from .transport_pool import transport_pool
+from .metrics import ssh_connects
+from .session_registry import session_registry
 from ..config import settings
 
 
@@ -18,8 +24,13 @@ class SSHConnectionManager:
 
     def __init__(self):
         self.connections: Dict[str, SSHConnection] = {}
+        self._pending: Set[str] = set()  # sessions still connecting
         self._lock = asyncio.Lock()
 
+        # Traffic of sessions that have been removed
+        self.closed_bytes_in = 0
+        self.closed_bytes_out = 0
+
     async def create_connection(
         self,
         session_id: str,
@@ -29,6 +40,11 @@ class SSHConnectionManager:
         password: Optional[str] = None,
         private_key: Optional[str] = None,
         server_name: Optional[str] = None,
+        passphrase: Optional[str] = None,
+        key_cache_key: Optional[tuple] = None,
+        idle_timeout: Optional[int] = None,
+        cols: int = 80,
+        rows: int = 24,
     ) -> tuple[bool, Optional[str]]:
         """
         Create and establish new SSH connection
@@ -41,19 +57,32 @@ class SSHConnectionManager:
             password: SSH password (if using password auth)
             private_key: Private key content (if using key auth)
             server_name: Friendly server name for logging
+            passphrase: Private key passphrase (if the key is encrypted)
+            key_cache_key: (credential_id, updated_at) for the parsed-key cache
+            idle_timeout: Idle seconds before the session is reaped
+                (None = settings.session_timeout, 0 = never)
+            cols: Initial terminal width
+            rows: Initial terminal height
 
         Returns:
             Tuple of (success, error_message)
         """
+        # Only the checks and the slot reservation are serialized: connects
+        # to different (or the same) targets run concurrently
         async with self._lock:
             # Check if session already exists
-            if session_id in self.connections:
+            if session_id in self.connections or session_id in self._pending:
+                ssh_connects.labels("rejected", "duplicate").inc()
                 return False, "Session already exists"
 
-            # Check max sessions limit
-            if len(self.connections) >= settings.max_sessions:
+            # Check max sessions limit (connects in progress hold a slot)
+            if len(self.connections) + len(self._pending) >= settings.max_sessions:
+                ssh_connects.labels("rejected", "max_sessions").inc()
                 return False, f"Max sessions limit ({settings.max_sessions}) reached"
 
+            self._pending.add(session_id)
+
+        try:
             # Create connection
             connection = SSHConnection(
                 host=host,
@@ -62,52 +91,91 @@ class SSHConnectionManager:
                 password=password,
                 private_key=private_key,
                 server_name=server_name,
+                passphrase=passphrase,
+                key_cache_key=key_cache_key,
+                cols=cols,
+                rows=rows,
             )
 
             connection.session_id = session_id
 
             # Setup log file
-            log_file = self._get_log_file_path(server_name or host)
+            log_file = self._get_log_file_path(server_name or host, session_id)
             connection.set_log_file(log_file)
 
-            # Setup disconnect callback
+            # Setup disconnect callback (a no-op if the session was closed here)
             def on_disconnect():
-                asyncio.create_task(self.remove_connection(session_id))
+                asyncio.create_task(self.remove_connection(session_id, reason="remote"))
 
             connection.on_disconnect = on_disconnect
 
             # Attempt connection
             success = await connection.connect()
+        except BaseException:
+            async with self._lock:
+                self._pending.discard(session_id)
+            raise
 
-            if success:
-                self.connections[session_id] = connection
-                logger.info(
-                    f"SSH session {session_id} created: {username}@{host}:{port}"
-                )
-                return True, None
-            else:
+        async with self._lock:
+            self._pending.discard(session_id)
+            if not success:
                 return False, "Failed to establish SSH connection"
 
-    async def remove_connection(self, session_id: str) -> bool:
+            self.connections[session_id] = connection
+            idle_reaper.track(
+                session_id,
+                connection,
+                settings.session_timeout if idle_timeout is None else idle_timeout,
+            )
+            session_persister.track(session_id, connection)
+
+        await self._register_owner(session_id)
+        logger.info(f"SSH session {session_id} created: {username}@{host}:{port}")
+
+        if not connection.connected:
+            # Closed by the server before it was published
+            await self.remove_connection(session_id, reason="remote")
+        return True, None
+
+    async def remove_connection(self, session_id: str, reason: str = "user") -> bool:
         """
         Remove and disconnect SSH connection
 
         Args:
             session_id: Session identifier
+            reason: Why the session ends, recorded with the session
 
         Returns:
             True if removed successfully
         """
         async with self._lock:
-            connection = self.connections.get(session_id)
+            connection = self.connections.pop(session_id, None)
             if not connection:
                 return False
+            idle_reaper.untrack(session_id)
+            # Counted as closed right away, so the totals never dip
+            bytes_in, bytes_out = connection.bytes_in, connection.bytes_out
+            self.closed_bytes_in += bytes_in
+            self.closed_bytes_out += bytes_out
+
+        # Closing and the registry write do not hold up other sessions
+        await connection.disconnect()
+        self.closed_bytes_in += connection.bytes_in - bytes_in
+        self.closed_bytes_out += connection.bytes_out - bytes_out
+        session_persister.end(session_id, connection, reason)
+        await self._unregister_owner(session_id)
+
+        logger.info(f"SSH session {session_id} removed")
+        return True
+
+    async def expire_idle(self, session_id: str):
+        """
+        Close a session for inactivity and record why it ended
 
-            await connection.disconnect()
-            del self.connections[session_id]
-
-            logger.info(f"SSH session {session_id} removed")
-            return True
+        Args:
+            session_id: Session identifier
+        """
+        await self.remove_connection(session_id, reason="idle_timeout")
 
     def get_connection(self, session_id: str) -> Optional[SSHConnection]:
         """
@@ -161,15 +229,25 @@ class SSHConnectionManager:
     async def disconnect_all(self):
         """Disconnect all active SSH connections"""
         async with self._lock:
-            session_ids = list(self.connections.keys())
+            connections = list(self.connections.items())
+            self.connections.clear()
 
-            for session_id in session_ids:
-                connection = self.connections.get(session_id)
-                if connection:
-                    await connection.disconnect()
+        for session_id, connection in connections:
+            idle_reaper.untrack(session_id)
+            await connection.disconnect()
+            session_persister.end(session_id, connection, "shutdown")
+        logger.info("All SSH sessions disconnected")
 
-            self.connections.clear()
-            logger.info("All SSH sessions disconnected")
+        if settings.session_relay_enabled:
+            try:
+                await session_registry.clear_worker()
+            except Exception as e:
+                logger.warning(f"Failed to clear session owners: {e}")
+
+        # Record the session ends, close pooled transports and write out all session logs
+        await session_persister.stop()
+        await transport_pool.close_all()
+        await log_writer.close()
 
     def get_active_sessions(self) -> list[str]:
         """
@@ -189,12 +267,35 @@ class SSHConnectionManager:
         """
         return len(self.connections)
 
-    def _get_log_file_path(self, server_name: str) -> str:
+    async def _register_owner(self, session_id: str):
+        """Record this worker as the session owner for other workers"""
+        if not settings.session_relay_enabled:
+            return
+        try:
+            await session_registry.register(session_id)
+        except Exception as e:
+            logger.warning(f"Failed to register owner of session {session_id}: {e}")
+
+    async def _unregister_owner(self, session_id: str):
+        """Remove the session from the owner registry"""
+        if not settings.session_relay_enabled:
+            return
+        try:
+            await session_registry.unregister(session_id)
+        except Exception as e:
+            logger.warning(f"Failed to unregister owner of session {session_id}: {e}")
+
+    def _get_log_file_path(self, server_name: str, session_id: str) -> str:
         """
-        Generate log file path for server
+        Generate log file path for a session
+
+        The session ID makes the name unique, so sessions opened to one
+        server within the same second never share a log, or the
+        recording files derived from its name.
 
         Args:
             server_name: Server name
+            session_id: Session identifier
 
         Returns:
             Absolute path to log file
@@ -204,8 +305,8 @@ class SSHConnectionManager:
         server_dir = os.path.join(settings.log_dir, server_name)
         os.makedirs(server_dir, exist_ok=True)
 
-        # Log file name: {server_name}_{timestamp}.log
-        log_file = os.path.join(server_dir, f"{server_name}_{timestamp}.log")
+        # Log file name: {server_name}_{timestamp}_{session_id}.log
+        log_file = os.path.join(server_dir, f"{server_name}_{timestamp}_{session_id}.log")
         return log_file
 
 
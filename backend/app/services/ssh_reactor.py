@@ -0,0 +1,219 @@
+"""
+Event-driven reactor for SSH channel output
+"""
+import asyncio
+import logging
+from typing import Callable, Dict
+from paramiko.channel import Channel
+
+
+logger = logging.getLogger(__name__)
+
+
+class _ChannelWatch:
+    """Per-channel registration state kept by the reactor"""
+
+    __slots__ = (
+        "channel", "fd", "on_data", "on_eof", "read_size", "wakeups", "closed", "paused",
+    )
+
+    def __init__(
+        self,
+        channel: Channel,
+        fd: int,
+        on_data: Callable[[bytes], None],
+        on_eof: Callable[[], None],
+        read_size: int,
+    ):
+        self.channel = channel
+        self.fd = fd
+        self.on_data = on_data
+        self.on_eof = on_eof
+        self.read_size = read_size
+        self.wakeups = 0
+        self.closed = False
+        self.paused = False
+
+
+class SSHReactor:
+    """
+    Watches all Paramiko channels through the event loop selector
+
+    Paramiko exposes a pollable pipe per channel (``Channel.fileno()``) that is
+    signalled whenever data lands in the channel buffer and stays signalled
+    once EOF is received or the channel is closed. Registering that fd with
+    ``loop.add_reader`` means a session only wakes up when there is something
+    to read, instead of every session polling on a timer.
+    """
+
+    # Adaptive read size bounds (bytes)
+    MIN_READ_SIZE = 1024
+    MAX_READ_SIZE = 65536
+    INITIAL_READ_SIZE = 4096
+
+    # Upper bound of bytes drained per wakeup, so one flooding channel cannot
+    # starve the others. Anything left keeps the pipe signalled and is picked
+    # up on the next loop iteration.
+    DRAIN_LIMIT = 262144
+
+    def __init__(self):
+        self._watches: Dict[int, _ChannelWatch] = {}
+        self.wakeups = 0
+        self.bytes_read = 0
+
+    def register(
+        self,
+        channel: Channel,
+        on_data: Callable[[bytes], None],
+        on_eof: Callable[[], None],
+    ):
+        """
+        Start watching a channel for output
+
+        Must be called from the event loop thread.
+
+        Args:
+            channel: Open Paramiko channel
+            on_data: Called with each chunk of output read from the channel
+            on_eof: Called once when the channel reaches EOF or is closed
+        """
+        loop = asyncio.get_running_loop()
+        fd = channel.fileno()
+
+        watch = _ChannelWatch(channel, fd, on_data, on_eof, self.INITIAL_READ_SIZE)
+        self._watches[id(channel)] = watch
+        loop.add_reader(fd, self._on_readable, watch)
+
+        logger.debug(f"Reactor watching channel fd={fd}")
+
+    def unregister(self, channel: Channel):
+        """
+        Stop watching a channel
+
+        Must be called before the channel is closed, since closing the
+        channel also closes the pipe backing its file descriptor.
+
+        Args:
+            channel: Channel previously passed to register()
+        """
+        watch = self._watches.pop(id(channel), None)
+        if not watch:
+            return
+
+        watch.closed = True
+        if not watch.paused:
+            self._remove_reader(watch)
+
+    def pause(self, channel: Channel):
+        """
+        Stop reading from a channel without unregistering it
+
+        Unread data stays in Paramiko's buffer, so the channel window is not
+        replenished and the remote side is throttled by SSH flow control.
+
+        Args:
+            channel: Registered channel
+        """
+        watch = self._watches.get(id(channel))
+        if not watch or watch.paused:
+            return
+
+        watch.paused = True
+        self._remove_reader(watch)
+
+    def resume(self, channel: Channel):
+        """
+        Resume reading from a paused channel
+
+        Args:
+            channel: Registered channel
+        """
+        watch = self._watches.get(id(channel))
+        if not watch or not watch.paused:
+            return
+
+        watch.paused = False
+        asyncio.get_running_loop().add_reader(watch.fd, self._on_readable, watch)
+
+    def get_channel_count(self) -> int:
+        """
+        Get number of watched channels
+
+        Returns:
+            Number of registered channels
+        """
+        return len(self._watches)
+
+    def _remove_reader(self, watch: _ChannelWatch):
+        """Remove a channel fd from the event loop"""
+        try:
+            asyncio.get_running_loop().remove_reader(watch.fd)
+        except Exception as e:
+            logger.debug(f"Failed to remove reader for fd={watch.fd}: {e}")
+
+    def _on_readable(self, watch: _ChannelWatch):
+        """Drain everything that is ready on a channel"""
+        if watch.closed or watch.paused:
+            return
+
+        self.wakeups += 1
+        watch.wakeups += 1
+        channel = watch.channel
+        drained = 0
+
+        try:
+            while drained < self.DRAIN_LIMIT and channel.recv_ready():
+                data = channel.recv(watch.read_size)
+                if not data:
+                    break
+
+                drained += len(data)
+                self._adapt_read_size(watch, len(data))
+
+                try:
+                    watch.on_data(data)
+                except Exception as e:
+                    logger.error(f"Error in data callback: {e}")
+
+                # Callback may have unregistered or paused the channel
+                if watch.closed or watch.paused:
+                    break
+
+            self.bytes_read += drained
+
+            if watch.closed or watch.paused:
+                return
+
+            if drained < self.DRAIN_LIMIT and self._at_eof(channel):
+                self._finish(watch)
+
+        except Exception as e:
+            logger.error(f"Error reading SSH channel: {e}")
+            self._finish(watch)
+
+    def _adapt_read_size(self, watch: _ChannelWatch, received: int):
+        """Grow read size on full reads, shrink it on small ones"""
+        if received >= watch.read_size:
+            watch.read_size = min(watch.read_size * 2, self.MAX_READ_SIZE)
+        elif received < watch.read_size // 4:
+            watch.read_size = max(watch.read_size // 2, self.MIN_READ_SIZE)
+
+    @staticmethod
+    def _at_eof(channel: Channel) -> bool:
+        """Check whether the remote side is done sending"""
+        if channel.recv_ready():
+            return False
+        return channel.closed or channel.eof_received or channel.exit_status_ready()
+
+    def _finish(self, watch: _ChannelWatch):
+        """Unregister a channel and notify its owner of EOF"""
+        on_eof = watch.on_eof
+        self.unregister(watch.channel)
+        try:
+            on_eof()
+        except Exception as e:
+            logger.error(f"Error in EOF callback: {e}")
+
+
+# Global SSH reactor instance
+ssh_reactor = SSHReactor()
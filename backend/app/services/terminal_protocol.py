@@ -0,0 +1,129 @@
+"""
+WebSocket terminal protocol framing
+
+Two wire modes are supported, negotiated per connection with the
+``protocol`` query parameter on ``/ws/ssh/{session_id}``:
+
+    json (default):
+        Every message is a JSON text frame, output is decoded to text.
+
+    binary:
+        Terminal output and input travel as binary frames made of a
+        one-byte type header followed by raw bytes. Control messages
+        (resize, ping, connected, error, ...) stay JSON text frames.
+
+Reattach:
+    A client passing ``offset`` (the number of raw output bytes it has
+    rendered) gets the output after that offset replayed from the session
+    scrollback. The ``connected`` message then carries the offset of the
+    first replayed byte and whether older output had to be skipped.
+"""
+import codecs
+from typing import Optional, Tuple
+
+
+PROTOCOL_JSON = "json"
+PROTOCOL_BINARY = "binary"
+SUPPORTED_PROTOCOLS = (PROTOCOL_JSON, PROTOCOL_BINARY)
+
+# Binary frame type headers
+FRAME_OUTPUT = 0x01
+FRAME_INPUT = 0x02
+
+_OUTPUT_HEADER = bytes([FRAME_OUTPUT])
+
+
+def negotiate_protocol(requested: Optional[str]) -> str:
+    """
+    Pick the wire protocol for a connection
+
+    Args:
+        requested: Value of the ``protocol`` query parameter, if any
+
+    Returns:
+        Negotiated protocol name, falling back to JSON for unknown values
+    """
+    if requested in SUPPORTED_PROTOCOLS:
+        return requested
+    return PROTOCOL_JSON
+
+
+def parse_offset(requested: Optional[str]) -> Optional[int]:
+    """
+    Parse the ``offset`` query parameter
+
+    Args:
+        requested: Value of the ``offset`` query parameter, if any
+
+    Returns:
+        Non-negative output offset, or None for a plain (non-replay) attach
+    """
+    try:
+        offset = int(requested)
+    except (TypeError, ValueError):
+        return None
+    return offset if offset >= 0 else None
+
+
+def encode_output_frame(data: bytes) -> bytes:
+    """
+    Build a binary output frame
+
+    Args:
+        data: Raw terminal output
+
+    Returns:
+        Frame bytes (type header + payload)
+    """
+    return _OUTPUT_HEADER + data
+
+
+def decode_client_frame(frame: bytes) -> Tuple[int, bytes]:
+    """
+    Split a binary client frame into type and payload
+
+    Args:
+        frame: Binary frame received from the client
+
+    Returns:
+        Tuple of (frame_type, payload)
+
+    Raises:
+        ValueError: If the frame is empty
+    """
+    if not frame:
+        raise ValueError("Empty binary frame")
+    return frame[0], frame[1:]
+
+
+class OutputDecoder:
+    """
+    Stateful UTF-8 decoder for terminal output
+
+    Keeps incomplete multibyte sequences between chunks, so characters split
+    across two reads are decoded correctly instead of turning into U+FFFD.
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def decode(self, data: bytes) -> str:
+        """
+        Decode the next chunk of output
+
+        Args:
+            data: Raw output bytes
+
+        Returns:
+            Decoded text (may be empty if the chunk ends mid-character)
+        """
+        return self._decoder.decode(data)
+
+    def flush(self) -> str:
+        """
+        Flush any pending partial sequence
+
+        Returns:
+            Remaining text (replacement characters for incomplete input)
+        """
+        return self._decoder.decode(b"", final=True)
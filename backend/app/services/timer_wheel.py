@@ -0,0 +1,117 @@
+"""
+Hierarchical timer wheel
+"""
+import math
+from typing import Dict, Hashable, List, Set, Tuple
+
+
+class TimerWheel:
+    """
+    Hierarchical hashed timer wheel
+
+    Level 0 has ``slots`` buckets of one tick each, level 1 buckets of
+    ``slots`` ticks, and so on. Scheduling and cancelling are O(1); when a
+    lower level wraps around, the next bucket of the level above is
+    cascaded down. Deadlines beyond the top level's range wait in the top
+    level and are re-filed on every cascade until they come in range.
+    """
+
+    def __init__(self, now: float, tick: float = 1.0, slots: int = 64, levels: int = 4):
+        """
+        Args:
+            now: Current time (seconds, monotonic clock)
+            tick: Resolution in seconds
+            slots: Buckets per level
+            levels: Number of levels
+        """
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self._spans = [slots ** level for level in range(levels)]
+        self._wheels: List[List[Set[Hashable]]] = [
+            [set() for _ in range(slots)] for _ in range(levels)
+        ]
+        self._entries: Dict[Hashable, Tuple[int, int, int]] = {}  # key -> (level, slot, tick)
+        self._current = int(now // tick)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def schedule(self, key: Hashable, deadline: float):
+        """
+        Schedule (or reschedule) a key
+
+        Args:
+            key: Timer key
+            deadline: Expiry time on the same clock as ``now``
+        """
+        self.cancel(key)
+        self._insert(key, max(math.ceil(deadline / self.tick), self._current + 1))
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        Cancel a key
+
+        Args:
+            key: Timer key
+
+        Returns:
+            True if the key was scheduled
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        level, slot, _ = entry
+        self._wheels[level][slot].discard(key)
+        return True
+
+    def advance(self, now: float) -> List[Hashable]:
+        """
+        Move the wheel forward to ``now``
+
+        Args:
+            now: Current time
+
+        Returns:
+            Keys whose deadline has passed
+        """
+        expired: List[Hashable] = []
+        target = int(now // self.tick)
+        while self._current < target:
+            self._current += 1
+            self._cascade()
+
+            bucket = self._wheels[0][self._current % self.slots]
+            if bucket:
+                self._wheels[0][self._current % self.slots] = set()
+                for key in bucket:
+                    del self._entries[key]
+                expired.extend(bucket)
+        return expired
+
+    def _insert(self, key: Hashable, when: int):
+        delta = when - self._current
+        level = 0
+        while level < self.levels - 1 and delta >= self._spans[level + 1]:
+            level += 1
+        slot = (when // self._spans[level]) % self.slots
+        self._wheels[level][slot].add(key)
+        self._entries[key] = (level, slot, when)
+
+    def _cascade(self):
+        """Re-file the upper-level buckets that the current tick enters"""
+        for level in range(1, self.levels):
+            span = self._spans[level]
+            if self._current % span:
+                break
+            slot = (self._current // span) % self.slots
+            bucket = self._wheels[level][slot]
+            if not bucket:
+                continue
+            self._wheels[level][slot] = set()
+            for key in bucket:
+                _, _, when = self._entries.pop(key)
+                self._insert(key, when)
@@ -0,0 +1,242 @@
+"""
+Pool of authenticated SSH transports shared across sessions
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import paramiko
+from .ssh_executor import get_connect_executor
+from ..config import settings
+
+
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[str, int, str, str]
+
+
+def make_pool_key(
+    host: str,
+    port: int,
+    username: str,
+    password: Optional[str] = None,
+    private_key: Optional[str] = None,
+) -> PoolKey:
+    """
+    Build the pool key for a connection target
+
+    The credential part is a digest, so secrets are never kept as dict keys.
+
+    Args:
+        host: SSH server host
+        port: SSH server port
+        username: SSH username
+        password: SSH password
+        private_key: Private key content
+
+    Returns:
+        Hashable pool key
+    """
+    digest = hashlib.sha256(
+        f"{password or ''}\0{private_key or ''}".encode("utf-8")
+    ).hexdigest()
+    return host, port, username, digest
+
+
+class PooledTransport:
+    """An authenticated transport and the number of channels open on it"""
+
+    def __init__(self, key: PoolKey, transport: paramiko.Transport):
+        self.key = key
+        self.transport = transport
+        self.channels = 0
+        self.created = time.monotonic()
+        self.idle_handle: Optional[asyncio.TimerHandle] = None
+
+
+class _KeyLock:
+    """Lock serializing the acquires of one pool key, and how many use it"""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0  # acquires holding or waiting for the lock
+
+
+class TransportPool:
+    """
+    Shares authenticated transports between sessions to the same target
+
+    Sessions to the same (host, port, username, credential) open extra
+    channels on an existing transport instead of doing a new TCP connect,
+    key exchange and authentication. Each transport carries at most
+    ``max_channels`` channels and is closed ``idle_timeout`` seconds after
+    its last channel is released.
+    """
+
+    def __init__(self, max_channels: int = 8, idle_timeout: float = 30.0):
+        self.max_channels = max_channels
+        self.idle_timeout = idle_timeout
+
+        self._transports: Dict[PoolKey, List[PooledTransport]] = defaultdict(list)
+        self._locks: Dict[PoolKey, _KeyLock] = {}
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def acquire(
+        self,
+        key: PoolKey,
+        factory: Callable[[], Awaitable[paramiko.Transport]],
+        reuse: bool = True,
+    ) -> Tuple[PooledTransport, bool]:
+        """
+        Reserve a channel slot on a transport for the given target
+
+        Concurrent acquires for the same key are serialized, so a burst of
+        tab opens creates one transport and the rest reuse it.
+
+        Args:
+            key: Pool key from make_pool_key()
+            factory: Coroutine function that opens a new authenticated transport
+            reuse: Set to False to force a new transport
+
+        Returns:
+            Tuple of (pooled transport, True if an existing transport was reused)
+        """
+        key_lock = self._locks.get(key)
+        if key_lock is None:
+            key_lock = self._locks[key] = _KeyLock()
+        key_lock.users += 1
+        try:
+            async with key_lock.lock:
+                if reuse:
+                    entry = self._find_available(key)
+                    if entry:
+                        self._reserve(entry)
+                        self.hits += 1
+                        return entry, True
+
+                self.misses += 1
+                transport = await factory()
+                entry = PooledTransport(key, transport)
+                self._transports[key].append(entry)
+                self._reserve(entry)
+                return entry, False
+        finally:
+            key_lock.users -= 1
+            if not key_lock.users:
+                # Nobody holds or waits for it; the next acquire makes a new one
+                del self._locks[key]
+
+    def release(self, entry: PooledTransport):
+        """
+        Release a channel slot
+
+        Args:
+            entry: Value returned by acquire()
+        """
+        entry.channels = max(entry.channels - 1, 0)
+        if entry.channels:
+            return
+
+        if not entry.transport.is_active():
+            asyncio.create_task(self._evict(entry))
+            return
+
+        loop = asyncio.get_running_loop()
+        entry.idle_handle = loop.call_later(
+            self.idle_timeout, lambda: asyncio.create_task(self._evict(entry))
+        )
+
+    def retire(self, entry: PooledTransport):
+        """
+        Stop handing out a transport (e.g. the server refused more channels)
+
+        Existing channels keep working; the transport closes once they are
+        released.
+
+        Args:
+            entry: Pooled transport to retire
+        """
+        entries = self._transports.get(entry.key)
+        if entries and entry in entries:
+            entries.remove(entry)
+            if not entries:
+                del self._transports[entry.key]
+
+    async def close_all(self):
+        """Close every pooled transport"""
+        entries = [entry for group in self._transports.values() for entry in group]
+        for entry in entries:
+            await self._evict(entry, force=True)
+
+    def get_stats(self) -> dict:
+        """
+        Get pool statistics
+
+        Returns:
+            Dict with transport/channel counts and hit/miss counters
+        """
+        entries = [entry for group in self._transports.values() for entry in group]
+        return {
+            "transports": len(entries),
+            "channels": sum(entry.channels for entry in entries),
+            "idle_transports": sum(1 for entry in entries if not entry.channels),
+            "key_locks": len(self._locks),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _find_available(self, key: PoolKey) -> Optional[PooledTransport]:
+        """Find a live transport with a free channel slot"""
+        for entry in list(self._transports.get(key, [])):
+            if not entry.transport.is_active():
+                self.retire(entry)
+                if not entry.channels:
+                    asyncio.create_task(self._evict(entry))
+                continue
+            if entry.channels < self.max_channels:
+                return entry
+        return None
+
+    def _reserve(self, entry: PooledTransport):
+        """Take a channel slot and cancel pending idle eviction"""
+        entry.channels += 1
+        if entry.idle_handle:
+            entry.idle_handle.cancel()
+            entry.idle_handle = None
+
+    async def _evict(self, entry: PooledTransport, force: bool = False):
+        """Close a transport that has no channels left"""
+        if entry.channels and not force:
+            return
+
+        if entry.idle_handle:
+            entry.idle_handle.cancel()
+            entry.idle_handle = None
+
+        self.retire(entry)
+        self.evictions += 1
+
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                get_connect_executor(), entry.transport.close
+            )
+        except Exception as e:
+            logger.debug(f"Error closing pooled transport: {e}")
+
+        logger.debug(f"Pooled transport to {entry.key[0]}:{entry.key[1]} closed")
+
+
+# Global transport pool instance
+transport_pool = TransportPool(
+    max_channels=settings.transport_pool_max_channels,
+    idle_timeout=settings.transport_pool_idle_timeout,
+)
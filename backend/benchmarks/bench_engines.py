@@ -0,0 +1,218 @@
+"""
+Benchmark: Paramiko vs AsyncSSH engine at hundreds of sessions
+
+Opens N sessions through SSHConnection against a stand-in SSH server that
+runs in a separate process, so only the client side is measured. Reports
+connect time, OS threads, RSS growth per session and keystroke echo latency
+while all sessions stay open. With ``--engine all`` every engine runs in its
+own subprocess for clean memory and thread numbers.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_engines [--sessions 500] [--engine all]
+        [--duration 10] [--keys-per-sec 2] [--json]
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from benchmarks.bench_load import ProcessSampler, percentile
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def os_threads() -> Optional[int]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+async def echo_loop(connection, tap, duration: float, keys_per_sec: float, latencies: List[float]):
+    """Type a marker, wait for its echo, repeat"""
+    interval = 1 / keys_per_sec
+    deadline = time.perf_counter() + duration
+    seq = 0
+    while time.perf_counter() < deadline:
+        marker = b"<%08d>" % seq
+        seq += 1
+        sent_at = time.perf_counter()
+        if not await connection.send(marker):
+            return
+        received = b""
+        while marker not in received:
+            chunk = await tap.read(30)
+            if chunk is None:
+                return
+            received = received[-9:] + chunk
+        latencies.append((time.perf_counter() - sent_at) * 1000)
+        await asyncio.sleep(max(0.0, interval - (time.perf_counter() - sent_at)))
+
+
+async def run(engine: str, sessions: int, port: int, duration: float, keys_per_sec: float,
+              concurrency: int) -> dict:
+    from app.config import settings
+    from app.services.ssh_connection import SSHConnection
+    from app.services.transport_pool import transport_pool
+    from benchmarks.engine_conformance import OutputTap
+
+    settings.ssh_engine = engine
+    settings.max_sessions = max(settings.max_sessions, sessions)
+    sampler = ProcessSampler(os.getpid())
+
+    threads_before = os_threads()
+    rss_before = sampler.memory_mb()["rss_mb"]
+
+    limit = asyncio.Semaphore(concurrency)
+    connect_ms: List[float] = []
+
+    async def open_one(index: int) -> Optional[SSHConnection]:
+        # Distinct usernames keep the transport pool from sharing transports
+        connection = SSHConnection("127.0.0.1", port, f"bench{index}", password="bench")
+        async with limit:
+            started = time.perf_counter()
+            ok = await connection.connect()
+            connect_ms.append((time.perf_counter() - started) * 1000)
+        return connection if ok else None
+
+    connect_start = time.perf_counter()
+    opened = await asyncio.gather(*[open_one(i) for i in range(sessions)])
+    connect_wall = time.perf_counter() - connect_start
+    connections = [c for c in opened if c]
+    taps = [OutputTap(c) for c in connections]
+
+    # Drop the greeting
+    for tap in taps:
+        try:
+            await tap.read(5)
+        except asyncio.TimeoutError:
+            pass
+
+    threads_open = os_threads()
+    rss_open = sampler.memory_mb()["rss_mb"]
+
+    cpu_start = sampler.cpu_seconds()
+    latencies: List[float] = []
+    wall_start = time.perf_counter()
+    await asyncio.gather(
+        *[echo_loop(c, t, duration, keys_per_sec, latencies) for c, t in zip(connections, taps)],
+        return_exceptions=True,
+    )
+    wall = time.perf_counter() - wall_start
+    cpu_end = sampler.cpu_seconds()
+
+    close_start = time.perf_counter()
+    await asyncio.gather(*[c.disconnect() for c in connections], return_exceptions=True)
+    await transport_pool.close_all()
+    close_wall = time.perf_counter() - close_start
+
+    def rounded(value, digits=2):
+        return round(value, digits) if value is not None else None
+
+    rss_delta = rss_open - rss_before if rss_open and rss_before else None
+    cpu = cpu_end - cpu_start if cpu_start is not None and cpu_end is not None else None
+    return {
+        "engine": engine,
+        "sessions": sessions,
+        "connected": len(connections),
+        "connect_wall_sec": rounded(connect_wall, 3),
+        "connect_p50_ms": rounded(percentile(connect_ms, 0.5)),
+        "connect_p99_ms": rounded(percentile(connect_ms, 0.99)),
+        "threads_before": threads_before,
+        "threads_open": threads_open,
+        "rss_open_mb": rss_open,
+        "rss_kb_per_session": rounded(rss_delta * 1024 / len(connections), 1)
+        if rss_delta is not None and connections else None,
+        "echo_samples": len(latencies),
+        "echo_p50_ms": rounded(percentile(latencies, 0.5)),
+        "echo_p99_ms": rounded(percentile(latencies, 0.99)),
+        "cpu_percent_idle_typing": rounded(cpu / wall * 100 if cpu is not None else None, 1),
+        "close_wall_sec": rounded(close_wall, 3),
+    }
+
+
+def start_stub_server() -> Tuple[subprocess.Popen, int]:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.ssh_stub_server", "--pattern", "echo"],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    return process, int(process.stdout.readline())
+
+
+def run_in_subprocess(engine: str, args, port: int) -> dict:
+    command = [
+        sys.executable, "-m", "benchmarks.bench_engines",
+        "--engine", engine, "--port", str(port), "--json",
+        "--sessions", str(args.sessions),
+        "--duration", str(args.duration),
+        "--keys-per-sec", str(args.keys_per_sec),
+        "--concurrency", str(args.concurrency),
+    ]
+    output = subprocess.run(
+        command, cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output[output.index("{"):])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--engine", choices=("paramiko", "asyncssh", "all"), default="all")
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=10, help="seconds of typing")
+    parser.add_argument("--keys-per-sec", type=float, default=2, help="keystrokes per session")
+    parser.add_argument("--concurrency", type=int, default=64, help="parallel connects")
+    parser.add_argument("--port", type=int, help="use a running stub server")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    # Engine setup needs more connect workers than the server default
+    os.environ.setdefault("SSH_CONNECT_WORKERS", str(args.concurrency))
+    os.environ.setdefault("ENCRYPTION_KEY", "0" * 43 + "=")
+    os.environ.setdefault("RECORDING_ENABLED", "false")
+
+    stub = None
+    port = args.port
+    if port is None:
+        stub, port = start_stub_server()
+
+    try:
+        if args.engine == "all":
+            engines = ["paramiko"]
+            if importlib.util.find_spec("asyncssh") is not None:
+                engines.append("asyncssh")
+            results = [run_in_subprocess(engine, args, port) for engine in engines]
+        else:
+            results = [asyncio.run(run(
+                args.engine, args.sessions, port, args.duration,
+                args.keys_per_sec, args.concurrency,
+            ))]
+    finally:
+        if stub:
+            stub.terminate()
+            stub.wait()
+
+    if args.json:
+        print(json.dumps(results[0] if len(results) == 1 else results, indent=2))
+        return
+
+    keys = list(results[0].keys())
+    print(f"{'':<26}" + "".join(f"{r['engine']:>14}" for r in results))
+    for key in keys[1:]:
+        print(f"{key:<26}" + "".join(f"{str(r[key]):>14}" for r in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Benchmark: session listing cost as the session history grows
+
+Seeds a SQLite database with synthetic session history in stages (by
+default 10k, 100k and 1M rows) and after each stage times the listing
+queries through the API: the latest page, each filter, a page from the
+middle of the history reached by cursor, and (for comparison) the same
+middle page fetched with OFFSET. Keyset pages should cost the same at
+every size; the OFFSET page grows with the depth.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_listing [--sizes 10000,100000,1000000]
+        [--servers 200] [--repeat 20] [--db /tmp/listing.db]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+
+STARTED = datetime(2020, 1, 1)
+SPACING = timedelta(seconds=30)
+
+# How SQLAlchemy stores DateTime in SQLite (values compare as strings)
+SQLITE_DATETIME = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def seed(path: str, start: int, stop: int, servers: int):
+    """Append sessions start..stop-1, one every 30s, the newest few active"""
+    rng = random.Random(start)
+    rows = []
+    for n in range(start, stop):
+        started_at = STARTED + SPACING * n
+        status = "error" if rng.random() < 0.001 else "closed"
+        rows.append((
+            str(uuid.UUID(int=n)),
+            rng.randint(1, servers) if rng.random() < 0.9 else None,
+            status,
+            started_at.strftime(SQLITE_DATETIME),
+            (started_at + timedelta(minutes=rng.randint(1, 120))).strftime(SQLITE_DATETIME),
+            "user",
+            80,
+            24,
+            rng.randint(0, 10000),
+            rng.randint(0, 10000000),
+        ))
+
+    db = sqlite3.connect(path)
+    db.execute("UPDATE ssh_sessions SET status = 'closed' WHERE status = 'active'")
+    db.executemany(
+        "INSERT INTO ssh_sessions (session_id, server_id, status, started_at, ended_at,"
+        " end_reason, terminal_cols, terminal_rows, bytes_in, bytes_out)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    # The newest sessions are still open
+    db.execute(
+        "UPDATE ssh_sessions SET status = 'active', ended_at = NULL, end_reason = NULL"
+        " WHERE id > ?", (stop - 20,)
+    )
+    db.commit()
+    db.execute("ANALYZE")
+    db.close()
+
+
+def create_schema(path: str, servers: int):
+    from sqlalchemy import create_engine
+    from app.database import Base
+    from app import models  # noqa: F401 (register the tables)
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    db = sqlite3.connect(path)
+    created_at = STARTED.strftime(SQLITE_DATETIME)
+    db.executemany(
+        "INSERT INTO ssh_servers (name, host, port, created_at, updated_at) VALUES (?, ?, 22, ?, ?)",
+        [
+            (f"server-{i}", f"10.0.{i // 256}.{i % 256}", created_at, created_at)
+            for i in range(1, servers + 1)
+        ],
+    )
+    db.commit()
+    db.close()
+
+
+async def timed(client, url: str, repeat: int) -> tuple:
+    """Median request time in ms, and the last response"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = await client.get(url)
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return statistics.median(samples), response
+
+
+def offset_ms(path: str, depth: int, repeat: int) -> float:
+    """The middle page with LIMIT/OFFSET, straight from SQLite"""
+    db = sqlite3.connect(path)
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        db.execute(
+            "SELECT * FROM ssh_sessions ORDER BY started_at DESC, id DESC LIMIT 100 OFFSET ?",
+            (depth,),
+        ).fetchall()
+        samples.append((time.perf_counter() - started) * 1000)
+    db.close()
+    return statistics.median(samples)
+
+
+async def measure(path: str, size: int, servers: int, repeat: int) -> dict:
+    import httpx
+    from app.main import app
+
+    middle = (STARTED + SPACING * (size // 2)).isoformat()
+    day_start = (STARTED + SPACING * (size // 3)).isoformat()
+    day_end = (STARTED + SPACING * (size // 3) + timedelta(days=1)).isoformat()
+    urls = {
+        "latest page": "/api/sessions/",
+        "status=active": "/api/sessions/?status=active",
+        "status=error": "/api/sessions/?status=error",
+        "server_id": f"/api/sessions/?server_id={servers // 2}",
+        "one day": f"/api/sessions/?started_after={day_start}&started_before={day_end}",
+        "oldest first": "/api/sessions/?sort=started_at",
+    }
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, url in urls.items():
+            results[name], _ = await timed(client, url, repeat)
+
+        # Cursor just past the middle of the history, then the page after it
+        _, response = await timed(client, f"/api/sessions/?started_before={middle}&limit=1", 1)
+        cursor = response.headers["x-next-cursor"]
+        results["middle page (cursor)"], response = await timed(
+            client, f"/api/sessions/?cursor={cursor}", repeat
+        )
+        assert len(response.json()) == 100
+
+    results["middle page (OFFSET)"] = offset_ms(path, size // 2, repeat)
+    return results
+
+
+def explain(path: str):
+    """Print the query plans of the filtered listings"""
+    db = sqlite3.connect(path)
+    queries = {
+        "status": "status = 'active'",
+        "server": "server_id = 7",
+        "range": "started_at >= '2020-06-01' AND started_at < '2020-06-02'",
+        "cursor": "(started_at, id) < ('2020-06-01', 1000)",
+    }
+    for name, where in queries.items():
+        plan = db.execute(
+            f"EXPLAIN QUERY PLAN SELECT * FROM ssh_sessions WHERE {where}"
+            " ORDER BY started_at DESC, id DESC LIMIT 101"
+        ).fetchall()
+        print(f"  {name:<8}" + " | ".join(row[-1] for row in plan))
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--servers", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--db", help="database file (default: a temporary file)")
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "listing.db")
+    if os.path.exists(path):
+        os.unlink(path)
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    os.environ.setdefault("ENCRYPTION_KEY", "0" * 43 + "=")
+
+    create_schema(path, args.servers)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    columns = []
+    seeded = 0
+    for size in sizes:
+        started = time.perf_counter()
+        seed(path, seeded, size, args.servers)
+        seeded = size
+        print(f"seeded {size} sessions in {time.perf_counter() - started:.1f}s")
+        columns.append(asyncio.run(measure(path, size, args.servers, args.repeat)))
+
+    print(f"\nmedian ms per request{'':<8}" + "".join(f"{size:>12}" for size in sizes))
+    for name in columns[0]:
+        print(f"{name:<29}" + "".join(f"{column[name]:>12.2f}" for column in columns))
+
+    print("\nquery plans:")
+    explain(path)
+    if not args.db:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+"""
+Benchmark: end-to-end load through the real session and WebSocket paths
+
+Starts a stand-in SSH server in this process and the backend as a uvicorn
+subprocess, then opens N sessions through ``POST /api/sessions/`` and
+``/ws/ssh/{session_id}?protocol=binary``. Each client types a short marker
+at a fixed rate and times how long the echo takes to come back through the
+full SSH -> reactor -> WebSocket path, while the stub shells produce
+background output in the chosen pattern.
+
+Reports output throughput, connect and echo latency percentiles, and the
+backend's CPU and RSS (read from /proc, Linux only). With ``--output`` each
+run is appended as one JSON line and compared with the previous run of the
+same configuration in that file.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_load [--sessions 50] [--pattern echo|flood|burst]
+        [--duration 10] [--rate 0] [--keys-per-sec 5] [--output results.jsonl]
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+import websockets
+from cryptography.fernet import Fernet
+
+from benchmarks.ssh_stub_server import PATTERNS, StubSSHServer
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MARKER = re.compile(rb"<(\d{8})>")
+FRAME_OUTPUT = 0x01
+FRAME_INPUT = b"\x02"
+
+# Results compared against the previous run (key, lower is better)
+TRACKED = [
+    ("throughput_mb_per_sec", False),
+    ("echo_p50_ms", True),
+    ("echo_p99_ms", True),
+    ("connect_p99_ms", True),
+    ("server_cpu_percent", True),
+    ("server_peak_rss_mb", True),
+]
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ProcessSampler:
+    """CPU time and memory of a process, read from /proc"""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def cpu_seconds(self) -> Optional[float]:
+        try:
+            with open(f"/proc/{self.pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            # utime and stime are fields 14 and 15 (1-based) of the full line
+            return (int(fields[11]) + int(fields[12])) / self.ticks
+        except (OSError, IndexError, ValueError):
+            return None
+
+    def memory_mb(self) -> Dict[str, Optional[float]]:
+        values = {"VmRSS": None, "VmHWM": None}
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    key, _, rest = line.partition(":")
+                    if key in values:
+                        values[key] = round(int(rest.split()[0]) / 1024, 1)
+        except OSError:
+            pass
+        return {"rss_mb": values["VmRSS"], "peak_rss_mb": values["VmHWM"]}
+
+
+class TerminalClient:
+    """One simulated user: a session plus its WebSocket"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.session_id: Optional[str] = None
+        self.connect_ms: Optional[float] = None
+        self.bytes_received = 0
+        self.frames = 0
+        self.latencies: List[float] = []
+        self.sent = 0
+        self._pending: Dict[int, float] = {}
+        self._tail = b""
+
+    async def open(self, http: httpx.AsyncClient, ssh_port: int):
+        started = time.perf_counter()
+        response = await http.post("/api/sessions/", json={
+            "host": "127.0.0.1",
+            "port": ssh_port,
+            "username": f"bench{self.index}",
+            "password": "bench",
+        })
+        response.raise_for_status()
+        self.connect_ms = (time.perf_counter() - started) * 1000
+        self.session_id = response.json()["session_id"]
+
+    async def run(self, ws_url: str, duration: float, keys_per_sec: float):
+        url = f"{ws_url}/ws/ssh/{self.session_id}?protocol=binary"
+        async with websockets.connect(url, max_size=None, compression=None) as ws:
+            hello = json.loads(await ws.recv())
+            if hello.get("type") != "connected":
+                raise RuntimeError(f"Unexpected greeting: {hello}")
+
+            reader = asyncio.create_task(self._read(ws))
+            try:
+                await self._type(ws, duration, keys_per_sec)
+                # Give the last keystrokes a moment to come back
+                await asyncio.sleep(0.5)
+            finally:
+                reader.cancel()
+
+    async def _type(self, ws, duration: float, keys_per_sec: float):
+        interval = 1 / keys_per_sec if keys_per_sec > 0 else None
+        deadline = time.perf_counter() + duration
+        # Spread clients over the first interval
+        if interval:
+            await asyncio.sleep(interval * (self.index % 97) / 97)
+
+        while time.perf_counter() < deadline:
+            if interval is None:
+                await asyncio.sleep(min(1.0, deadline - time.perf_counter()))
+                continue
+            seq = self.sent
+            self.sent += 1
+            self._pending[seq] = time.perf_counter()
+            await ws.send(FRAME_INPUT + b"<%08d>" % seq)
+            await asyncio.sleep(interval)
+
+    async def _read(self, ws):
+        async for message in ws:
+            if isinstance(message, str):
+                continue
+            now = time.perf_counter()
+            self.frames += 1
+            self.bytes_received += len(message) - 1
+
+            # Markers can straddle frames, so keep a short tail around
+            data = self._tail + message[1:]
+            for match in MARKER.finditer(data):
+                sent_at = self._pending.pop(int(match.group(1)), None)
+                if sent_at is not None:
+                    self.latencies.append((now - sent_at) * 1000)
+            self._tail = data[-9:]
+
+    @property
+    def missing(self) -> int:
+        return len(self._pending)
+
+
+def start_backend(port: int, work_dir: str, sessions: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite+aiosqlite:///{os.path.join(work_dir, 'bench.db')}",
+        "LOG_DIR": os.path.join(work_dir, "logs"),
+        "ENCRYPTION_KEY": Fernet.generate_key().decode(),
+        "MAX_SESSIONS": str(max(sessions, 100)),
+        "SSH_CONNECT_WORKERS": str(max(32, min(sessions, 256))),
+    }
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+
+
+async def wait_healthy(http: httpx.AsyncClient, process: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Backend exited during startup")
+        try:
+            if (await http.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("Backend did not become healthy")
+
+
+async def run(args, work_dir: str) -> dict:
+    stub = StubSSHServer(
+        pattern=args.pattern,
+        rate=args.rate,
+        burst_lines=args.burst_lines,
+        burst_interval=args.burst_interval,
+    )
+    ssh_port = stub.start()
+
+    port = free_port()
+    process = start_backend(port, work_dir, args.sessions)
+    sampler = ProcessSampler(process.pid)
+    base_url = f"http://127.0.0.1:{port}"
+
+    clients = [TerminalClient(i) for i in range(args.sessions)]
+    try:
+        limits = httpx.Limits(max_connections=args.connect_concurrency)
+        async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as http:
+            await wait_healthy(http, process)
+
+            connect_start = time.perf_counter()
+            results = await asyncio.gather(
+                *[client.open(http, ssh_port) for client in clients],
+                return_exceptions=True,
+            )
+            connect_wall = time.perf_counter() - connect_start
+            errors = [r for r in results if isinstance(r, Exception)]
+            connected = [c for c in clients if c.session_id]
+
+            cpu_start = sampler.cpu_seconds()
+            wall_start = time.perf_counter()
+            await asyncio.gather(
+                *[
+                    client.run(f"ws://127.0.0.1:{port}", args.duration, args.keys_per_sec)
+                    for client in connected
+                ],
+                return_exceptions=True,
+            )
+            wall = time.perf_counter() - wall_start
+            cpu_end = sampler.cpu_seconds()
+            memory = sampler.memory_mb()
+
+            await asyncio.gather(
+                *[http.delete(f"/api/sessions/{c.session_id}") for c in connected],
+                return_exceptions=True,
+            )
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        stub.stop()
+
+    latencies = [ms for client in connected for ms in client.latencies]
+    connect_ms = [client.connect_ms for client in connected]
+    received = sum(client.bytes_received for client in connected)
+    cpu = (cpu_end - cpu_start) if cpu_start is not None and cpu_end is not None else None
+
+    def rounded(value, digits=2):
+        return round(value, digits) if value is not None else None
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "config": {
+            "sessions": args.sessions,
+            "pattern": args.pattern,
+            "rate": args.rate,
+            "duration": args.duration,
+            "keys_per_sec": args.keys_per_sec,
+        },
+        "sessions_connected": len(connected),
+        "connect_errors": len(errors),
+        "connect_wall_sec": rounded(connect_wall, 3),
+        "connect_p50_ms": rounded(percentile(connect_ms, 0.5)),
+        "connect_p99_ms": rounded(percentile(connect_ms, 0.99)),
+        "throughput_mb_per_sec": rounded(received / wall / (1024 * 1024)),
+        "frames_per_sec": round(sum(c.frames for c in connected) / wall),
+        "echo_samples": len(latencies),
+        "echo_missing": sum(client.missing for client in connected),
+        "echo_p50_ms": rounded(percentile(latencies, 0.5)),
+        "echo_p99_ms": rounded(percentile(latencies, 0.99)),
+        "echo_max_ms": rounded(max(latencies) if latencies else None),
+        "server_cpu_percent": rounded(cpu / wall * 100 if cpu is not None else None, 1),
+        "server_rss_mb": memory["rss_mb"],
+        "server_peak_rss_mb": memory["peak_rss_mb"],
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def previous_run(path: str, config: dict) -> Optional[dict]:
+    """Most recent stored run with the same configuration"""
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if entry.get("config") == config:
+                previous = entry
+    return previous
+
+
+def print_comparison(result: dict, previous: dict):
+    print(f"\ncompared with {previous.get('commit')} ({previous.get('timestamp')}):")
+    for key, lower_is_better in TRACKED:
+        old, new = previous.get(key), result.get(key)
+        if not old or new is None:
+            continue
+        change = (new - old) / old * 100
+        worse = change > 0 if lower_is_better else change < 0
+        flag = "  <-- regression" if worse and abs(change) >= 10 else ""
+        print(f"  {key:<24} {old:>10} -> {new:<10} ({change:+.1f}%){flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--pattern", choices=PATTERNS, default="echo")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load")
+    parser.add_argument("--rate", type=int, default=0, help="flood bytes/sec per session (0 = unlimited)")
+    parser.add_argument("--burst-lines", type=int, default=200)
+    parser.add_argument("--burst-interval", type=float, default=1.0)
+    parser.add_argument("--keys-per-sec", type=float, default=5, help="keystrokes per session")
+    parser.add_argument("--connect-concurrency", type=int, default=32)
+    parser.add_argument("--output", help="append results as a JSON line to this file")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        result = asyncio.run(run(args, work_dir))
+
+    previous = previous_run(args.output, result["config"]) if args.output else None
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps(result) + "\n")
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for key, value in result.items():
+            if key != "config":
+                print(f"{key:<24} {value}")
+
+    if previous:
+        print_comparison(result, previous)
+
+
+if __name__ == "__main__":
+    main()
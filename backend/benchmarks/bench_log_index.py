@@ -0,0 +1,126 @@
+"""
+Benchmark: incremental indexing of session logs and log search
+
+Many sessions type commands and receive varied output through the shared
+log writer; the log index follows every flush. Reports the indexing time
+and index size per MB of log, times searches over the result, and
+finally rebuilds the index from the logs alone for the uncontended cost.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_log_index [--sessions 50] [--mb 2] [--repeat 20]
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+
+COMMANDS = [
+    "ls -la /var/log", "tail -n 200 /var/log/syslog", "docker ps -a", "kubectl get pods -A",
+    "systemctl status nginx", "df -h", "grep -r ERROR /srv/app/logs", "git pull --rebase",
+    "journalctl -u postgresql --since today", "free -m", "htop", "cat /etc/hosts",
+]
+WORDS = [
+    "request", "completed", "timeout", "connection", "refused", "worker", "started", "GET",
+    "POST", "cache", "miss", "hit", "upstream", "latency", "retry", "checkpoint", "vacuum",
+    "replica", "lag", "disk", "usage", "memory", "pressure", "deploy", "rollback", "healthy",
+]
+
+
+async def session(writer, path: str, total: int, rng: random.Random):
+    """Type commands keystroke by keystroke and print output for them"""
+    stream = writer.open(path)
+    sent = 0
+    while sent < total:
+        command = rng.choice(COMMANDS) + "\r"
+        for key in command:
+            stream.write(key.encode(), is_input=True)
+        for _ in range(rng.randint(5, 40)):
+            line = (
+                f"\x1b[32m{rng.randint(0, 99999):05d}\x1b[0m "
+                + " ".join(rng.choices(WORDS, k=8))
+                + f" id={rng.getrandbits(32):08x}\r\n"
+            ).encode()
+            stream.write(line, is_input=False)
+            sent += len(line)
+        await asyncio.sleep(0)
+    stream.close()
+
+
+async def run(sessions: int, per_session: int, repeat: int):
+    from app.services.log_index import LogIndex, log_index
+    from app.services.log_writer import log_writer
+
+    log_index.start()
+    rng = random.Random(1)
+    log_dir = log_index.log_dir
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        session(log_writer, os.path.join(log_dir, f"s{i}.log"), per_session, random.Random(rng.random()))
+        for i in range(sessions)
+    ])
+    await log_writer.close()
+    if log_index._task:
+        await log_index._task
+    wall = time.perf_counter() - started
+
+    stats = await log_index.get_index_stats()
+    log_mb = stats["log_bytes"] / (1024 * 1024)
+    print(f"sessions:          {sessions}")
+    print(f"log data:          {log_mb:.1f} MB in {wall:.1f}s")
+    print(f"segments:          {stats['segments']}")
+    print(f"indexing:          {stats['index_seconds']:.2f}s ({stats['index_ms_per_mb']} ms/MB)")
+    print(f"index size:        {stats['index_bytes'] / (1024 * 1024):.1f} MB "
+          f"({stats['index_to_log_ratio']:.1%} of the logs)\n")
+
+    searches = [
+        ("one word", {"q": "rollback"}),
+        ("command (input)", {"q": "docker ps", "direction": "input"}),
+        ("two words", {"q": "replica lag"}),
+        ("prefix", {"q": "checkp"}),
+        ("rare token", {"q": f"{rng.getrandbits(32):08x}"}),
+        ("one session", {"q": "timeout", "paths": [os.path.join(log_dir, "s0.log")]}),
+    ]
+    print(f"{'search':<20}{'median ms':>10}{'matches':>9}")
+    for name, params in searches:
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            found = await log_index.search(**params)
+            samples.append((time.perf_counter() - started) * 1000)
+        matches = sum(len(entry["matches"]) for entry in found)
+        print(f"{name:<20}{statistics.median(samples):>10.2f}{matches:>9}")
+
+    await log_index.stop()
+
+    # The same logs indexed from scratch, without writers competing for the GIL
+    rebuild = LogIndex(log_index.path + ".rebuild", log_dir)
+    rebuild._catch_up()
+    stats = rebuild.get_stats()
+    print(f"\nrebuild:           {stats['index_seconds']:.2f}s ({stats['index_ms_per_mb']} ms/MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--mb", type=float, default=2, help="output per session")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ["LOG_DIR"] = os.path.join(directory, "logs")
+    os.environ["LOG_INDEX_PATH"] = os.path.join(directory, "log_index.db")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(directory, 'app.db')}"
+    os.environ.setdefault("ENCRYPTION_KEY", "0" * 43 + "=")
+    try:
+        asyncio.run(run(args.sessions, int(args.mb * 1024 * 1024), args.repeat))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
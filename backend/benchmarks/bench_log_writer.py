@@ -0,0 +1,96 @@
+"""
+Benchmark: session log writer throughput with many noisy sessions
+
+Each simulated session hands output chunks to the shared log writer as
+fast as the event loop allows, interleaved with keystroke-sized input.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_log_writer [--sessions 200] [--mb 2] [--chunk 4096]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from app.services.log_writer import SessionLogWriter
+
+
+LINE = "2024-01-01T00:00:00Z app[1234]: GET /api/v1/items?page=2 200 12ms ✓\r\n"
+
+
+async def noisy_session(writer: SessionLogWriter, path: str, total: int, chunk: bytes):
+    """Push output chunks (and an occasional keystroke) into one log stream"""
+    stream = writer.open(path)
+    sent = 0
+    count = 0
+    while sent < total:
+        stream.write(chunk, is_input=False)
+        sent += len(chunk)
+        count += 1
+        if count % 16 == 0:
+            stream.write(b"q", is_input=True)
+        await asyncio.sleep(0)
+    stream.close()
+
+
+async def run(sessions: int, per_session: int, chunk_size: int, log_dir: str) -> dict:
+    writer = SessionLogWriter()
+    raw = LINE.encode("utf-8")
+    chunk = (raw * (chunk_size // len(raw) + 1))[:chunk_size]
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+
+    await asyncio.gather(*[
+        noisy_session(writer, os.path.join(log_dir, f"s{i}.log"), per_session, chunk)
+        for i in range(sessions)
+    ])
+    await writer.close()
+
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    stats = writer.get_stats()
+    on_disk = sum(
+        os.path.getsize(os.path.join(log_dir, name)) for name in os.listdir(log_dir)
+    )
+    input_mb = sessions * per_session / (1024 * 1024)
+    return {
+        "sessions": sessions,
+        "chunk_size": chunk_size,
+        "input_mb": round(input_mb, 2),
+        "written_mb": round(on_disk / (1024 * 1024), 2),
+        "seconds": round(wall, 3),
+        "mb_per_sec": round(input_mb / wall, 1),
+        "records_per_sec": round(stats["records"] / wall),
+        "cpu_ms_per_mb": round(cpu * 1000 / input_mb, 2),
+        "flushes": stats["flushes"],
+        "dropped": stats["dropped"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--mb", type=float, default=2, help="output MB per session")
+    parser.add_argument("--chunk", type=int, default=4096, help="chunk size in bytes")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        result = asyncio.run(
+            run(args.sessions, int(args.mb * 1024 * 1024), args.chunk, log_dir)
+        )
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    for key, value in result.items():
+        print(f"{key:<16} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Benchmark: server-side screen model parse throughput and snapshot size
+
+Feeds synthetic terminal output through ScreenModel the way a session does
+(appended to a ScrollbackBuffer, parsed lazily in catch-ups) and reports parse
+throughput in MB/s (next to stock ``pyte.Screen`` on the same data),
+snapshot and diff cost, and snapshot size against the raw output a replay
+would send. Requires pyte.
+
+Workloads:
+    plain    - lines of plain text (cat of a log file)
+    colored  - SGR-coloured words (compiler or ls --color output)
+    fullscreen - htop-like repaints: cursor addressing, colours, erase
+    scroll   - vim-like scrolling inside a scroll region
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_screen [--mb 8] [--sync-kb 64] [--cols 160 --rows 48]
+"""
+import argparse
+import random
+import time
+
+import pyte
+
+from app.services.scrollback import ScrollbackBuffer
+from app.services.screen_model import FORMAT_ANSI, FORMAT_TEXT, ScreenModel
+
+
+WORDS = [b"alpha", b"bravo", b"charlie", b"delta", b"echo", b"foxtrot", b"golf", b"hotel"]
+
+
+def plain_output(size: int, cols: int, rows: int) -> bytes:
+    rng = random.Random(1)
+    lines = []
+    total = 0
+    while total < size:
+        line = b" ".join(rng.choice(WORDS) for _ in range(cols // 8)) + b"\r\n"
+        lines.append(line)
+        total += len(line)
+    return b"".join(lines)
+
+
+def colored_output(size: int, cols: int, rows: int) -> bytes:
+    rng = random.Random(2)
+    lines = []
+    total = 0
+    while total < size:
+        words = [
+            b"\x1b[%d;1m%s\x1b[0m" % (rng.randint(31, 37), rng.choice(WORDS))
+            for _ in range(cols // 8)
+        ]
+        line = b" ".join(words) + b"\r\n"
+        lines.append(line)
+        total += len(line)
+    return b"".join(lines)
+
+
+def fullscreen_output(size: int, cols: int, rows: int) -> bytes:
+    rng = random.Random(3)
+    frames = []
+    total = 0
+    while total < size:
+        parts = [b"\x1b[?25l\x1b[H"]
+        for row in range(1, rows + 1):
+            bar = rng.randint(0, cols - 20)
+            parts.append(
+                b"\x1b[%d;1H\x1b[32m%3d%%\x1b[0m [\x1b[42m%s\x1b[0m%s]\x1b[K"
+                % (row, bar * 100 // cols, b" " * bar, b" " * (cols - 20 - bar))
+            )
+        parts.append(b"\x1b[%d;1H\x1b[7mF1Help F10Quit\x1b[0m\x1b[?25h" % rows)
+        frame = b"".join(parts)
+        frames.append(frame)
+        total += len(frame)
+    return b"".join(frames)
+
+
+def scroll_output(size: int, cols: int, rows: int) -> bytes:
+    rng = random.Random(4)
+    parts = [b"\x1b[1;%dr" % (rows - 1)]
+    total = 0
+    while total < size:
+        line = b" ".join(rng.choice(WORDS) for _ in range(cols // 10))
+        if rng.random() < 0.5:
+            chunk = b"\x1b[%d;1H\n\x1b[%d;1H%s\x1b[K" % (rows - 1, rows - 1, line)
+        else:
+            chunk = b"\x1b[1;1H\x1bM\x1b[1;1H%s\x1b[K" % line
+        chunk += b"\x1b[%d;1H\x1b[7m-- INSERT --\x1b[0m" % rows
+        parts.append(chunk)
+        total += len(chunk)
+    return b"".join(parts)
+
+
+WORKLOADS = {
+    "plain": plain_output,
+    "colored": colored_output,
+    "fullscreen": fullscreen_output,
+    "scroll": scroll_output,
+}
+
+
+def catch_up(model: ScreenModel, scrollback: ScrollbackBuffer):
+    start, data = scrollback.read_from(model.offset)
+    model.feed(start, data)
+
+
+def run(name: str, data: bytes, cols: int, rows: int, sync_bytes: int) -> dict:
+    scrollback = ScrollbackBuffer(max(sync_bytes * 2, 262144))
+    model = ScreenModel(cols, rows)
+
+    # Output arrives in SSH-sized chunks; the model catches up every sync_bytes
+    started = time.perf_counter()
+    pending = 0
+    for offset in range(0, len(data), 4096):
+        chunk = data[offset:offset + 4096]
+        scrollback.append(chunk)
+        pending += len(chunk)
+        if pending >= sync_bytes:
+            catch_up(model, scrollback)
+            pending = 0
+    catch_up(model, scrollback)
+    elapsed = time.perf_counter() - started
+
+    timings = {}
+    snapshots = {}
+    for fmt in (FORMAT_TEXT, FORMAT_ANSI):
+        started = time.perf_counter()
+        snapshots[fmt] = model.snapshot(0, fmt)
+        timings[fmt] = (time.perf_counter() - started) * 1000
+
+    # One more line of output, then a diff against the previous version
+    seq = model.seq
+    scrollback.append(b"\x1b[5;1Hone changed line\x1b[K")
+    started = time.perf_counter()
+    catch_up(model, scrollback)
+    diff = model.snapshot(seq, FORMAT_ANSI)
+    diff_ms = (time.perf_counter() - started) * 1000
+
+    # Stock pyte screen, for comparison with the ASCII fast path
+    baseline = data[:1000000]
+    stream = pyte.ByteStream(pyte.Screen(cols, rows))
+    started = time.perf_counter()
+    for offset in range(0, len(baseline), sync_bytes):
+        stream.feed(baseline[offset:offset + sync_bytes])
+    baseline_elapsed = time.perf_counter() - started
+
+    def size(snapshot: dict) -> int:
+        return sum(len(content.encode("utf-8")) for _, content in snapshot["lines"])
+
+    return {
+        "workload": name,
+        "input_mb": round(len(data) / 1e6, 2),
+        "parse_mb_per_sec": round(len(data) / elapsed / 1e6, 2),
+        "pyte_mb_per_sec": round(len(baseline) / baseline_elapsed / 1e6, 2),
+        "snapshot_text_ms": round(timings[FORMAT_TEXT], 2),
+        "snapshot_ansi_ms": round(timings[FORMAT_ANSI], 2),
+        "snapshot_text_kb": round(size(snapshots[FORMAT_TEXT]) / 1024, 1),
+        "snapshot_ansi_kb": round(size(snapshots[FORMAT_ANSI]) / 1024, 1),
+        "replay_kb": round(scrollback.get_stats()["retained_bytes"] / 1024, 1),
+        "diff_rows": len(diff["lines"]),
+        "diff_ms": round(diff_ms, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mb", type=float, default=8, help="output per workload")
+    parser.add_argument("--sync-kb", type=int, default=64, help="output between catch-ups")
+    parser.add_argument("--cols", type=int, default=160)
+    parser.add_argument("--rows", type=int, default=48)
+    parser.add_argument("--workload", choices=list(WORKLOADS) + ["all"], default="all")
+    args = parser.parse_args()
+
+
+    names = list(WORKLOADS) if args.workload == "all" else [args.workload]
+    results = []
+    for name in names:
+        data = WORKLOADS[name](int(args.mb * 1e6), args.cols, args.rows)
+        results.append(run(name, data, args.cols, args.rows, args.sync_kb * 1024))
+
+    keys = list(results[0].keys())
+    print(f"{'':<20}" + "".join(f"{r['workload']:>12}" for r in results))
+    for key in keys[1:]:
+        print(f"{key:<20}" + "".join(f"{str(r[key]):>12}" for r in results))
+
+
+if __name__ == "__main__":
+    main()
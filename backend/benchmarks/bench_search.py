@@ -0,0 +1,131 @@
+"""
+Benchmark: server search and tag queries on a large inventory
+
+Imports N synthetic servers through the bulk import (so tag rows and the
+full-text index are built the way they are in production), then times
+GET /api/servers/search for typical queries, tag filters on the listing,
+and an unindexed LIKE scan for comparison.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_search [--servers 50000] [--repeat 20]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+
+ROLES = ["web", "db", "cache", "queue", "worker", "proxy", "search", "metrics"]
+ENVS = ["prod", "staging", "dev"]
+REGIONS = ["us-east-1", "us-west-2", "eu-west-1", "ap-south-1"]
+WORDS = [
+    "primary", "replica", "frontend", "backend", "batch", "legacy", "canary", "internal",
+    "nginx", "postgres", "redis", "kafka", "elastic", "grafana", "haproxy", "rabbitmq",
+    "billing", "payments", "checkout", "inventory", "auth", "reporting", "analytics", "mail",
+    "blue", "green", "shard", "archive", "ingest", "export", "scheduler", "gateway",
+]
+
+
+def inventory(count: int):
+    rng = random.Random(1)
+    for i in range(count):
+        role, env, region = rng.choice(ROLES), rng.choice(ENVS), rng.choice(REGIONS)
+        yield {
+            "name": f"{role}-{i:05d}.{env}.{region}",
+            "host": f"10.{i // 65536}.{i // 256 % 256}.{i % 256}",
+            "description": " ".join(rng.sample(WORDS, 3)) + f" {role} node",
+            "tags": json.dumps([env, role, region] + (["pci"] if rng.random() < 0.01 else [])),
+        }
+
+
+async def timed(client, url: str, params, repeat: int) -> tuple:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = await client.get(url, params=params)
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return statistics.median(samples), len(response.json())
+
+
+async def run(count: int, repeat: int):
+    import httpx
+    from sqlalchemy import or_, select
+    from app.database import AsyncSessionLocal, init_db
+    from app.main import app
+    from app.models.server import SSHServer
+    from app.services.server_search import server_search
+
+    await init_db()
+    await server_search.setup()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        body = "\n".join(json.dumps(row) for row in inventory(count)).encode("utf-8")
+        started = time.perf_counter()
+        response = await client.post("/api/servers/import", content=body)
+        report = response.json()
+        print(
+            f"imported {report['created']} servers in {time.perf_counter() - started:.1f}s "
+            f"(full-text index: {'FTS5' if server_search.fts_enabled else 'LIKE fallback'})\n"
+        )
+
+        searches = [
+            ("search: one word", "/api/servers/search", {"q": "replica"}),
+            ("search: broad (1/3 of servers)", "/api/servers/search", {"q": "prod"}),
+            ("search: prefix while typing", "/api/servers/search", {"q": "web-01"}),
+            ("search: two words", "/api/servers/search", {"q": "canary cache"}),
+            ("search: host prefix", "/api/servers/search", {"q": "10.0.12"}),
+            ("search: no match", "/api/servers/search", {"q": "zzzz"}),
+            ("search: word + tag", "/api/servers/search", {"q": "primary", "tag": "pci"}),
+            ("list: tag=pci", "/api/servers/", {"tag": "pci"}),
+            ("list: tag=prod&tag=db", "/api/servers/", [("tag", "prod"), ("tag", "db")]),
+            ("tags", "/api/servers/tags", None),
+        ]
+        print(f"{'query':<32}{'median ms':>10}{'results':>9}")
+        for name, url, params in searches:
+            elapsed, results = await timed(client, url, params, repeat)
+            print(f"{name:<32}{elapsed:>10.2f}{results:>9}")
+
+    # Without the index a word that matches little scans the whole table
+    samples = []
+    async with AsyncSessionLocal() as db:
+        for _ in range(max(1, repeat // 4)):
+            started = time.perf_counter()
+            pattern = "%zzzz%"
+            await db.execute(
+                select(SSHServer)
+                .where(or_(
+                    SSHServer.name.ilike(pattern),
+                    SSHServer.host.ilike(pattern),
+                    SSHServer.description.ilike(pattern),
+                    SSHServer.tags.ilike(pattern),
+                ))
+                .order_by(SSHServer.name)
+                .limit(20)
+            )
+            samples.append((time.perf_counter() - started) * 1000)
+    print(f"{'LIKE, no match (no index)':<32}{statistics.median(samples):>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--servers", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "search.db")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    os.environ.setdefault("ENCRYPTION_KEY", "0" * 43 + "=")
+    try:
+        asyncio.run(run(args.servers, args.repeat))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
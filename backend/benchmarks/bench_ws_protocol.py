@@ -0,0 +1,131 @@
+"""
+Benchmark: JSON text vs binary WebSocket output framing
+
+Measures the per-chunk work both ends do for terminal output in each
+protocol mode, without network I/O:
+
+    json:   incremental UTF-8 decode + json.dumps + UTF-8 encode (server),
+            json.loads (client)
+    binary: header + payload concatenation (server), header split (client)
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_ws_protocol [--mb 64] [--chunk 4096]
+"""
+import argparse
+import json
+import time
+
+from app.services.terminal_protocol import (
+    FRAME_OUTPUT,
+    OutputDecoder,
+    encode_output_frame,
+)
+
+
+SAMPLE_TEXT = (
+    "drwxr-xr-x  2 root root 4096 Jan  1 00:00 日本語ディレクトリ\r\n"
+    "\x1b[32mOK\x1b[0m  processed 1024 records ✓ café naïve \U0001f680\r\n"
+)
+
+
+def make_chunks(total_bytes: int, chunk_size: int) -> list[bytes]:
+    """Split a realistic mixed ASCII/multibyte stream into fixed-size reads"""
+    raw = SAMPLE_TEXT.encode("utf-8")
+    stream = raw * (total_bytes // len(raw) + 1)
+    stream = stream[:total_bytes]
+    return [stream[i:i + chunk_size] for i in range(0, len(stream), chunk_size)]
+
+
+def run_json(chunks: list[bytes]) -> tuple[int, int]:
+    """Server encode + client decode in JSON text mode"""
+    decoder = OutputDecoder()
+    wire_bytes = 0
+    replaced = 0
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if not text:
+            continue
+        frame = json.dumps({"type": "output", "data": text}).encode("utf-8")
+        wire_bytes += len(frame)
+        message = json.loads(frame)
+        replaced += message["data"].count("\ufffd")
+    return wire_bytes, replaced
+
+
+def run_binary(chunks: list[bytes]) -> tuple[int, int]:
+    """Server encode + client decode in binary mode"""
+    wire_bytes = 0
+    for chunk in chunks:
+        frame = encode_output_frame(chunk)
+        wire_bytes += len(frame)
+        view = memoryview(frame)
+        if view[0] == FRAME_OUTPUT:
+            payload = view[1:]
+            del payload
+    return wire_bytes, 0
+
+
+def count_legacy_corruption(chunks: list[bytes]) -> int:
+    """Replacement characters produced by the old per-chunk decode"""
+    return sum(
+        chunk.decode("utf-8", errors="replace").count("\ufffd") for chunk in chunks
+    )
+
+
+def measure(name: str, func, chunks: list[bytes], payload_bytes: int) -> dict:
+    """Time one mode"""
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    wire_bytes, replaced = func(chunks)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    mb = payload_bytes / (1024 * 1024)
+    return {
+        "mode": name,
+        "payload_mb": round(mb, 2),
+        "wire_mb": round(wire_bytes / (1024 * 1024), 2),
+        "mb_per_sec": round(mb / wall, 1) if wall else float("inf"),
+        "cpu_ms_per_mb": round(cpu * 1000 / mb, 3),
+        "replacement_chars": replaced,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mb", type=int, default=64, help="payload size in MB")
+    parser.add_argument("--chunk", type=int, default=4096, help="read size in bytes")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    payload_bytes = args.mb * 1024 * 1024
+    chunks = make_chunks(payload_bytes, args.chunk)
+
+    results = [
+        measure("json", run_json, chunks, payload_bytes),
+        measure("binary", run_binary, chunks, payload_bytes),
+    ]
+
+    if args.json:
+        print(json.dumps({
+            "chunk_size": args.chunk,
+            "legacy_replacement_chars": count_legacy_corruption(chunks),
+            "results": results,
+        }, indent=2))
+        return
+
+    print(f"{len(chunks)} chunks of {args.chunk} bytes")
+    print(f"{'mode':<8} {'MB/s':>10} {'CPU ms/MB':>10} {'wire MB':>9} {'U+FFFD':>7}")
+    for r in results:
+        print(
+            f"{r['mode']:<8} {r['mb_per_sec']:>10} {r['cpu_ms_per_mb']:>10} "
+            f"{r['wire_mb']:>9} {r['replacement_chars']:>7}"
+        )
+    print(
+        "legacy per-chunk decode would have produced "
+        f"{count_legacy_corruption(chunks)} replacement characters"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Behavioral conformance checks for the SSH engines
+
+Runs the same scenarios against every engine through SSHConnection, using
+the stand-in SSH server: connect and greeting, echo, in-order delivery of
+a large paste, resize, output backpressure, fan-out to several viewers,
+server-side exit and connect failure reporting. Exits non-zero if any
+engine fails a check.
+
+Usage (from the backend directory):
+    python -m benchmarks.engine_conformance [--engine paramiko|asyncssh|all]
+"""
+import argparse
+import asyncio
+import importlib.util
+import sys
+import time
+import traceback
+from typing import Optional
+
+from app.config import settings
+from app.services.output_hub import POLICY_BLOCK, POLICY_DROP, Viewer
+from app.services.ssh_connection import SSHConnection
+from app.services.ssh_engine import ENGINES
+from app.services.terminal_protocol import PROTOCOL_BINARY
+from app.services.transport_pool import transport_pool
+from benchmarks.ssh_stub_server import StubSSHServer
+
+
+TIMEOUT = 10
+
+
+class CheckFailed(Exception):
+    pass
+
+
+def expect(condition: bool, message: str):
+    if not condition:
+        raise CheckFailed(message)
+
+
+class OutputTap:
+    """Viewer that reads session output from the start of the stream"""
+
+    def __init__(self, connection: SSHConnection, policy: str = POLICY_BLOCK):
+        self.viewer: Viewer
+        self.viewer, _, self.pending = connection.attach(
+            PROTOCOL_BINARY, policy, offset=0
+        )
+
+    async def read(self, timeout: float = TIMEOUT) -> Optional[bytes]:
+        """Next output chunk, or None once the session has ended"""
+        if self.pending:
+            data, self.pending = self.pending, b""
+            return data
+        frame = await asyncio.wait_for(self.viewer.get(), timeout)
+        return frame.data if frame is not None else None
+
+
+async def read_until(tap: OutputTap, needle: bytes, timeout: float = TIMEOUT) -> bytes:
+    """Read output until needle shows up"""
+    received = b""
+    deadline = time.monotonic() + timeout
+    while needle not in received:
+        remaining = deadline - time.monotonic()
+        expect(remaining > 0, f"timed out waiting for {needle[:40]!r}")
+        chunk = await tap.read(remaining)
+        expect(chunk is not None, "output closed early")
+        received += chunk
+    return received
+
+
+async def open_connection(port: int, username: str = "conformance") -> SSHConnection:
+    connection = SSHConnection("127.0.0.1", port, username, password="secret")
+    expect(await connection.connect(), f"connect failed ({connection.connect_failure})")
+    return connection
+
+
+async def check_connect(echo_port: int, flood_port: int):
+    connection = await open_connection(echo_port)
+    tap = OutputTap(connection)
+    try:
+        expect(connection.connected, "not marked connected")
+        expect("total" in connection.connect_timings, "no total connect timing")
+        await read_until(tap, b"stub shell ready")
+    finally:
+        await connection.disconnect()
+
+
+async def check_echo(echo_port: int, flood_port: int):
+    connection = await open_connection(echo_port)
+    tap = OutputTap(connection)
+    try:
+        await read_until(tap, b"$ ")
+        expect(await connection.send("hello engine\n"), "send returned False")
+        await read_until(tap, b"hello engine\n")
+        expect(await connection.send(b"raw \xe2\x9c\x93\n"), "send(bytes) returned False")
+        await read_until(tap, b"raw \xe2\x9c\x93\n")
+    finally:
+        await connection.disconnect()
+
+
+async def check_large_paste(echo_port: int, flood_port: int):
+    connection = await open_connection(echo_port)
+    tap = OutputTap(connection)
+    try:
+        await read_until(tap, b"$ ")
+        payload = b"".join(b"line %07d\n" % i for i in range(200000))  # ~2.4 MB
+        for offset in range(0, len(payload), 4096):
+            expect(await connection.send(payload[offset:offset + 4096]), "paste rejected")
+
+        received = b""
+        deadline = time.monotonic() + 30
+        while len(received) < len(payload):
+            remaining = deadline - time.monotonic()
+            expect(remaining > 0, f"paste echo stalled at {len(received)} bytes")
+            chunk = await tap.read(remaining)
+            expect(chunk is not None, "output closed during paste")
+            received += chunk
+        expect(received == payload, "paste echo out of order or corrupted")
+    finally:
+        await connection.disconnect()
+
+
+async def check_resize(echo_port: int, flood_port: int):
+    connection = await open_connection(echo_port)
+    tap = OutputTap(connection)
+    try:
+        expect(await connection.resize(132, 43), "resize returned False")
+        expect(await connection.send("still alive\n"), "send after resize failed")
+        await read_until(tap, b"still alive\n")
+    finally:
+        await connection.disconnect()
+
+
+async def check_backpressure(echo_port: int, flood_port: int):
+    connection = await open_connection(flood_port)
+    tap = OutputTap(connection)
+    try:
+        # Nobody drains the viewer: reading must pause at the high watermark
+        await asyncio.sleep(1.0)
+        stats = tap.viewer.queue.get_stats()
+        expect(stats["paused"], "reading not paused with a full output queue")
+        limit = settings.output_queue_max_bytes + settings.output_coalesce_max_bytes * 2
+        expect(stats["peak_bytes"] <= limit, f"queue grew to {stats['peak_bytes']} bytes")
+
+        # Draining must resume the flow
+        drained = 0
+        deadline = time.monotonic() + TIMEOUT
+        while drained < settings.output_queue_max_bytes * 3:
+            expect(time.monotonic() < deadline, "output did not resume after draining")
+            chunk = await tap.read()
+            expect(chunk is not None, "output closed during flood")
+            drained += len(chunk)
+    finally:
+        await connection.disconnect()
+
+
+async def check_fanout(echo_port: int, flood_port: int):
+    connection = await open_connection(echo_port)
+    first = OutputTap(connection)
+    second = OutputTap(connection)
+    try:
+        await read_until(first, b"$ ")
+        await read_until(second, b"$ ")
+        expect(await connection.send("both viewers\n"), "send returned False")
+        await read_until(first, b"both viewers\n")
+        await read_until(second, b"both viewers\n")
+        hub = connection.output_hub.get_stats()
+        expect(hub["encodings"] <= hub["frames"], "frames encoded once per viewer")
+    finally:
+        await connection.disconnect()
+
+    # A stalled dropping viewer must not hold up a blocking one
+    connection = await open_connection(flood_port)
+    reader = OutputTap(connection)
+    stalled = OutputTap(connection, policy=POLICY_DROP)
+    try:
+        drained = 0
+        deadline = time.monotonic() + TIMEOUT
+        while drained < settings.output_queue_max_bytes * 3:
+            expect(time.monotonic() < deadline, "stalled viewer held up the session")
+            chunk = await reader.read()
+            expect(chunk is not None, "output closed during flood")
+            drained += len(chunk)
+        expect(stalled.viewer.dropped_bytes > 0, "stalled viewer dropped nothing")
+    finally:
+        await connection.disconnect()
+
+
+async def check_server_exit(echo_port: int, flood_port: int):
+    connection = await open_connection(echo_port)
+    tap = OutputTap(connection)
+    closed = asyncio.Event()
+    connection.on_disconnect = closed.set
+    try:
+        await read_until(tap, b"$ ")
+        await connection.send("exit\n")
+        await asyncio.wait_for(closed.wait(), TIMEOUT)
+        expect(not connection.connected, "still marked connected after exit")
+
+        # Remaining output drains, then the viewer reports closed
+        while True:
+            chunk = await tap.read()
+            if chunk is None:
+                break
+    finally:
+        await connection.disconnect()
+
+
+async def check_connect_failure(echo_port: int, flood_port: int):
+    # Grab a free port and leave it closed
+    import socket
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        closed_port = sock.getsockname()[1]
+
+    connection = SSHConnection("127.0.0.1", closed_port, "nobody", password="x")
+    expect(not await connection.connect(), "connect to a closed port succeeded")
+    expect(connection.connect_failure == "tcp", f"failure phase {connection.connect_failure!r}")
+
+
+CHECKS = [
+    check_connect,
+    check_echo,
+    check_large_paste,
+    check_resize,
+    check_backpressure,
+    check_fanout,
+    check_server_exit,
+    check_connect_failure,
+]
+
+
+async def run_engine(engine: str, echo_port: int, flood_port: int) -> dict:
+    settings.ssh_engine = engine
+    results = {}
+    for check in CHECKS:
+        name = check.__name__[len("check_"):]
+        try:
+            await asyncio.wait_for(check(echo_port, flood_port), 60)
+            results[name] = "pass"
+        except Exception as e:
+            detail = str(e) or type(e).__name__
+            if not isinstance(e, CheckFailed):
+                detail = "".join(traceback.format_exception_only(type(e), e)).strip()
+            results[name] = f"FAIL: {detail}"
+    await transport_pool.close_all()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--engine", choices=ENGINES + ("all",), default="all")
+    args = parser.parse_args()
+
+    engines = ENGINES if args.engine == "all" else (args.engine,)
+
+    echo_server = StubSSHServer(pattern="echo")
+    flood_server = StubSSHServer(pattern="flood")
+    echo_port = echo_server.start()
+    flood_port = flood_server.start()
+
+    failed = False
+    try:
+        for engine in engines:
+            if engine == "asyncssh" and importlib.util.find_spec("asyncssh") is None:
+                print(f"{engine}: skipped (asyncssh not installed)")
+                continue
+
+            results = asyncio.run(run_engine(engine, echo_port, flood_port))
+            print(engine)
+            for name, outcome in results.items():
+                print(f"  {name:<18} {outcome}")
+                failed = failed or outcome != "pass"
+    finally:
+        echo_server.stop()
+        flood_server.stop()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+In-process stand-in SSH server for benchmarks
+
+Accepts any password or key and gives every session a fake shell that
+echoes input back (like a terminal in cooked mode) and exits on an
+``exit`` line, while emitting background output in one of these patterns:
+
+    echo    no background output, interactive echo only
+    flood   ``yes``-style output as fast as the channel window allows,
+            or capped at ``rate`` bytes/sec
+    burst   ``burst_lines`` log lines every ``burst_interval`` seconds
+
+Usage:
+    server = StubSSHServer(pattern="flood", rate=1_000_000)
+    port = server.start()
+    ...
+    server.stop()
+
+or as a separate process (prints the port, then serves until killed):
+    python -m benchmarks.ssh_stub_server [--pattern echo] [--port 0]
+"""
+import argparse
+import socket
+import threading
+import time
+from typing import List, Optional
+
+import paramiko
+
+
+PATTERNS = ("echo", "flood", "burst")
+
+LOG_LINE = b"2024-01-01T00:00:00.000Z worker[4242]: processed batch id=000000 items=128 in 12ms\r\n"
+
+
+class _ShellServer(paramiko.ServerInterface):
+    """Permissive server interface that starts a fake shell per channel"""
+
+    def __init__(self, stub: "StubSSHServer"):
+        self.stub = stub
+
+    def get_allowed_auths(self, username):
+        return "password,publickey"
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_auth_publickey(self, username, key):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED_OPEN_FAILED
+
+    def check_channel_pty_request(self, *args):
+        return True
+
+    def check_channel_window_change_request(self, *args):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        threading.Thread(target=self.stub._run_shell, args=(channel,), daemon=True).start()
+        return True
+
+
+class StubSSHServer:
+    """Threaded SSH server with scripted shells"""
+
+    def __init__(
+        self,
+        pattern: str = "echo",
+        rate: int = 0,
+        burst_lines: int = 200,
+        burst_interval: float = 1.0,
+    ):
+        """
+        Args:
+            pattern: Background output pattern, one of PATTERNS
+            rate: Flood rate cap in bytes/sec per session (0 = unlimited)
+            burst_lines: Lines per burst for the burst pattern
+            burst_interval: Seconds between bursts
+        """
+        if pattern not in PATTERNS:
+            raise ValueError(f"Unknown pattern {pattern!r}, expected one of {PATTERNS}")
+
+        self.pattern = pattern
+        self.rate = rate
+        self.burst_lines = burst_lines
+        self.burst_interval = burst_interval
+
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self._sock: Optional[socket.socket] = None
+        self._transports: List[paramiko.Transport] = []
+        self._stopped = threading.Event()
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """
+        Start listening in a background thread
+
+        Returns:
+            Bound port
+        """
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((host, port))
+        self._sock.listen(1024)
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self._sock.getsockname()[1]
+
+    def stop(self):
+        """Stop accepting and close every transport"""
+        self._stopped.set()
+        if self._sock:
+            self._sock.close()
+        for transport in self._transports:
+            transport.close()
+
+    def _accept_loop(self):
+        while not self._stopped.is_set():
+            try:
+                client, _ = self._sock.accept()
+            except OSError:
+                return
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            transport = paramiko.Transport(client)
+            transport.add_server_key(self.host_key)
+            self._transports.append(transport)
+            # Negotiate in the background so connects are not serialized
+            transport.start_server(event=threading.Event(), server=_ShellServer(self))
+
+    def _run_shell(self, channel: paramiko.Channel):
+        """Echo input and run the background output pattern"""
+        channel.sendall(b"stub shell ready\r\n$ ")
+        if self.pattern != "echo":
+            threading.Thread(target=self._emit, args=(channel,), daemon=True).start()
+
+        try:
+            while not self._stopped.is_set():
+                data = channel.recv(65536)
+                if not data:
+                    break
+                if data.strip() == b"exit":
+                    channel.send_exit_status(0)
+                    break
+                channel.sendall(data)
+        except (EOFError, OSError):
+            pass
+        finally:
+            channel.close()
+
+    def _emit(self, channel: paramiko.Channel):
+        """Write background output until the channel closes"""
+        try:
+            if self.pattern == "flood":
+                self._flood(channel)
+            else:
+                self._burst(channel)
+        except (EOFError, OSError):
+            pass
+
+    def _flood(self, channel: paramiko.Channel):
+        block = b"y\r\n" * 2048
+        started = time.monotonic()
+        sent = 0
+        while not channel.closed and not self._stopped.is_set():
+            channel.sendall(block)
+            sent += len(block)
+            if self.rate:
+                ahead = sent / self.rate - (time.monotonic() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+    def _burst(self, channel: paramiko.Channel):
+        burst = LOG_LINE * self.burst_lines
+        while not channel.closed and not self._stopped.is_set():
+            channel.sendall(burst)
+            time.sleep(self.burst_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in SSH server for benchmarks")
+    parser.add_argument("--pattern", choices=PATTERNS, default="echo")
+    parser.add_argument("--rate", type=int, default=0)
+    parser.add_argument("--port", type=int, default=0)
+    args = parser.parse_args()
+
+    server = StubSSHServer(pattern=args.pattern, rate=args.rate)
+    print(server.start(port=args.port), flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
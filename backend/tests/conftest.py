@@ -0,0 +1,54 @@
+"""
+Shared fixtures
+
+The settings are read when ``app`` is first imported, so the environment
+points the database, logs and indexes at a scratch directory first.
+
+Run from the backend directory (-rs lists skipped engines and why):
+    python -m pytest -q -rs
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+SCRATCH_DIR = tempfile.mkdtemp(prefix="ssh-terminal-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(SCRATCH_DIR, 'app.db')}"
+os.environ["LOG_DIR"] = os.path.join(SCRATCH_DIR, "logs")
+os.environ["LOG_INDEX_PATH"] = os.path.join(SCRATCH_DIR, "log_index.db")
+os.environ["IPC_DIR"] = os.path.join(SCRATCH_DIR, "ipc")
+os.environ["SESSION_RELAY_ENABLED"] = "false"
+os.environ.setdefault("ENCRYPTION_KEY", "0" * 43 + "=")
+
+from benchmarks.ssh_stub_server import StubSSHServer  # noqa: E402
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def echo_port():
+    """Port of a stand-in SSH server with an echoing shell"""
+    server = StubSSHServer(pattern="echo")
+    yield server.start()
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def flood_port():
+    """Port of a stand-in SSH server whose shell floods output"""
+    server = StubSSHServer(pattern="flood")
+    yield server.start()
+    server.stop()
@@ -0,0 +1,74 @@
+"""
+Tests for credential resolution and its cache
+"""
+import pytest
+from sqlalchemy import delete, update
+
+from app.database import AsyncSessionLocal, init_db
+from app.models.credential import Credential
+from app.models.server import SSHServer
+from app.services.credential_resolver import CredentialResolver, ResolutionError
+from app.services.encryption import encryption_service
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def server_id():
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        credential = Credential(
+            name="resolver-test", credential_type="password",
+            encrypted_password=encryption_service.encrypt("first"),
+        )
+        db.add(credential)
+        await db.flush()
+        server = SSHServer(
+            name="resolver-test", host="10.0.0.1", username="root", credential_id=credential.id,
+        )
+        db.add(server)
+        await db.commit()
+        yield server.id
+        await db.execute(delete(SSHServer).where(SSHServer.id == server.id))
+        await db.execute(delete(Credential).where(Credential.id == credential.id))
+        await db.commit()
+
+
+async def test_cache_hit(server_id):
+    resolver = CredentialResolver()
+    async with AsyncSessionLocal() as db:
+        first = await resolver.resolve(db, server_id)
+        assert await resolver.resolve(db, server_id) is first
+    assert (resolver.hits, resolver.misses, resolver.stale) == (1, 1, 0)
+    assert first.password == "first"
+
+
+async def test_change_through_another_worker_is_seen(server_id):
+    # Another worker's resolver is never told about the change
+    resolver = CredentialResolver(ttl=3600)
+    async with AsyncSessionLocal() as db:
+        assert (await resolver.resolve(db, server_id)).password == "first"
+
+        await db.execute(
+            update(Credential)
+            .where(Credential.name == "resolver-test")
+            .values(encrypted_password=encryption_service.encrypt("second"))
+        )
+        await db.execute(update(SSHServer).where(SSHServer.id == server_id).values(host="10.0.0.2"))
+        await db.commit()
+
+        params = await resolver.resolve(db, server_id)
+    assert (params.password, params.host) == ("second", "10.0.0.2")
+    assert resolver.stale == 1
+
+
+async def test_deleted_server_is_not_served_from_cache(server_id):
+    resolver = CredentialResolver(ttl=3600)
+    async with AsyncSessionLocal() as db:
+        await resolver.resolve(db, server_id)
+        await db.execute(delete(SSHServer).where(SSHServer.id == server_id))
+        await db.commit()
+        with pytest.raises(ResolutionError) as error:
+            await resolver.resolve(db, server_id)
+    assert error.value.status_code == 404
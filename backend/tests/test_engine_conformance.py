@@ -0,0 +1,225 @@
+"""
+Behavioral conformance of the SSH engines
+
+The scenarios of ``benchmarks.engine_conformance``, run against every
+engine through SSHConnection and the stand-in SSH server.
+"""
+import asyncio
+import importlib.util
+import socket
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.config import settings
+from app.services.output_hub import POLICY_DROP
+from app.services.ssh_connection import SSHConnection
+from app.services.ssh_engine import ENGINES, EngineSession, create_engine_session
+from app.services.transport_pool import transport_pool
+from benchmarks.engine_conformance import TIMEOUT, OutputTap, open_connection, read_until
+
+
+pytestmark = pytest.mark.anyio
+
+
+ASYNCSSH_MISSING = importlib.util.find_spec("asyncssh") is None
+
+
+def _engine_param(name: str):
+    if name == "asyncssh":
+        return pytest.param(name, marks=pytest.mark.skipif(
+            ASYNCSSH_MISSING,
+            reason="asyncssh engine not tested: asyncssh is not installed (pip install -r requirements.txt)",
+        ))
+    return name
+
+
+@pytest.fixture(params=[_engine_param(name) for name in ENGINES])
+async def engine(request):
+    previous = settings.ssh_engine
+    settings.ssh_engine = request.param
+    yield request.param
+    await transport_pool.close_all()
+    settings.ssh_engine = previous
+
+
+def _private_key(passphrase: bytes = None) -> str:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    encryption = (
+        serialization.BestAvailableEncryption(passphrase)
+        if passphrase else serialization.NoEncryption()
+    )
+    return key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL, encryption
+    ).decode("ascii")
+
+
+async def _drain(tap: OutputTap, total: int):
+    drained = 0
+    deadline = time.monotonic() + TIMEOUT
+    while drained < total:
+        assert time.monotonic() < deadline, "output did not keep flowing"
+        chunk = await tap.read()
+        assert chunk is not None, "output closed during flood"
+        drained += len(chunk)
+
+
+async def test_engine_interface(engine):
+    with pytest.raises(TypeError):
+        EngineSession(None)
+    session = create_engine_session(SSHConnection("127.0.0.1", 22, "nobody"))
+    assert isinstance(session, EngineSession)
+    assert session.name == engine
+
+
+async def test_connect(engine, echo_port):
+    connection = await open_connection(echo_port)
+    tap = OutputTap(connection)
+    try:
+        assert connection.connected
+        assert "total" in connection.connect_timings
+        await read_until(tap, b"stub shell ready")
+    finally:
+        await connection.disconnect()
+
+
+async def test_echo(engine, echo_port):
+    connection = await open_connection(echo_port)
+    tap = OutputTap(connection)
+    try:
+        await read_until(tap, b"$ ")
+        assert await connection.send("hello engine\n")
+        await read_until(tap, b"hello engine\n")
+        assert await connection.send(b"raw \xe2\x9c\x93\n")
+        await read_until(tap, b"raw \xe2\x9c\x93\n")
+    finally:
+        await connection.disconnect()
+
+
+async def test_large_paste_in_order(engine, echo_port):
+    connection = await open_connection(echo_port)
+    tap = OutputTap(connection)
+    try:
+        await read_until(tap, b"$ ")
+        payload = b"".join(b"line %07d\n" % i for i in range(200000))  # ~2.4 MB
+        for offset in range(0, len(payload), 4096):
+            assert await connection.send(payload[offset:offset + 4096])
+
+        received = b""
+        deadline = time.monotonic() + 30
+        while len(received) < len(payload):
+            remaining = deadline - time.monotonic()
+            assert remaining > 0, f"paste echo stalled at {len(received)} bytes"
+            chunk = await tap.read(remaining)
+            assert chunk is not None, "output closed during paste"
+            received += chunk
+        assert received == payload
+    finally:
+        await connection.disconnect()
+
+
+async def test_resize(engine, echo_port):
+    connection = await open_connection(echo_port)
+    tap = OutputTap(connection)
+    try:
+        assert await connection.resize(132, 43)
+        assert await connection.send("still alive\n")
+        await read_until(tap, b"still alive\n")
+    finally:
+        await connection.disconnect()
+
+
+async def test_backpressure(engine, flood_port):
+    connection = await open_connection(flood_port)
+    tap = OutputTap(connection)
+    try:
+        # Nobody drains the viewer: reading must pause at the high watermark
+        await asyncio.sleep(1.0)
+        stats = tap.viewer.queue.get_stats()
+        assert stats["paused"]
+        assert stats["peak_bytes"] <= settings.output_queue_max_bytes + settings.output_coalesce_max_bytes * 2
+
+        # Draining must resume the flow
+        await _drain(tap, settings.output_queue_max_bytes * 3)
+    finally:
+        await connection.disconnect()
+
+
+async def test_fanout(engine, echo_port):
+    connection = await open_connection(echo_port)
+    first = OutputTap(connection)
+    second = OutputTap(connection)
+    try:
+        await read_until(first, b"$ ")
+        await read_until(second, b"$ ")
+        assert await connection.send("both viewers\n")
+        await read_until(first, b"both viewers\n")
+        await read_until(second, b"both viewers\n")
+        hub = connection.output_hub.get_stats()
+        assert hub["encodings"] <= hub["frames"], "frames encoded once per viewer"
+    finally:
+        await connection.disconnect()
+
+
+async def test_stalled_viewer_does_not_block(engine, flood_port):
+    connection = await open_connection(flood_port)
+    reader = OutputTap(connection)
+    stalled = OutputTap(connection, policy=POLICY_DROP)
+    try:
+        await _drain(reader, settings.output_queue_max_bytes * 3)
+        assert stalled.viewer.dropped_bytes > 0
+    finally:
+        await connection.disconnect()
+
+
+async def test_server_exit(engine, echo_port):
+    connection = await open_connection(echo_port)
+    tap = OutputTap(connection)
+    closed = asyncio.Event()
+    connection.on_disconnect = closed.set
+    try:
+        await read_until(tap, b"$ ")
+        await connection.send("exit\n")
+        await asyncio.wait_for(closed.wait(), TIMEOUT)
+        assert not connection.connected
+
+        # Remaining output drains, then the viewer reports closed
+        while await tap.read() is not None:
+            pass
+    finally:
+        await connection.disconnect()
+
+
+async def test_connect_failure_tcp(engine):
+    # Grab a free port and leave it closed
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        closed_port = sock.getsockname()[1]
+
+    connection = SSHConnection("127.0.0.1", closed_port, "nobody", password="x")
+    assert not await connection.connect()
+    assert connection.connect_failure == "tcp"
+
+
+async def test_key_auth(engine, echo_port):
+    connection = SSHConnection(
+        "127.0.0.1", echo_port, "conformance",
+        private_key=_private_key(b"hunter2"), passphrase="hunter2",
+    )
+    assert await connection.connect(), connection.connect_failure
+    tap = OutputTap(connection)
+    try:
+        await read_until(tap, b"$ ")
+    finally:
+        await connection.disconnect()
+
+
+async def test_key_wrong_passphrase(engine, echo_port):
+    connection = SSHConnection(
+        "127.0.0.1", echo_port, "conformance",
+        private_key=_private_key(b"hunter2"), passphrase="wrong",
+    )
+    assert not await connection.connect()
+    assert connection.connect_failure == "key"
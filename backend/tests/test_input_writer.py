@@ -0,0 +1,137 @@
+"""
+Tests for the flow-controlled input writer
+"""
+import asyncio
+import socket
+import threading
+
+import pytest
+
+from app.config import settings
+from app.services.input_writer import InputWriter, _WindowCondition
+from app.services.transport_pool import transport_pool
+from benchmarks.engine_conformance import OutputTap, open_connection, read_until
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeChannel:
+    """Channel with a send window, adjusted like Paramiko's transport thread does"""
+
+    def __init__(self, window: int, condition: bool = True):
+        self.lock = threading.Lock()
+        if condition:
+            self.out_buffer_cv = threading.Condition(self.lock)
+        self.window = window
+        self.received = b""
+        self.send_threads = set()
+
+    def send(self, data: bytes) -> int:
+        self.send_threads.add(threading.current_thread().name)
+        with self.lock:
+            if not self.window:
+                raise socket.timeout()
+            size = min(len(data), self.window)
+            self.window -= size
+            self.received += data[:size]
+        return size
+
+    def adjust(self, size: int):
+        with self.lock:
+            self.window += size
+            if hasattr(self, "out_buffer_cv"):
+                self.out_buffer_cv.notify_all()
+
+
+async def wait_for(condition, timeout: float = 5):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.001)
+
+
+async def test_sends_off_the_event_loop():
+    channel = FakeChannel(window=1 << 20)
+    writer = InputWriter(channel)
+    for key in b"ls -la\r":
+        assert writer.write(bytes([key]))
+    await wait_for(lambda: channel.received == b"ls -la\r")
+    assert channel.send_threads and threading.current_thread().name not in channel.send_threads
+    writer.close()
+
+
+async def test_waits_for_window_adjust():
+    channel = FakeChannel(window=10)
+    writer = InputWriter(channel)
+    payload = bytes(range(256)) * 40
+    assert writer.write(payload)
+    await wait_for(lambda: writer.window_waits == 1)
+
+    # Nothing more is sent until the window grows
+    await asyncio.sleep(0.05)
+    assert channel.received == payload[:10]
+    assert writer.get_stats()["pending_bytes"] == len(payload) - 10
+
+    for _ in range(len(payload) // 1000 + 1):
+        threading.Thread(target=channel.adjust, args=(1000,)).start()
+        await asyncio.sleep(0.01)
+    await wait_for(lambda: channel.received == payload)
+    assert writer.get_stats()["pending_bytes"] == 0
+    writer.close()
+
+
+async def test_rejects_input_past_the_limit():
+    channel = FakeChannel(window=0)
+    writer = InputWriter(channel, max_pending_bytes=100)
+    assert writer.write(b"x" * 60)
+    assert not writer.write(b"x" * 60)
+    assert writer.rejected == 1
+    writer.close()
+    assert not writer.write(b"x")
+
+
+async def test_polls_window_without_condition():
+    channel = FakeChannel(window=10, condition=False)
+    writer = InputWriter(channel)
+    payload = b"y" * 5000
+    assert writer.write(payload)
+    await wait_for(lambda: writer.window_waits == 1)
+
+    channel.adjust(len(payload))
+    await wait_for(lambda: channel.received == payload)
+    assert writer.window_signals == 0
+    assert writer.window_timeouts >= 1
+    writer.close()
+
+
+async def test_paramiko_signals_window_adjust(echo_port):
+    # Guards the out_buffer_cv hook against Paramiko changing its internals.
+    # Nobody reads the echo at first, so the server stops reading and the
+    # send window runs out; draining must resume input on window adjusts,
+    # not on the bounded-wait fallback.
+    previous = settings.ssh_engine
+    settings.ssh_engine = "paramiko"
+    connection = await open_connection(echo_port)
+    tap = OutputTap(connection)
+    try:
+        assert isinstance(connection.engine.channel.out_buffer_cv, _WindowCondition)
+        await read_until(tap, b"$ ")
+        payload = b"z" * (6 * 1024 * 1024)
+        for offset in range(0, len(payload), 65536):
+            assert await connection.send(payload[offset:offset + 65536])
+        await wait_for(lambda: connection.engine.get_input_stats()["window_waits"] > 0, timeout=10)
+
+        received = 0
+        while received < len(payload):
+            chunk = await tap.read()
+            assert chunk is not None, "output closed during paste"
+            received += len(chunk)
+
+        stats = connection.engine.get_input_stats()
+        assert stats["window_signals"] > 0
+        assert stats["window_timeouts"] == 0
+    finally:
+        await connection.disconnect()
+        await transport_pool.close_all()
+        settings.ssh_engine = previous
@@ -0,0 +1,113 @@
+"""
+Tests for log parsing and the log index
+"""
+import asyncio
+
+import pytest
+
+from app.services.log_index import LogIndex, clean_text, parse_records, split_directions
+
+
+def record(timestamp: str, is_input: bool, text: str) -> bytes:
+    prefix = "INPUT: >> " if is_input else "OUTPUT: "
+    return f"[2024-05-01 {timestamp}] {prefix}{text}\n".encode()
+
+
+# "ls -la" typed key by key, its output, then "dockr<DEL>er ps"
+LOG = (
+    b"".join(record("10:00:00", True, key) for key in "ls -la\r")
+    + record("10:00:01", False, "total 8\r\ndrwxr-xr-x  2 root root 4096 .\r\n")
+    + b"".join(record("10:00:05", True, key) for key in "dockr\x7fer ps\r")
+    + record("10:00:06", False, "\x1b[32mCONTAINER ID\x1b[0m   IMAGE\r\n")
+)
+
+
+def test_clean_text():
+    assert clean_text("dockr\x7fer") == "docker"
+    assert clean_text("ab\x08\x08xy") == "xy"
+    assert clean_text("\x1b[1;32mok\x1b[0m\x1b]0;title\x07") == "ok"
+    assert clean_text("\x7f\x7fabc") == "abc"
+
+
+def test_split_directions():
+    first, last, texts = split_directions(LOG)
+    assert (first, last) == ("2024-05-01 10:00:00", "2024-05-01 10:00:06")
+    assert texts["input"] == "ls -la\ndockr\x7fer ps\n"
+    assert texts["output"] == "total 8\ndrwxr-xr-x  2 root root 4096 .\n\x1b[32mCONTAINER ID\x1b[0m   IMAGE\n"
+
+
+def test_split_directions_without_records():
+    assert split_directions(b"no records here\n") == (None, None, {"input": "", "output": ""})
+
+
+def test_split_directions_keeps_lines_spanning_records():
+    data = record("10:00:00", False, "first line\r\nsecond") + b"continued\r\n\n"
+    _, _, texts = split_directions(data)
+    assert texts["output"] == "first line\nsecond\ncontinued\n"
+
+
+def test_parse_records_offsets():
+    base = 1000
+    records = parse_records(LOG, base)
+    assert len(records) == 7 + 1 + 12 + 1
+    offset, timestamp, direction, text = records[0]
+    assert (offset, timestamp, direction, text) == (base, "2024-05-01 10:00:00", "input", "l")
+    for offset, _, direction, text in records:
+        line = LOG[offset - base:].split(b"\n", 1)[0].decode()
+        assert line.startswith("[2024-05-01 ")
+        assert ("INPUT: >> " in line) == (direction == "input")
+    assert records[7][2:] == ("output", "total 8\ndrwxr-xr-x  2 root root 4096 .\n")
+
+
+def test_parse_records_joins_continuation_lines():
+    data = record("10:00:00", False, "a") + b"b\n" + record("10:00:01", True, "c")
+    assert parse_records(data, 0) == [
+        (0, "2024-05-01 10:00:00", "output", "a\nb"),
+        (len(record("10:00:00", False, "a")) + 2, "2024-05-01 10:00:01", "input", "c"),
+    ]
+
+
+@pytest.fixture
+async def index(tmp_path):
+    log_dir = tmp_path / "logs"
+    log_dir.mkdir()
+    (log_dir / "a.log").write_bytes(LOG)
+    (log_dir / "b.log").write_bytes(
+        b"".join(record("11:00:00", True, key) for key in "docker images\r")
+        + record("11:00:01", False, "REPOSITORY   TAG\r\n")
+    )
+    log_index = LogIndex(str(tmp_path / "index.db"), str(log_dir))
+    log_index.enabled = True
+    await asyncio.get_running_loop().run_in_executor(log_index._executor, log_index._catch_up)
+    yield log_index
+    await log_index.stop()
+
+
+@pytest.mark.anyio
+async def test_search_joins_keystrokes_and_applies_backspace(index):
+    found = await index.search("docker ps")
+    assert [entry["path"].rsplit("/", 1)[1] for entry in found] == ["a.log"]
+    (match,) = found[0]["matches"]
+    assert match["direction"] == "input"
+    assert match["text"] == "docker ps"
+    assert match["timestamp"] == "2024-05-01 10:00:05"
+    assert LOG[match["offset"]:].startswith(record("10:00:05", True, "d"))
+
+
+@pytest.mark.anyio
+async def test_search_requires_every_word_on_the_line(index):
+    # "docker" and "IMAGE" both occur in a.log, but never on the same line
+    found = await index.search("docker image")
+    assert [entry["path"].rsplit("/", 1)[1] for entry in found] == ["b.log"]
+    assert found[0]["matches"][0]["text"] == "docker images"
+
+
+@pytest.mark.anyio
+async def test_search_filters(index):
+    a_log = f"{index.log_dir}/a.log"
+    assert await index.search("docker", paths=[]) == []
+    found = await index.search("docker", paths=[a_log])
+    assert [entry["path"] for entry in found] == [a_log]
+    assert await index.search("container", direction="input") == []
+    found = await index.search("container", direction="output")
+    assert found[0]["matches"][0]["text"] == "CONTAINER ID   IMAGE"
@@ -0,0 +1,38 @@
+"""
+Tests for the Prometheus metrics registry
+"""
+import os
+
+from app.routers.metrics import _collect_sessions
+from app.services.metrics import MetricsRegistry
+from app.services.ssh_connection import SSHConnection
+from app.services.ssh_manager import ssh_manager
+
+
+def test_every_series_has_the_worker_label():
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests", ["result"]).labels("hit").inc(3)
+    registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0)).observe(0.5)
+    registry.add_collector(lambda: [("queue_bytes", "gauge", "Queued bytes", [({}, 7)])])
+
+    worker = f'worker="{os.getpid()}"'
+    samples = [line for line in registry.render().splitlines() if not line.startswith("#")]
+    assert f'requests_total{{{worker},result="hit"}} 3' in samples
+    assert f'latency_seconds_bucket{{{worker},le="1"}} 1' in samples
+    assert f"latency_seconds_count{{{worker}}} 1" in samples
+    assert f"queue_bytes{{{worker}}} 7" in samples
+    assert all(worker in line for line in samples)
+
+
+def test_session_traffic_is_not_labelled_per_session(monkeypatch):
+    connection = SSHConnection("127.0.0.1", 22, "tester")
+    connection.bytes_in, connection.bytes_out = 5, 11
+    monkeypatch.setitem(ssh_manager.connections, "metrics-session", connection)
+    monkeypatch.setattr(ssh_manager, "closed_bytes_in", 100)
+    monkeypatch.setattr(ssh_manager, "closed_bytes_out", 200)
+
+    families = {name: samples for name, _, _, samples in _collect_sessions()}
+    assert not any("session_id" in labels for samples in families.values() for labels, _ in samples)
+    assert families["ssh_active_sessions"] == [({}, 1)]
+    assert families["ssh_bytes_total"] == [({"direction": "in"}, 105), ({"direction": "out"}, 211)]
+    assert connection.get_stats()["bytes"] == {"in": 5, "out": 11}
@@ -0,0 +1,69 @@
+"""
+Tests for keyset pagination cursors
+"""
+from datetime import datetime
+
+import pytest
+
+from app.models.server import SSHServer
+from app.services.pagination import CursorError, KeysetPage
+
+
+SORTS = {"name": SSHServer.name, "created_at": SSHServer.created_at}
+
+
+class Row:
+    def __init__(self, id, name, created_at):
+        self.id = id
+        self.name = name
+        self.created_at = created_at
+
+
+def make_rows(count: int) -> list:
+    return [Row(i, f"server-{i:03d}", datetime(2024, 1, 1, 12, 0, i % 60)) for i in range(1, count + 1)]
+
+
+def test_split_without_next_page():
+    page = KeysetPage(SORTS, SSHServer.id, "name", limit=5)
+    rows, cursor = page.split(make_rows(5))
+    assert len(rows) == 5
+    assert cursor is None
+
+
+def test_cursor_round_trip():
+    page = KeysetPage(SORTS, SSHServer.id, "-name", limit=3)
+    rows, cursor = page.split(make_rows(4))
+    assert [row.id for row in rows] == [1, 2, 3]
+    assert "=" not in cursor
+    assert page._decode(cursor) == ("server-003", 3)
+
+
+def test_datetime_cursor_round_trip():
+    page = KeysetPage(SORTS, SSHServer.id, "created_at", limit=2)
+    rows, cursor = page.split(make_rows(3))
+    assert page._decode(cursor) == (datetime(2024, 1, 1, 12, 0, 2), 2)
+
+
+def test_cursor_for_another_sort_is_rejected():
+    rows, cursor = KeysetPage(SORTS, SSHServer.id, "name", limit=1).split(make_rows(2))
+    with pytest.raises(CursorError):
+        KeysetPage(SORTS, SSHServer.id, "-name", limit=1)._decode(cursor)
+
+
+@pytest.mark.parametrize("cursor", ["!!!", "bm90IGpzb24", "WzEsMl0"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(CursorError):
+        KeysetPage(SORTS, SSHServer.id, "name")._decode(cursor)
+
+
+def test_unknown_sort_is_rejected():
+    with pytest.raises(CursorError):
+        KeysetPage(SORTS, SSHServer.id, "-host")
+
+
+def test_apply_adds_keyset_condition():
+    page = KeysetPage(SORTS, SSHServer.id, "-name", limit=10)
+    cursor = page._encode("web", 7)
+    sql = str(page.apply(SSHServer.__table__.select(), cursor).compile())
+    assert "(ssh_servers.name, ssh_servers.id) <" in sql
+    assert "ORDER BY ssh_servers.name DESC, ssh_servers.id DESC" in sql
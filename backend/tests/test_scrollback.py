@@ -0,0 +1,69 @@
+"""
+Tests for the scrollback ring buffer
+"""
+import random
+
+import pytest
+
+from app.services.scrollback import ScrollbackBuffer
+
+
+def test_read_while_filling():
+    buffer = ScrollbackBuffer(16)
+    buffer.append(b"hello ")
+    buffer.append(b"world")
+    assert buffer.read_from(0) == (0, b"hello world")
+    assert buffer.read_from(6) == (6, b"world")
+    assert buffer.read_from(11) == (11, b"")
+
+
+def test_offset_past_end_is_clamped():
+    buffer = ScrollbackBuffer(16)
+    buffer.append(b"abc")
+    assert buffer.read_from(50) == (3, b"")
+
+
+def test_overwritten_bytes_are_skipped():
+    buffer = ScrollbackBuffer(8)
+    buffer.append(b"0123456789")
+    assert buffer.start == 2
+    assert buffer.read_from(0) == (2, b"23456789")
+    assert buffer.read_from(5) == (5, b"56789")
+
+
+def test_read_wraps_around_the_ring():
+    buffer = ScrollbackBuffer(8)
+    buffer.append(b"abcdef")
+    buffer.append(b"ghij")  # wraps: ring holds "ij" + "cdefgh"
+    assert buffer.read_from(0) == (2, b"cdefghij")
+    assert buffer.read_from(7) == (7, b"hij")
+
+
+def test_append_larger_than_capacity():
+    buffer = ScrollbackBuffer(4)
+    buffer.append(b"ab")
+    buffer.append(b"cdefghij")
+    assert buffer.read_from(0) == (6, b"ghij")
+    buffer.append(b"k")
+    assert buffer.read_from(0) == (7, b"hijk")
+
+
+def test_zero_capacity_keeps_offsets():
+    buffer = ScrollbackBuffer(0)
+    buffer.append(b"abc")
+    assert buffer.end == 3
+    assert buffer.read_from(0) == (3, b"")
+
+
+@pytest.mark.parametrize("capacity", [1, 7, 64])
+def test_matches_stream_tail(capacity):
+    rng = random.Random(capacity)
+    buffer = ScrollbackBuffer(capacity)
+    stream = b""
+    for _ in range(300):
+        data = bytes(rng.getrandbits(8) for _ in range(rng.randint(0, capacity * 2)))
+        buffer.append(data)
+        stream += data
+        offset = rng.randint(0, len(stream) + 2)
+        start = min(max(offset, len(stream) - capacity, 0), len(stream))
+        assert buffer.read_from(offset) == (start, stream[start:])
@@ -0,0 +1,76 @@
+"""
+Tests for the inventory import parser
+"""
+import pytest
+
+from app.services.server_inventory import InventoryFormatError, read_records
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def chunked(data: bytes, size: int):
+    for offset in range(0, len(data), size):
+        yield data[offset:offset + size]
+
+
+async def parse(data: bytes, fmt: str, size: int = 7) -> list:
+    return [record async for record in read_records(chunked(data, size), fmt)]
+
+
+async def test_ndjson():
+    data = (
+        b'{"name": "web", "host": "10.0.0.1"}\n'
+        b"\n"
+        b"not json\n"
+        b"[1, 2]\r\n"
+        b'{"name": "db"}'  # no trailing newline
+    )
+    records = await parse(data, "ndjson")
+    assert records[0] == (1, {"name": "web", "host": "10.0.0.1"}, None)
+    assert records[1][0] == 3 and records[1][1] is None and records[1][2].startswith("Invalid JSON")
+    assert records[2] == (4, None, "Expected a JSON object")
+    assert records[3] == (5, {"name": "db"}, None)
+
+
+async def test_multibyte_characters_split_across_chunks():
+    data = '{"name": "ŝervo ✓"}\n'.encode()
+    for size in (1, 2, 3):
+        assert await parse(data, "ndjson", size) == [(1, {"name": "ŝervo ✓"}, None)]
+
+
+async def test_csv():
+    data = (
+        b"\xef\xbb\xbfname, host ,port\r\n"
+        b"web,10.0.0.1,22\r\n"
+        b"\r\n"
+        b'db,"10.0.0.2",\r\n'
+        b"short,row\r\n"
+    )
+    assert await parse(data, "csv") == [
+        (2, {"name": "web", "host": "10.0.0.1", "port": "22"}, None),
+        (4, {"name": "db", "host": "10.0.0.2"}, None),
+        (5, None, "Expected 3 columns, got 2"),
+    ]
+
+
+async def test_csv_quoted_newlines_and_quotes():
+    data = (
+        b"name,description\n"
+        b'web,"first line\nsecond ""quoted"" line"\n'
+        b"db,plain\n"
+    )
+    assert await parse(data, "csv", size=5) == [
+        (2, {"name": "web", "description": 'first line\nsecond "quoted" line'}, None),
+        (4, {"name": "db", "description": "plain"}, None),
+    ]
+
+
+async def test_csv_unterminated_quote():
+    records = await parse(b'name,description\nweb,"never closed\n', "csv")
+    assert records == [(2, None, "Unterminated quoted field")]
+
+
+async def test_csv_needs_header():
+    with pytest.raises(InventoryFormatError):
+        await parse(b"\n\n", "csv")
@@ -0,0 +1,38 @@
+"""
+Tests for server search query building and tag parsing
+"""
+import pytest
+
+from app.services.server_search import MAX_TAG_LENGTH, fts_query, parse_tags
+
+
+@pytest.mark.parametrize("q, expected", [
+    ("web", '"web"*'),
+    ("prod web", '"prod" "web"*'),
+    ("  db   primary ", '"db" "primary"*'),
+    ("web-01.prod", '"web-01.prod"*'),
+    ('say "hi"', '"say" "hi"*'),
+    ("name:web OR host:*", '"name:web" "OR" "host:*"*'),
+    ("web --", '"web"*'),
+    ("", None),
+    ("- * ()", None),
+])
+def test_fts_query(q, expected):
+    assert fts_query(q) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, []),
+    ("", []),
+    ('["Prod", "web", "prod"]', ["prod", "web"]),
+    ("prod, Web ,,db", ["prod", "web", "db"]),
+    ('"solo"', ["solo"]),
+    ('{"not": "a list"}', []),
+    ('["ok", 3, null]', ["ok"]),
+])
+def test_parse_tags(value, expected):
+    assert parse_tags(value) == expected
+
+
+def test_parse_tags_truncates():
+    assert parse_tags("x" * (MAX_TAG_LENGTH + 10)) == ["x" * MAX_TAG_LENGTH]
@@ -0,0 +1,53 @@
+"""
+Tests for SSHConnection input validation
+"""
+import pytest
+
+from app.services.ssh_connection import SSHConnection
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeEngine:
+    """Engine session that records resizes"""
+
+    def __init__(self):
+        self.resizes = []
+
+    def resize(self, width: int, height: int):
+        self.resizes.append((width, height))
+
+
+@pytest.fixture
+def connection():
+    connection = SSHConnection("127.0.0.1", 22, "tester")
+    connection.engine = FakeEngine()
+    connection.connected = True
+    return connection
+
+
+async def test_resize_within_bounds(connection):
+    assert await connection.resize(132, 43)
+    assert await connection.resize(20, 10)
+    assert await connection.resize(500, 200)
+    assert connection.engine.resizes == [(132, 43), (20, 10), (500, 200)]
+    assert (connection.cols, connection.rows) == (500, 200)
+
+
+@pytest.mark.parametrize("cols, rows", [
+    (10**9, 24),
+    (80, 10**9),
+    (19, 24),
+    (80, 9),
+    (-80, 24),
+    ("80", 24),
+    (80.0, 24),
+    (True, 24),
+    (None, 24),
+    ([80], 24),
+])
+async def test_resize_ignores_invalid_sizes(connection, cols, rows):
+    assert not await connection.resize(cols, rows)
+    assert connection.engine.resizes == []
+    assert (connection.cols, connection.rows) == (80, 24)
@@ -0,0 +1,113 @@
+"""
+Tests for the SSH connection manager
+"""
+import asyncio
+import socket
+import uuid
+
+import pytest
+
+from app.config import settings
+from app.services.paramiko_engine import ParamikoSession
+from app.services.log_writer import log_writer
+from app.services.session_recording import RecordingReader, recording_path_for
+from app.services.ssh_manager import ssh_manager
+from app.services.transport_pool import transport_pool
+from benchmarks.engine_conformance import OutputTap, read_until
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def paramiko_engine():
+    previous = settings.ssh_engine
+    settings.ssh_engine = "paramiko"
+    yield
+    settings.ssh_engine = previous
+    for session_id in ssh_manager.get_active_sessions():
+        await ssh_manager.remove_connection(session_id)
+    await transport_pool.close_all()
+    await log_writer.close()  # its task must not outlive the test's event loop
+
+
+@pytest.fixture
+def silent_port():
+    """Port of a server that accepts TCP connections and never answers"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        sock.listen(8)
+        yield sock.getsockname()[1]
+
+
+async def create(port: int, **kwargs):
+    session_id = str(uuid.uuid4())
+    success, error = await ssh_manager.create_connection(
+        session_id, "127.0.0.1", port, "manager", password="secret", **kwargs
+    )
+    return session_id, success, error
+
+
+async def test_slow_host_does_not_hold_up_other_connects(paramiko_engine, echo_port, silent_port, monkeypatch):
+    monkeypatch.setattr(settings, "ssh_connect_timeout", 3.0)
+    stuck = asyncio.create_task(create(silent_port))
+    await asyncio.sleep(0.2)  # the stuck connect waits for a banner
+
+    session_id, success, error = await asyncio.wait_for(create(echo_port), 2.0)
+    assert success, error
+    assert not stuck.done()
+
+    _, success, _ = await stuck
+    assert not success
+    assert ssh_manager.get_active_sessions() == [session_id]
+
+
+async def test_duplicate_session_is_rejected_while_connecting(paramiko_engine, silent_port, monkeypatch):
+    monkeypatch.setattr(settings, "ssh_connect_timeout", 1.0)
+    session_id = str(uuid.uuid4())
+    first = asyncio.create_task(
+        ssh_manager.create_connection(session_id, "127.0.0.1", silent_port, "manager", password="x")
+    )
+    await asyncio.sleep(0.1)
+    assert await ssh_manager.create_connection(
+        session_id, "127.0.0.1", silent_port, "manager", password="x"
+    ) == (False, "Session already exists")
+    assert (await first)[0] is False
+
+    # A failed connect gives its slot back
+    assert ssh_manager._pending == set()
+
+
+async def test_burst_of_tabs_shares_one_handshake(paramiko_engine, echo_port, monkeypatch):
+    monkeypatch.setattr(settings, "transport_pool_enabled", True)
+    handshakes = []
+    open_transport = ParamikoSession._open_transport
+
+    async def counting_open_transport(self):
+        await asyncio.sleep(0.1)  # the other tabs queue up meanwhile
+        handshakes.append(len(ssh_manager._pending))
+        return await open_transport(self)
+
+    monkeypatch.setattr(ParamikoSession, "_open_transport", counting_open_transport)
+    results = await asyncio.gather(*[create(echo_port) for _ in range(5)])
+
+    assert all(success for _, success, _ in results)
+    # One handshake, while all five tabs were connecting at once
+    assert handshakes == [5]
+    assert sorted(ssh_manager.get_active_sessions()) == sorted(session_id for session_id, _, _ in results)
+
+
+async def test_recording_header_has_the_initial_size(paramiko_engine, echo_port, monkeypatch):
+    monkeypatch.setattr(settings, "recording_enabled", True)
+    session_id, success, error = await create(echo_port, cols=132, rows=43)
+    assert success, error
+    connection = ssh_manager.get_connection(session_id)
+    assert (connection.cols, connection.rows) == (132, 43)
+    await read_until(OutputTap(connection), b"$ ")
+
+    await ssh_manager.remove_connection(session_id)
+    await log_writer.close()
+    reader = RecordingReader(recording_path_for(connection.log_file_path))
+    assert (reader.header["width"], reader.header["height"]) == (132, 43)
+    header = next(reader.iter_asciicast())
+    assert '"width": 132' in header and '"height": 43' in header
@@ -0,0 +1,74 @@
+"""
+Tests for the hierarchical timer wheel
+"""
+import random
+
+from app.services.timer_wheel import TimerWheel
+
+
+def test_expires_at_deadline():
+    wheel = TimerWheel(now=0.0)
+    wheel.schedule("a", 5.0)
+    assert wheel.advance(4.0) == []
+    assert wheel.advance(5.0) == ["a"]
+    assert "a" not in wheel
+    assert len(wheel) == 0
+
+
+def test_past_deadline_expires_on_next_tick():
+    wheel = TimerWheel(now=10.0)
+    wheel.schedule("late", 3.0)
+    assert wheel.advance(10.5) == []
+    assert wheel.advance(11.0) == ["late"]
+
+
+def test_reschedule_replaces_deadline():
+    wheel = TimerWheel(now=0.0)
+    wheel.schedule("a", 5.0)
+    wheel.schedule("a", 20.0)
+    assert len(wheel) == 1
+    assert wheel.advance(19.0) == []
+    assert wheel.advance(20.0) == ["a"]
+
+
+def test_cancel():
+    wheel = TimerWheel(now=0.0)
+    wheel.schedule("a", 5.0)
+    assert wheel.cancel("a")
+    assert not wheel.cancel("a")
+    assert wheel.advance(100.0) == []
+
+
+def test_cascades_through_levels():
+    # 4 slots x 3 levels covers 64 ticks; later deadlines wait at the top
+    wheel = TimerWheel(now=0.0, slots=4, levels=3)
+    deadlines = {f"k{i}": float(i) for i in (1, 3, 4, 7, 16, 17, 63, 64, 65, 200, 1000)}
+    for key, deadline in deadlines.items():
+        wheel.schedule(key, deadline)
+
+    fired = {}
+    for now in range(1, 1001):
+        for key in wheel.advance(float(now)):
+            fired[key] = now
+    assert fired == {key: int(deadline) for key, deadline in deadlines.items()}
+
+
+def test_matches_sorted_deadlines():
+    rng = random.Random(7)
+    wheel = TimerWheel(now=0.0, tick=0.5, slots=8, levels=3)
+    deadlines = {i: rng.uniform(0, 500) for i in range(500)}
+    for key, deadline in deadlines.items():
+        wheel.schedule(key, deadline)
+    for key in range(0, 500, 5):
+        wheel.cancel(key)
+        del deadlines[key]
+
+    now = 0.0
+    while deadlines:
+        now += rng.uniform(0.1, 7)
+        expired = set(wheel.advance(now))
+        due = {key for key, deadline in deadlines.items() if deadline <= now - now % 0.5}
+        assert expired == due
+        for key in expired:
+            del deadlines[key]
+    assert len(wheel) == 0
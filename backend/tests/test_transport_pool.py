@@ -0,0 +1,71 @@
+"""
+Tests for the transport pool
+"""
+import asyncio
+
+import pytest
+
+from app.services.transport_pool import TransportPool, make_pool_key
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeTransport:
+    def __init__(self):
+        self.active = True
+
+    def is_active(self) -> bool:
+        return self.active
+
+    def close(self):
+        self.active = False
+
+
+async def test_concurrent_acquires_share_one_transport():
+    pool = TransportPool(max_channels=8)
+    key = make_pool_key("10.0.0.1", 22, "root", password="secret")
+    opened = []
+
+    async def factory():
+        await asyncio.sleep(0.01)
+        opened.append(FakeTransport())
+        return opened[-1]
+
+    results = await asyncio.gather(*[pool.acquire(key, factory) for _ in range(5)])
+    assert len(opened) == 1
+    assert [pooled for _, pooled in results] == [False, True, True, True, True]
+    assert pool.get_stats()["channels"] == 5
+    assert pool.get_stats()["key_locks"] == 0
+    await pool.close_all()
+
+
+async def test_key_locks_do_not_accumulate():
+    pool = TransportPool()
+
+    async def failing_factory():
+        raise OSError("connection refused")
+
+    for port in range(1000):
+        with pytest.raises(OSError):
+            await pool.acquire(make_pool_key("10.0.0.1", port, "root"), failing_factory)
+    assert pool.get_stats()["key_locks"] == 0
+    assert pool.get_stats()["transports"] == 0
+
+
+async def test_released_transport_is_closed_when_idle():
+    pool = TransportPool(idle_timeout=0.01)
+    transport = FakeTransport()
+
+    async def factory():
+        return transport
+
+    entry, _ = await pool.acquire(make_pool_key("10.0.0.1", 22, "root"), factory)
+    pool.release(entry)
+    for _ in range(100):
+        if pool.get_stats()["transports"] == 0 and not transport.active:
+            break
+        await asyncio.sleep(0.01)
+    assert not transport.active
+    stats = pool.get_stats()
+    assert (stats["transports"], stats["key_locks"]) == (0, 0)